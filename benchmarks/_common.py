@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark scripts. Run the scripts from the repository root,
+e.g. `python benchmarks/bench_load.py`.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dria_workflows import (  # noqa: E402
+    Edge,
+    Expression,
+    ConditionBuilder,
+    GetAll,
+    Operator,
+    Push,
+    Read,
+    Workflow,
+    WorkflowBuilder,
+    Write,
+)
+
+PROMPT = (
+    "Write down a search query related to following topics: {{topic_1}} and "
+    "{{topic_2}}. If any, avoid asking questions asked before: {{history}}. "
+)
+
+
+def make_workflow(
+    n_tasks: int = 100, memory_items: int = 100, item_size: int = 200
+) -> Workflow:
+    """
+    A chain of generation tasks over a large memory, with a conditional back-edge.
+    """
+    memory = {
+        "topic_1": "Linear Algebra",
+        "topic_2": "CUDA",
+        "documents": [
+            (f"document {i}: " + "lorem ipsum dolor sit amet " * (item_size // 27 + 1))[
+                :item_size
+            ]
+            for i in range(memory_items)
+        ],
+    }
+    builder = WorkflowBuilder(memory=memory)
+    for i in range(n_tasks):
+        builder.generative_step(
+            id=f"task_{i}",
+            prompt=PROMPT * 4 + "{{documents}}",
+            operator=Operator.GENERATION,
+            inputs=[GetAll.new("history", False)],
+            outputs=[Write.new(f"out_{i}"), Push.new("history")],
+        )
+    flow = [
+        Edge(source=f"task_{i}", target=f"task_{i + 1}") for i in range(n_tasks - 1)
+    ]
+    flow.append(
+        Edge(
+            source=f"task_{n_tasks - 1}",
+            target="_end",
+            condition=ConditionBuilder.build(
+                expected="Yes",
+                expression=Expression.CONTAINS,
+                input=Read.new(f"out_{n_tasks - 1}", True),
+                target_if_not="task_0",
+            ),
+        )
+    )
+    builder.flow(flow)
+    builder.set_return_value(f"out_{n_tasks - 1}")
+    return builder.build()
+
+
+def timeit(func, repeat: int = 5, number: int = 1) -> float:
+    """
+    Best-of-`repeat` seconds per call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
@@ -0,0 +1,41 @@
+"""
+Size and speed of the binary workflow format against model_dump_json.
+"""
+
+import gzip
+
+from _common import Workflow, make_workflow, timeit
+
+
+def main():
+    cases = {
+        "small (README-like)": make_workflow(3, 2, 50),
+        "many tasks": make_workflow(500, 10, 100),
+        "large memory": make_workflow(5, 10000, 300),
+    }
+    for name, workflow in cases.items():
+        as_json = workflow.model_dump_json(exclude_unset=True, exclude_none=True).encode()
+        as_bytes = workflow.to_bytes()
+        number = 20
+        print(
+            f"{name}: json={len(as_json)}B binary={len(as_bytes)}B "
+            f"({len(as_bytes) / len(as_json):.0%}), gzip json={len(gzip.compress(as_json))}B "
+            f"gzip binary={len(gzip.compress(as_bytes))}B"
+        )
+        results = {
+            "encode model_dump_json": timeit(
+                lambda: workflow.model_dump_json(exclude_unset=True, exclude_none=True),
+                number=number,
+            ),
+            "encode to_bytes": timeit(workflow.to_bytes, number=number),
+            "decode model_validate_json": timeit(
+                lambda: Workflow.model_validate_json(as_json), number=number
+            ),
+            "decode from_bytes": timeit(lambda: Workflow.from_bytes(as_bytes), number=number),
+        }
+        for label, seconds in results.items():
+            print(f"  {label:28s} {seconds * 1e3:9.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
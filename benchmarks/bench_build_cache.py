@@ -0,0 +1,66 @@
+"""
+Building a workflow from its definition vs. loading it from a BuildCache.
+"""
+
+import tempfile
+
+from _common import PROMPT, timeit
+from dria_workflows import (
+    BuildCache,
+    CachedWorkflowBuilder,
+    Edge,
+    GetAll,
+    Operator,
+    Push,
+    WorkflowBuilder,
+    Write,
+)
+
+
+def define(builder, n_tasks: int, memory_items: int):
+    for i in range(n_tasks):
+        builder.generative_step(
+            id=f"task_{i}",
+            prompt=PROMPT * 4 + "{{documents}}",
+            operator=Operator.GENERATION,
+            inputs=[GetAll.new("history", False)],
+            outputs=[Write.new(f"out_{i}"), Push.new("history")],
+        )
+    builder.flow(
+        [Edge(source=f"task_{i}", target=f"task_{i + 1}") for i in range(n_tasks - 1)]
+        + [Edge(source=f"task_{n_tasks - 1}", target="_end")]
+    )
+    builder.set_return_value(f"out_{n_tasks - 1}")
+    return builder.build()
+
+
+def memory(memory_items: int):
+    return {
+        "topic_1": "Linear Algebra",
+        "topic_2": "CUDA",
+        "documents": [f"document {i}: " + "lorem ipsum " * 16 for i in range(memory_items)],
+    }
+
+
+def main():
+    cache = BuildCache(tempfile.mkdtemp())
+    for n_tasks, memory_items in ((1, 10), (5, 10), (50, 10), (200, 10), (50, 5000)):
+        number = max(1, 500 // n_tasks)
+        build = timeit(
+            lambda: define(WorkflowBuilder(memory(memory_items)), n_tasks, memory_items),
+            number=number,
+        )
+        define(CachedWorkflowBuilder(cache, memory(memory_items)), n_tasks, memory_items)
+        hit = timeit(
+            lambda: define(CachedWorkflowBuilder(cache, memory(memory_items)), n_tasks, memory_items),
+            number=number,
+        )
+        print(
+            f"tasks={n_tasks:4d} memory={memory_items:5d}  build {build * 1e3:8.2f}ms"
+            f"  cache hit {hit * 1e3:8.2f}ms  ({build / hit:.1f}x)"
+        )
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Bytes per workflow and extraction throughput of bundles, for a batch of workflows
+that share their tasks and differ only in memory.
+"""
+
+import gzip
+import os
+import random
+import tempfile
+import time
+
+from _common import PROMPT, Operator, Write, WorkflowBuilder, Edge
+from dria_workflows import BundleReader, BundleWriter
+
+
+def make_batch(n: int):
+    workflows = []
+    for i in range(n):
+        builder = WorkflowBuilder(
+            memory={
+                "topic_1": f"topic number {i}",
+                "topic_2": "CUDA",
+                "history": [f"question {i}-{j}" for j in range(5)],
+                "context": "shared background document. " * 40,
+            }
+        )
+        for j in range(5):
+            builder.generative_step(
+                id=f"step_{j}",
+                prompt=PROMPT * 3 + "{{context}}",
+                operator=Operator.GENERATION,
+                outputs=[Write.new(f"out_{j}")],
+            )
+        flow = [Edge(source=f"step_{j}", target=f"step_{j + 1}") for j in range(4)]
+        builder.flow(flow + [Edge(source="step_4", target="_end")])
+        builder.set_return_value("out_4")
+        workflows.append(builder.build())
+    return workflows
+
+
+def main():
+    n = 2000
+    workflows = make_batch(n)
+    raw = [w.to_json(compact=True) for w in workflows]
+    raw_size = sum(map(len, raw))
+    gzip_size = sum(len(gzip.compress(r)) for r in raw)
+    print(f"{n} workflows: json={raw_size / n:.0f}B/wf gzip each={gzip_size / n:.0f}B/wf")
+
+    directory = tempfile.mkdtemp()
+    for codec in ("gzip", "lzma"):
+        path = os.path.join(directory, f"batch.{codec}.bundle")
+        start = time.perf_counter()
+        with BundleWriter(path, codec=codec) as writer:
+            for workflow in workflows:
+                writer.add(workflow)
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        with BundleReader(path) as reader:
+            start = time.perf_counter()
+            for workflow in reader:
+                pass
+            sequential = n / (time.perf_counter() - start)
+            indices = random.Random(0).sample(range(n), 500)
+            start = time.perf_counter()
+            for i in indices:
+                reader.get(i)
+            random_access = len(indices) / (time.perf_counter() - start)
+
+        print(
+            f"bundle {codec}: {size / n:.0f}B/wf write={n / write_time:.0f}wf/s "
+            f"sequential={sequential:.0f}wf/s random={random_access:.0f}wf/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
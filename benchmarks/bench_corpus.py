@@ -0,0 +1,64 @@
+"""
+Random access and filtering on a JSONL corpus: full scan vs. the indexed corpus.
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from _common import make_workflow
+from dria_workflows import WorkflowCorpus, write_jsonl
+
+
+def main():
+    n = 20000
+    path = os.path.join(tempfile.mkdtemp(), "corpus.jsonl")
+    template = make_workflow(5, 20, 200)
+    workflows = []
+    for i in range(n):
+        workflow = template.model_copy(deep=False)
+        workflow.external_memory = {**template.external_memory, "topic_1": f"topic {i}"}
+        workflows.append(workflow)
+    write_jsonl(workflows, path)
+    print(f"{n} workflows, {os.path.getsize(path) / 2**20:.1f}MiB")
+
+    targets = random.Random(0).sample(range(n), 100)
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    found = [json.loads(lines[i]) for i in targets]
+    print(f"read whole file + pick 100: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    corpus = WorkflowCorpus(path)
+    print(f"build index: {time.perf_counter() - start:.3f}s")
+    corpus.close()
+
+    start = time.perf_counter()
+    corpus = WorkflowCorpus(path)
+    print(f"open with index: {time.perf_counter() - start:.4f}s")
+
+    start = time.perf_counter()
+    found = [corpus.get_dict(i) for i in targets]
+    print(f"random access 100 dicts: {time.perf_counter() - start:.4f}s")
+
+    start = time.perf_counter()
+    naive = [i for i, line in enumerate(lines) if json.loads(line)["external_memory"]["topic_1"].startswith("topic 19")]
+    print(f"filter by parsing every record: {time.perf_counter() - start:.3f}s ({len(naive)} hits)")
+
+    start = time.perf_counter()
+    hits = corpus.search(b'"topic_1":"topic 19')
+    print(f"filter with search(): {time.perf_counter() - start:.3f}s ({len(hits)} hits)")
+    assert hits == naive
+
+    start = time.perf_counter()
+    results = corpus.parallel_map(len, processes=4)
+    print(f"parallel_map over {len(results)} records: {time.perf_counter() - start:.3f}s")
+    corpus.close()
+
+
+if __name__ == "__main__":
+    main()
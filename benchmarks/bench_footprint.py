@@ -0,0 +1,45 @@
+"""
+Resident memory of many loaded workflows of one template, with and without slim_workflow.
+
+Usage: python benchmarks/bench_footprint.py [count]   (default 20000)
+"""
+
+import gc
+import sys
+import time
+
+from _common import make_workflow
+from dria_workflows import Workflow, footprint, measure_resident, slim_workflow
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    template = make_workflow(3, 4, 80)
+    # every workflow has its own topic, like a dispatcher holding per-job memory
+    payloads = []
+    for i in range(count):
+        workflow = template.model_copy()
+        workflow.external_memory = {**template.external_memory, "topic_1": f"topic {i}"}
+        payloads.append(workflow.to_json(compact=True))
+    print(f"{count} workflows, {sum(map(len, payloads)) / count:.0f} JSON bytes each")
+
+    sample = Workflow.from_json(payloads[0])
+    print("footprint            ", footprint(sample))
+    print("footprint (slim)     ", footprint(slim_workflow(sample)))
+
+    for label, load in (
+        ("from_json", lambda i: Workflow.from_json(payloads[i])),
+        ("+ slim_workflow", lambda i: slim_workflow(Workflow.from_json(payloads[i]))),
+    ):
+        gc.collect()
+        start = time.perf_counter()
+        per_workflow = measure_resident(load, count)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:20s} {per_workflow:9.0f} B/workflow  "
+            f"{per_workflow * count / 2**20:8.1f}MiB resident  ({elapsed:.1f}s, traced)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Hashing throughput for workflows with large memories.
+"""
+
+from _common import make_workflow, timeit
+from dria_workflows import workflow_hash
+from dria_workflows.workflows.hashing import canonical_json
+
+
+def main():
+    for memory_items, item_size in [(10, 200), (1000, 1000), (20000, 1000)]:
+        workflow = make_workflow(10, memory_items, item_size)
+        number = max(1, 200 // memory_items)
+        for options in ({}, {"include_memory": False}):
+            size = len(canonical_json(workflow, **options))
+            seconds = timeit(lambda: workflow_hash(workflow, **options), number=number)
+            label = "with memory" if not options else "without memory"
+            print(
+                f"memory={memory_items:6d}x{item_size}B {label:15s} "
+                f"{seconds * 1e3:8.3f}ms/hash {size / seconds / 2**20:8.1f}MiB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Prompt growth of the README search loop: `Push` + `GetAll` history versus
+`CappedPush` + `Slice.last`, as bounded by `estimate_tokens` for growing `max_steps`.
+
+    python benchmarks/bench_history.py [window]
+"""
+
+import sys
+
+import _common  # noqa: F401  (sets up the import path)
+
+from dria_workflows import (
+    CappedPush,
+    ConditionBuilder,
+    Edge,
+    Expression,
+    GetAll,
+    Operator,
+    Push,
+    Read,
+    Slice,
+    WorkflowBuilder,
+    Write,
+    estimate_tokens,
+)
+
+
+def search_loop(window: int = 0):
+    builder = WorkflowBuilder(memory={"topic_1": "Linear Algebra", "topic_2": "CUDA"})
+    builder.generative_step(
+        id="create_query",
+        prompt="Write down a search query related to following topics: {{topic_1}} and "
+        "{{topic_2}}. If any, avoid asking questions asked before: {{history}}",
+        operator=Operator.GENERATION,
+        inputs=[
+            Slice.last("history", window, False) if window else GetAll.new("history", False)
+        ],
+        outputs=[Write.new("search_query")],
+    )
+    builder.generative_step(
+        id="search",
+        prompt="Find the answer to this question: {{search_query}}",
+        operator=Operator.FUNCTION_CALLING,
+        outputs=[
+            Write.new("result"),
+            CappedPush.new("history", window) if window else Push.new("history"),
+        ],
+    )
+    builder.flow(
+        [
+            Edge(source="create_query", target="search"),
+            Edge(
+                source="search",
+                target="_end",
+                condition=ConditionBuilder.build(
+                    expected="Yes",
+                    expression=Expression.CONTAINS,
+                    input=Read.new("result", True),
+                    target_if_not="create_query",
+                ),
+            ),
+        ]
+    )
+    builder.set_return_value("result")
+    return builder.build()
+
+
+def main():
+    window = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"create_query prompt tokens (bound), window {window}, 512-token outputs")
+    for max_steps in (10, 50, 200, 1000):
+        sizes = []
+        for workflow in (search_loop(), search_loop(window)):
+            workflow.config.max_steps = max_steps
+            estimate = estimate_tokens(workflow)
+            sizes.append((estimate.prompt["create_query"], estimate.total_bound))
+        (full, full_total), (capped, capped_total) = sizes
+        print(
+            f"  max_steps {max_steps:5d}: GetAll {full:7d} ({full_total:9d} per run)  "
+            f"window {capped:6d} ({capped_total:8d} per run)"
+        )
+
+
+if __name__ == "__main__":
+    main()
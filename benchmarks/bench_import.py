@@ -0,0 +1,64 @@
+"""
+Import time of the package, measured with `python -X importtime` in fresh processes.
+
+Exits with status 1 if a statement exceeds its target, so it can be used as a check.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# statement -> target in milliseconds (best of RUNS)
+TARGETS = {
+    "import dria_workflows": 50,
+    "from dria_workflows import WorkflowBuilder": 400,
+    "from dria_workflows import validate_workflow_json": 600,
+}
+RUNS = 5
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_time(statement: str) -> float:
+    """
+    Cumulative import time in ms of the top-level modules imported by `statement`
+    (the interpreter's own startup is excluded).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    seen_startup = False
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, name = match.groups()
+        # interpreter startup imports come first and end with `site`
+        if not seen_startup:
+            seen_startup = name == "site"
+            continue
+        if not line.split("|")[2].startswith("  "):
+            total += int(cumulative)
+    return total / 1000
+
+
+def main():
+    failed = False
+    for statement, target in TARGETS.items():
+        best = min(import_time(statement) for _ in range(RUNS))
+        ok = best <= target
+        failed |= not ok
+        print(f"{statement:55s} {best:8.1f}ms  (target {target}ms) {'ok' if ok else 'SLOW'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
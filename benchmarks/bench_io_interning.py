@@ -0,0 +1,42 @@
+"""
+Build time and retained memory of workflows with many tasks reading the same few keys.
+"""
+
+import gc
+import time
+import tracemalloc
+
+from _common import make_workflow
+from dria_workflows import GetAll, Read, Write
+
+
+def measure(label, func):
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:40s} {elapsed * 1e3:9.2f}ms  retained {current / 2**20:7.2f}MiB")
+    return result
+
+
+def main():
+    n = 100_000
+    measure(
+        f"{n} Read/GetAll/Write.new calls",
+        lambda: [
+            (Read.new(f"key_{i % 8}", True), GetAll.new("history", False), Write.new("out"))
+            for i in range(n)
+        ],
+    )
+    for n_tasks in (1000, 5000):
+        measure(f"build {n_tasks} tasks", lambda: make_workflow(n_tasks, 10, 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Graph queries on a Workflow's model lists vs. its compiled IR.
+"""
+
+import random
+import time
+from collections import deque
+
+from _common import make_workflow
+
+
+def naive_successors(workflow, task_id):
+    targets = []
+    for edge in workflow.steps:
+        if edge.source == task_id:
+            targets.append(edge.target)
+            if edge.condition is not None:
+                targets.append(edge.condition.target_if_not)
+            if edge.fallback is not None:
+                targets.append(edge.fallback)
+    return targets
+
+
+def naive_reachable(workflow):
+    seen = {workflow.tasks[0].id}
+    queue = deque(seen)
+    while queue:
+        for target in naive_successors(workflow, queue.popleft()):
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    for n_tasks in (1000, 10_000, 20_000):
+        workflow = make_workflow(n_tasks, 10, 100)
+        ids = [task.id for task in workflow.tasks]
+        sample = random.Random(0).sample(ids, 200)
+
+        lower, ir = timed(workflow.compile)
+        print(f"tasks={n_tasks}: compile {lower * 1e3:.1f}ms")
+
+        naive, _ = timed(lambda: [next(t for t in workflow.tasks if t.id == i) for i in sample])
+        fast, _ = timed(lambda: [ir.tasks[ir.task_index(i)] for i in sample])
+        print(f"  200 tasks by id       scan {naive * 1e3:9.2f}ms   ir {fast * 1e3:7.3f}ms")
+
+        naive, _ = timed(lambda: [naive_successors(workflow, i) for i in sample])
+        fast, _ = timed(lambda: [ir.successors(ir.task_index(i)) for i in sample])
+        print(f"  200 successor lists   scan {naive * 1e3:9.2f}ms   ir {fast * 1e3:7.3f}ms")
+
+        if n_tasks <= 1000:
+            naive, expected = timed(lambda: naive_reachable(workflow), repeat=1)
+            fast, flags = timed(ir.reachable)
+            assert {ir.tasks[i].id for i, f in enumerate(flags) if f} == expected
+            print(f"  reachability          scan {naive * 1e3:9.2f}ms   ir {fast * 1e3:7.3f}ms")
+        else:
+            fast, _ = timed(ir.reachable)
+            print(f"  reachability          ir {fast * 1e3:.3f}ms (scan is quadratic, skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Static step/time analysis and Monte Carlo simulation of looping workflows.
+"""
+
+from _common import make_workflow, timeit
+
+from dria_workflows import analyze_limits, simulate_limits
+
+
+def main():
+    for n_tasks in (3, 100, 2000):
+        workflow = make_workflow(n_tasks, 1, 10)
+        analysis = analyze_limits(workflow)
+        static = timeit(lambda: analyze_limits(workflow), repeat=3)
+        print(
+            f"{n_tasks} tasks: steps {analysis.shortest_steps}..{analysis.longest_steps}, "
+            f"{len(analysis.loops)} loop(s), recommended max_steps={analysis.max_steps} "
+            f"max_time={analysis.max_time}s  ({static * 1000:.1f} ms)"
+        )
+
+        runs = 10000 if n_tasks < 1000 else 200
+        simulation = simulate_limits(
+            workflow, {f"task_{n_tasks - 1}": 0.7}, runs=runs, seed=0
+        )
+        elapsed = timeit(
+            lambda: simulate_limits(workflow, {f"task_{n_tasks - 1}": 0.7}, runs=runs),
+            repeat=3,
+        )
+        steps, time = simulation.recommend()
+        print(
+            f"  {runs} simulated runs: p50 {simulation.percentile(50)}, "
+            f"p99 {simulation.percentile(99)}, recommend max_steps={steps} "
+            f"max_time={time}s, {simulation.truncated} truncated  "
+            f"({elapsed * 1000:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Compare loading a saved workflow from JSON text vs. from already decoded data.
+
+There is no trusted (`model_construct`) path to compare: building the models in python
+without validation measured slower than pydantic's validation, so it was dropped.
+"""
+
+import json
+
+from _common import Workflow, make_workflow, timeit
+
+
+def main():
+    for n_tasks, memory_items in [(10, 10), (100, 100), (1000, 1000)]:
+        data = make_workflow(n_tasks, memory_items).model_dump_json(
+            exclude_unset=True, exclude_none=True
+        )
+        number = max(1, 2000 // n_tasks)
+        from_json = timeit(lambda: Workflow.from_json(data), number=number)
+        from_dict = timeit(lambda: Workflow.from_dict(json.loads(data)), number=number)
+        print(
+            f"tasks={n_tasks:5d} bytes={len(data):9d} "
+            f"from_json={from_json * 1e3:8.3f}ms "
+            f"json.loads+from_dict={from_dict * 1e3:8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Summarizing each element of a list: a hand-written Pop loop versus `map_step`.
+
+Steps are the tasks a run executes. Rounds and time assume an executor that runs each
+of `config.parallel_groups` concurrently, with 10 s per generation.
+
+    python benchmarks/bench_map.py [elements] [parallelism]
+"""
+
+import sys
+
+from _common import timeit
+
+from dria_workflows import (
+    ConditionBuilder,
+    Edge,
+    Expression,
+    Operator,
+    Pop,
+    Push,
+    Size,
+    WorkflowBuilder,
+    Write,
+    parallel_plan,
+)
+
+
+def pop_loop(documents):
+    builder = WorkflowBuilder(memory={"documents": documents})
+    builder.generative_step(
+        id="summarize",
+        prompt="Summarize {{documents}}",
+        operator=Operator.GENERATION,
+        inputs=[Pop.new("documents", True)],
+        outputs=[Push.new("summaries")],
+    )
+    builder.generative_step(
+        id="combine",
+        prompt="Combine {{summaries}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("report")],
+    )
+    builder.flow(
+        [
+            Edge(
+                source="summarize",
+                target="combine",
+                condition=ConditionBuilder.build(
+                    expected=0,
+                    expression=Expression.EQUAL,
+                    input=Size.new("documents", True),
+                    target_if_not="summarize",
+                ),
+            ),
+            Edge(source="combine", target="_end"),
+        ]
+    )
+    builder.set_return_value("report")
+    return builder.build()
+
+
+def mapped(documents, parallelism):
+    builder = WorkflowBuilder(memory={"documents": documents})
+    builder.map_step(
+        "documents", "Summarize {{documents}}", "summary", parallelism=parallelism
+    )
+    builder.reduce_step(
+        "Combine {{summary}}", id="combine", outputs=[Write.new("report")]
+    )
+    builder.flow(
+        [
+            Edge(source=f"summary_{len(documents) - 1}", target="combine"),
+            Edge(source="combine", target="_end"),
+        ]
+    )
+    builder.set_return_value("report")
+    return builder.build()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    parallelism = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    documents = [f"document {i}" for i in range(n)]
+
+    # the loop is one barrier task run once per element, then the combining task
+    loop_time = 10.0 * (n + 1)
+    print(f"{n} elements, parallelism {parallelism}")
+    print(
+        f"  pop loop   build {timeit(lambda: pop_loop(documents)) * 1000:6.1f} ms  "
+        f"steps {n + 1:5d}  rounds {n + 1:5d}  time {loop_time:7.0f} s"
+    )
+    workflow = mapped(documents, parallelism)
+    plan = parallel_plan(workflow)
+    groups = workflow.config.parallel_groups
+    rounds_time = 10.0 * len(groups)
+    print(
+        f"  map_step   build {timeit(lambda: mapped(documents, parallelism)) * 1000:6.1f} ms  "
+        f"steps {len(plan.levels):5d}  rounds {len(groups):5d}  time {rounds_time:7.0f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
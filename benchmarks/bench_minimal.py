@@ -0,0 +1,62 @@
+"""
+Dispatch payload sizes: full, compact and minimal JSON.
+"""
+
+from _common import make_workflow, timeit
+
+from dria_workflows import Edge, Operator, WorkflowBuilder, Write, minimal_json, payload_savings
+
+INSTRUCTIONS = (
+    "You are an expert technical writer. Use plain language, short sentences and "
+    "concrete examples. Do not repeat the question. Subject: "
+)
+
+
+def readme_poem():
+    builder = WorkflowBuilder(memory={"topic": "the sea"})
+    builder.generative_step(
+        id="poem",
+        prompt="Write a short poem about {{topic}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("poem")],
+    )
+    builder.flow([Edge(source="poem", target="_end")])
+    builder.set_return_value("poem")
+    return builder.build()
+
+
+def shared_instructions(n_tasks: int):
+    builder = WorkflowBuilder(memory={"topic": "CUDA"})
+    for i in range(n_tasks):
+        builder.generative_step(
+            id=f"section_{i}",
+            prompt=INSTRUCTIONS + "{{topic}}" + f", section {i}.",
+            operator=Operator.GENERATION,
+            outputs=[Write.new(f"section_{i}")],
+        )
+    builder.flow(
+        [Edge(source=f"section_{i}", target=f"section_{i + 1}") for i in range(n_tasks - 1)]
+        + [Edge(source=f"section_{n_tasks - 1}", target="_end")]
+    )
+    builder.set_return_value(f"section_{n_tasks - 1}")
+    return builder.build()
+
+
+def main():
+    cases = {
+        "README poem (1 task)": readme_poem(),
+        "shared instructions (20 tasks)": shared_instructions(20),
+        "make_workflow(10 tasks)": make_workflow(10, 1, 20),
+    }
+    for name, workflow in cases.items():
+        sizes = payload_savings(workflow)
+        elapsed = timeit(lambda: minimal_json(workflow), repeat=5, number=20)
+        print(
+            f"{name:32s} full {sizes['full']:6d}  compact {sizes['compact']:6d}  "
+            f"minimal {sizes['minimal']:6d}  (-{sizes['saved'] / sizes['full']:.0%}, "
+            f"{elapsed * 1e6:.0f} us)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Dead-task elimination on generated workflows where only some tasks feed the result.
+"""
+
+import sys
+
+from _common import timeit
+
+from dria_workflows import Edge, Operator, WorkflowBuilder, Write, optimize_workflow
+
+
+def make_workflow(n_tasks: int, i: int):
+    # every third task feeds the chain to the result, the others write unread notes
+    builder = WorkflowBuilder(
+        memory={
+            "topic": f"topic {i}",
+            "background": "background " * 200,
+            "examples": [f"example {j} " * 20 for j in range(20)],
+        }
+    )
+    previous = None
+    for t in range(n_tasks):
+        live = t % 3 == 0
+        prompt = (
+            f"Step {t} on {{{{topic}}}}" + (f" after {{{{{previous}}}}}" if previous else "")
+            if live
+            else f"Note {t} on {{{{topic}}}} with {{{{background}}}} and {{{{examples}}}}"
+        )
+        builder.generative_step(
+            id=f"t{t}",
+            prompt=prompt,
+            operator=Operator.GENERATION,
+            outputs=[Write.new(f"out_{t}")],
+        )
+        if live:
+            previous = f"out_{t}"
+    builder.flow(
+        [Edge(source=f"t{t}", target=f"t{t + 1}") for t in range(n_tasks - 1)]
+        + [Edge(source=f"t{n_tasks - 1}", target="_end")]
+    )
+    builder.set_return_value(previous)
+    return builder.build()
+
+
+def main(count: int = 200, n_tasks: int = 30):
+    workflows = [make_workflow(n_tasks, i) for i in range(count)]
+    reports = [optimize_workflow(workflow)[1] for workflow in workflows]
+    before = sum(report.bytes_before for report in reports)
+    after = sum(report.bytes_after for report in reports)
+    calls = sum(report.llm_calls_saved for report in reports)
+    elapsed = timeit(lambda: [optimize_workflow(w) for w in workflows], repeat=3)
+    print(f"{count} workflows x {n_tasks} tasks")
+    print(f"  LLM calls per batch  {count * n_tasks} -> {count * n_tasks - calls}")
+    print(f"  compact JSON         {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB")
+    print(f"  optimize             {elapsed * 1000 / count:.2f} ms per workflow")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,97 @@
+"""
+Jobs per second of single-step workflows dispatched one by one versus packed.
+
+The stand-in executor does the local work of a job: it validates and loads the
+payload, walks the steps writing a fake result per task and builds the return value.
+Queueing and node setup are not local, so they are added as a fixed `overhead` in
+milliseconds per job (default 50; pass 0 to measure local work only).
+
+    python benchmarks/bench_pack.py [workflows] [pack size] [overhead ms]
+"""
+
+import json
+import sys
+import time
+
+import _common  # noqa: F401  (sets up the import path)
+
+from dria_workflows import (
+    Edge,
+    Operator,
+    Workflow,
+    WorkflowBuilder,
+    Write,
+    pack_workflows,
+    unpack_result,
+    validate_workflow_json,
+)
+
+
+def readme_poem(topic: str) -> Workflow:
+    builder = WorkflowBuilder(memory={"topic": topic})
+    builder.generative_step(
+        id="poem",
+        prompt="Write a short poem about {{topic}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("poem")],
+    )
+    builder.flow([Edge(source="poem", target="_end")])
+    builder.set_return_value("poem")
+    return builder.build()
+
+
+def execute(payload: bytes) -> bytes:
+    """
+    Run a workflow payload without models: every task writes "ok" to its outputs.
+    """
+    if not validate_workflow_json(payload):
+        raise ValueError("invalid workflow")
+    workflow = Workflow.from_dict(json.loads(payload))
+    memory = dict(workflow.external_memory or {})
+    ids = {task.id: task for task in workflow.tasks}
+    task = workflow.tasks[0]
+    edges = {edge.source: edge for edge in workflow.steps}
+    while task.operator != Operator.END:
+        for output in task.outputs:
+            memory[output.key] = "ok"
+        task = ids[edges[task.id].target]
+    values = workflow.return_value.input
+    if isinstance(values, list):
+        return json.dumps([memory.get(value.key) for value in values]).encode()
+    return str(memory.get(values.key)).encode()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    overhead = (float(sys.argv[3]) if len(sys.argv) > 3 else 50.0) / 1000
+    workflows = [readme_poem(f"topic {i}") for i in range(n)]
+
+    start = time.perf_counter()
+    for workflow in workflows:
+        execute(workflow.to_json())
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = []
+    for i in range(0, n, size):
+        packed, manifest = pack_workflows(workflows[i : i + size])
+        results.extend(unpack_result(execute(packed.to_json()), manifest))
+    packed_time = time.perf_counter() - start
+    assert results == ["ok"] * n
+    jobs = -(-n // size)
+
+    print(f"{n} workflows, packs of {size}, {overhead * 1000:.0f} ms overhead per job")
+    for name, local, count in (
+        ("one job each", single, n),
+        (f"{jobs} packed jobs", packed_time, jobs),
+    ):
+        total = local + count * overhead
+        print(
+            f"  {name:18s} local {local * 1000:8.1f} ms  total {total:8.2f} s  "
+            f"{n / total:9.1f} workflows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
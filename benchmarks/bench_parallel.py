@@ -0,0 +1,55 @@
+"""
+Dependency levels of generated workflows: several independent generations over base
+memory followed by a step that combines them, repeated in stages.
+"""
+
+from _common import timeit
+
+from dria_workflows import Edge, Operator, WorkflowBuilder, Write, parallel_plan
+
+
+def make_workflow(stages: int, width: int):
+    builder = WorkflowBuilder(memory={"topic": "CUDA", "audience": "students"})
+    ids = []
+    previous = None
+    for s in range(stages):
+        for w in range(width):
+            context = f" given {{{{{previous}}}}}" if previous else ""
+            builder.generative_step(
+                id=f"s{s}_w{w}",
+                prompt=f"Angle {w} on {{{{topic}}}} for {{{{audience}}}}{context}",
+                operator=Operator.GENERATION,
+                outputs=[Write.new(f"s{s}_w{w}")],
+            )
+            ids.append(f"s{s}_w{w}")
+        parts = " ".join(f"{{{{s{s}_w{w}}}}}" for w in range(width))
+        builder.generative_step(
+            id=f"s{s}_merge",
+            prompt=f"Combine {parts}",
+            operator=Operator.GENERATION,
+            outputs=[Write.new(f"s{s}_merge")],
+        )
+        ids.append(f"s{s}_merge")
+        previous = f"s{s}_merge"
+    builder.flow(
+        [Edge(source=a, target=b) for a, b in zip(ids, ids[1:])]
+        + [Edge(source=ids[-1], target="_end")]
+    )
+    builder.set_return_value(previous)
+    return builder.build()
+
+
+def main():
+    for stages, width in ((1, 4), (5, 8), (50, 20)):
+        workflow = make_workflow(stages, width)
+        plan = parallel_plan(workflow)
+        elapsed = timeit(lambda: parallel_plan(workflow), repeat=3)
+        print(
+            f"{len(workflow.tasks) - 1} tasks: {len(plan.groups)} groups, "
+            f"{plan.serial_time:.0f}s serial -> {plan.parallel_time:.0f}s, "
+            f"speedup {plan.speedup:.1f}x  ({elapsed * 1000:.2f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
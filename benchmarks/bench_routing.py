@@ -0,0 +1,72 @@
+"""
+Routing a batch of workflows of one template, each with its own memory.
+"""
+
+import sys
+
+from _common import timeit
+
+from dria_workflows import (
+    Edge,
+    Model,
+    ModelRouter,
+    Operator,
+    TokenEstimator,
+    WorkflowBuilder,
+    Write,
+)
+
+
+def make_template():
+    builder = WorkflowBuilder(memory={"topic": "", "documents": ["a document"]})
+    builder.generative_step(
+        id="summarize",
+        prompt="Summarize what these documents say about {{topic}}: {{documents}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("summary")],
+    )
+    builder.generative_step(
+        id="title",
+        prompt="Write a title for this summary: {{summary}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("title")],
+    )
+    builder.flow(
+        [Edge(source="summarize", target="title"), Edge(source="title", target="_end")]
+    )
+    builder.set_return_value("title")
+    return builder.build()
+
+
+def main(count: int = 5000):
+    template = make_template()
+    workflows = []
+    for i in range(count):
+        # prompts from a few hundred to about 12k tokens
+        workflow = template.model_copy()
+        workflow.external_memory = {
+            "topic": f"topic {i}",
+            "documents": [f"document {j} " + "lorem ipsum " * 40 for j in range(i % 100)],
+        }
+        workflows.append(workflow)
+
+    router = ModelRouter(models=[Model.PHI3_MEDIUM, Model.PHI3_MEDIUM_128K])
+    table = router.table(router.route_batch(workflows))
+    print(f"{count} workflows: " + ", ".join(
+        f"{model.name if model else None}: {len(positions)}"
+        for model, positions in table.items()
+    ))
+
+    def per_workflow():
+        # a fresh estimator for every workflow
+        for workflow in workflows:
+            TokenEstimator(workflow).estimate()
+
+    naive = timeit(per_workflow, repeat=3)
+    batch = timeit(lambda: ModelRouter(models=router.models).route_batch(workflows), repeat=3)
+    print(f"  estimate each workflow  {naive * 1000:8.1f} ms")
+    print(f"  route_batch             {batch * 1000:8.1f} ms  ({naive / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
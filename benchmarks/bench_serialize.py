@@ -0,0 +1,46 @@
+"""
+Compare the old two-pass dict/save paths with the single-pass serialization layer.
+"""
+
+import json
+import os
+import tempfile
+
+from _common import make_workflow, timeit
+from dria_workflows.workflows import serialization
+
+
+def old_to_dict(workflow):
+    return json.loads(workflow.model_dump_json(exclude_unset=True, exclude_none=True))
+
+
+def old_save(workflow, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(workflow.model_dump(exclude_unset=True, exclude_none=True), f, indent=2)
+
+
+def main():
+    print(f"json backend: {'orjson' if serialization.orjson else 'json'}")
+    path = os.path.join(tempfile.mkdtemp(), "workflow.json")
+    cases = {
+        "large memory": make_workflow(5, 20000, 500),
+        "long prompts": make_workflow(500, 10, 200),
+    }
+    for name, workflow in cases.items():
+        number = 5
+        results = {
+            "to_dict (dump_json+loads)": timeit(lambda: old_to_dict(workflow), number=number),
+            "to_dict (single pass)": timeit(lambda: workflow.to_dict(), number=number),
+            "save (model_dump+json.dump)": timeit(lambda: old_save(workflow, path), number=number),
+            "save": timeit(lambda: workflow.save(path), number=number),
+            "save compact": timeit(lambda: workflow.save(path, compact=True), number=number),
+        }
+        indented = serialization.to_json(workflow, indent=True)
+        compact = workflow.to_json(compact=True)
+        print(f"{name}: indented={len(indented)}B compact={len(compact)}B")
+        for label, seconds in results.items():
+            print(f"  {label:30s} {seconds * 1e3:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Bulk insert and metadata queries on a WorkflowStore.
+"""
+
+import os
+import tempfile
+import time
+
+from _common import make_workflow
+from dria_workflows import WorkflowStore
+
+
+def main():
+    n = 20000
+    path = os.path.join(tempfile.mkdtemp(), "workflows.db")
+    templates = [make_workflow(n_tasks, 20, 200) for n_tasks in (3, 5, 8)]
+    workflows = []
+    for i in range(n):
+        template = templates[i % len(templates)]
+        workflow = template.model_copy(deep=False)
+        workflow.external_memory = {**template.external_memory, f"key_{i % 50}": f"value {i}"}
+        workflows.append(workflow)
+
+    with WorkflowStore(path) as store:
+        start = time.perf_counter()
+        for i, workflow in enumerate(workflows[:1000]):
+            store.put(workflow, created=float(i))
+        elapsed = time.perf_counter() - start
+        print(f"put one by one: {elapsed / 1000 * 1e3:.3f}ms/workflow")
+
+        start = time.perf_counter()
+        hashes = store.put_many(workflows[1000:], created=1000.0)
+        elapsed = time.perf_counter() - start
+        print(f"put_many: {elapsed / len(hashes) * 1e3:.3f}ms/workflow")
+        print(f"{len(store)} workflows, {os.path.getsize(path) / 2**20:.1f}MiB")
+
+        start = time.perf_counter()
+        for digest in hashes[:1000]:
+            store.get(digest)
+        elapsed = time.perf_counter() - start
+        print(f"get: {elapsed / 1000 * 1e3:.3f}ms/workflow")
+
+        template = store.templates()[0][0]
+        for label, kwargs in (
+            ("template", {"template": template}),
+            ("time range", {"since": 100.0, "until": 600.0}),
+            ("memory key", {"memory_key": "key_7"}),
+        ):
+            start = time.perf_counter()
+            found = store.find(**kwargs)
+            print(f"find by {label}: {(time.perf_counter() - start) * 1e3:.2f}ms ({len(found)} hits)")
+
+
+if __name__ == "__main__":
+    main()
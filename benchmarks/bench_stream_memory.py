@@ -0,0 +1,51 @@
+"""
+Peak python memory of writing a workflow with a large external memory.
+"""
+
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _common import make_workflow
+
+
+def old_save(workflow, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(workflow.model_dump(exclude_unset=True, exclude_none=True), f, indent=2)
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    # tracing slows allocation down, so time and peak come from separate runs
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "workflow.json")
+    # ~100MB of memory entries
+    workflow = make_workflow(n_tasks=20, memory_items=100_000, item_size=1000)
+    cases = {
+        "model_dump + json.dump": lambda: old_save(workflow, path),
+        "save": lambda: workflow.save(path),
+        "save compact": lambda: workflow.save(path, compact=True),
+        "dump (streaming)": lambda: workflow.dump(path),
+    }
+    for label, func in cases.items():
+        peak, elapsed = measure(func)
+        size = os.path.getsize(path)
+        print(
+            f"{label:24s} file={size / 2**20:7.1f}MiB "
+            f"peak={peak / 2**20:8.2f}MiB time={elapsed:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Composing a workflow from copies of a query -> search -> evaluate fragment: builder
+calls per copy versus inlining one `SubWorkflow`.
+
+    python benchmarks/bench_subworkflow.py [copies]
+"""
+
+import sys
+from typing import List
+
+from _common import timeit
+
+from dria_workflows import (
+    ConditionBuilder,
+    Edge,
+    Expression,
+    Operator,
+    Read,
+    SubWorkflow,
+    WorkflowBuilder,
+    Write,
+)
+
+GUIDE = "Prefer primary sources, recent results and concrete numbers. " * 20
+
+
+def add_fragment(builder: WorkflowBuilder, prefix: str, next: str) -> List[Edge]:
+    """
+    The copy-paste way: the fragment's builder calls with hand-prefixed ids and keys.
+    Returns the edges, to add once `next` exists.
+    """
+    builder.generative_step(
+        id=f"{prefix}_query",
+        prompt=f"Write a search query about {{{{{prefix}_topic}}}}. {{{{{prefix}_guide}}}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new(f"{prefix}_query")],
+    )
+    builder.search_step(
+        id=f"{prefix}_search",
+        search_query=f"{{{{{prefix}_query}}}}",
+        outputs=[Write.new(f"{prefix}_results")],
+    )
+    builder.generative_step(
+        id=f"{prefix}_evaluate",
+        prompt=f"Do {{{{{prefix}_results}}}} answer {{{{{prefix}_query}}}}? Yes or No.",
+        operator=Operator.GENERATION,
+        outputs=[Write.new(f"{prefix}_verdict")],
+    )
+    return [
+        Edge(source=f"{prefix}_query", target=f"{prefix}_search"),
+        Edge(source=f"{prefix}_search", target=f"{prefix}_evaluate"),
+        Edge(
+            source=f"{prefix}_evaluate",
+            target=next,
+            condition=ConditionBuilder.build(
+                expected="Yes",
+                expression=Expression.CONTAINS,
+                input=Read.new(f"{prefix}_verdict", True),
+                target_if_not=f"{prefix}_query",
+            ),
+        ),
+    ]
+
+
+def fragment_builder() -> WorkflowBuilder:
+    builder = WorkflowBuilder(memory={"f_topic": "", "f_guide": GUIDE})
+    builder.flow(add_fragment(builder, "f", "_end"))
+    return builder
+
+
+def copy_paste(n: int):
+    memory = {}
+    for i in range(n):
+        memory[f"c{i}_topic"] = f"topic {i}"
+        memory[f"c{i}_guide"] = GUIDE
+    builder = WorkflowBuilder(memory=memory)
+    edges = []
+    for i in range(n):
+        edges += add_fragment(builder, f"c{i}", f"c{i + 1}_query" if i + 1 < n else "_end")
+    builder.flow(edges)
+    return builder.build()
+
+
+def inlined(fragment: SubWorkflow, n: int):
+    builder = WorkflowBuilder(memory={f"c{i}_topic": f"topic {i}" for i in range(n)})
+    for i in range(n):
+        builder.inline(
+            fragment,
+            f"c{i}",
+            bind={"f_topic": f"c{i}_topic"},
+            next=f"c{i + 1}_f_query" if i + 1 < n else "_end",
+        )
+    return builder.build()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fragment = SubWorkflow("research", fragment_builder())
+    for name, build in (
+        ("copy-paste", lambda: copy_paste(n)),
+        ("inline", lambda: inlined(fragment, n)),
+    ):
+        elapsed = timeit(build, repeat=5, number=1)
+        workflow = build()
+        print(
+            f"{name:10s} {n} copies, {len(workflow.tasks)} tasks: build {elapsed * 1000:7.1f} ms, "
+            f"{len(workflow.to_json(compact=True)) / 1e6:.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Token estimates over a batch of memories: render-and-tokenize vs. TokenEstimator.
+"""
+
+import json
+import re
+import sys
+
+from _common import make_workflow, timeit
+
+from dria_workflows import TokenEstimator, heuristic_tokens
+
+VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def naive(workflow, memories):
+    # substitute every variable into every prompt, then tokenize the full text
+    results = []
+    for memory in memories:
+        prompts = {}
+        for task in workflow.tasks:
+            total = 0
+            for message in task.messages:
+                text = VARIABLE.sub(
+                    lambda m: json.dumps(memory[m.group(1)])
+                    if isinstance(memory.get(m.group(1)), list)
+                    else memory.get(m.group(1), m.group(0)),
+                    message.content,
+                )
+                total += heuristic_tokens(text)
+            prompts[task.id] = total
+        results.append(prompts)
+    return results
+
+
+def main(count: int = 2000):
+    workflow = make_workflow(10, 20, 200)
+    base = workflow.external_memory
+    memories = [
+        {**base, "topic_1": f"topic {i}", "topic_2": f"subject {i % 50}"}
+        for i in range(count)
+    ]
+    estimator = TokenEstimator(workflow, context_limit=8192)
+    estimates = estimator.estimate_batch(memories)
+    print(f"{count} memories x {len(workflow.tasks)} tasks")
+    print(f"  worst path {estimates[0].worst_path_tokens} tokens, "
+          f"over limit: {len(estimates[0].over_limit)} tasks")
+    render = timeit(lambda: naive(workflow, memories), repeat=3)
+    batch = timeit(lambda: estimator.estimate_batch(memories), repeat=3)
+    setup = timeit(lambda: TokenEstimator(workflow), repeat=3)
+    print(f"  render + tokenize  {render * 1000:8.1f} ms")
+    print(f"  estimate_batch     {batch * 1000:8.1f} ms  ({render / batch:.1f}x)")
+    print(f"  estimator setup    {setup * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,17 +1,82 @@
-import logging
-from .workflows import *
-from .validate import validate_workflow_json
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Everything is loaded on first access: `import dria_workflows` is cheap and
+# `from dria_workflows import WorkflowBuilder` only loads the models it needs.
+# Logging is left to the application.
+
+if TYPE_CHECKING:
+    from .workflows import *
+    from .validate import validate_workflow_json
+
+
+def __getattr__(name: str):
+    if name in ("workflows", "validate"):
+        return import_module(f".{name}", __name__)
+    if name == "validate_workflow_json":
+        module = import_module(".validate", __name__)
+    elif name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    else:
+        module = import_module(".workflows", __name__)
+        if name not in module.__all__:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
 __all__ = [
     "Expression",
     "validate_workflow_json",
     "Workflow",
+    "BundleWriter",
+    "BundleReader",
+    "WorkflowCorpus",
+    "write_jsonl",
+    "workflow_hash",
+    "canonical_json",
+    "deduplicate",
+    "WorkflowStore",
+    "CompiledWorkflow",
+    "compile_workflow",
+    "footprint",
+    "slim_workflow",
+    "measure_resident",
+    "TokenEstimator",
+    "TokenEstimate",
+    "estimate_tokens",
+    "heuristic_tokens",
+    "ModelRouter",
+    "ModelProfile",
+    "Route",
+    "MODEL_PROFILES",
+    "analyze_limits",
+    "simulate_limits",
+    "StepAnalysis",
+    "Simulation",
+    "Loop",
+    "OPERATOR_LATENCY",
+    "optimize_workflow",
+    "OptimizationReport",
+    "parallel_plan",
+    "annotate_parallel",
+    "ParallelPlan",
+    "minimal_dict",
+    "minimal_json",
+    "payload_savings",
+    "pack_workflows",
+    "unpack_result",
+    "PackManifest",
+    "SubWorkflow",
     "WorkflowBuilder",
     "ConditionBuilder",
+    "BuildCache",
+    "CachedWorkflowBuilder",
     "Config",
     "Task",
     "Edge",
@@ -29,10 +94,12 @@ __all__ = [
     "Peek",
     "GetAll",
     "Size",
+    "Slice",
     "String",
     "Write",
     "Insert",
     "Push",
+    "CappedPush",
     "NousParser",
     "LlamaParser",
     "OpenAIParser",
@@ -40,4 +107,5 @@ __all__ = [
     "CustomTool",
     "HttpRequestTool",
     "HttpMethod",
+    "ToolResultCache",
 ]
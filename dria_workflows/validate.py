@@ -29,6 +29,10 @@ schema = {
                     },
                 },
                 "max_tokens": {"type": ["integer", "null"], "minimum": 0},
+                "parallel_groups": {
+                    "type": ["array", "null"],
+                    "items": {"type": "array", "items": {"type": "string"}},
+                },
             },
             "required": ["max_steps", "max_time"],
         },
@@ -82,9 +86,11 @@ schema = {
                                                 "get_all",
                                                 "size",
                                                 "string",
+                                                "slice",
                                             ],
                                         },
                                         "index": {"type": ["integer", "null"]},
+                                        "end": {"type": ["integer", "null"]},
                                         "search_query": {
                                             "type": "object",
                                             "properties": {
@@ -98,6 +104,7 @@ schema = {
                                                         "get_all",
                                                         "size",
                                                         "string",
+                                                        "slice",
                                                     ],
                                                 },
                                                 "key": {"type": "string"},
@@ -132,12 +139,16 @@ schema = {
                             "properties": {
                                 "type": {
                                     "type": "string",
-                                    "enum": ["write", "insert", "push"],
+                                    "enum": ["write", "insert", "push", "capped_push"],
                                 },
                                 "key": {"type": "string"},
                                 "value": {"type": "string"},
+                                "max_length": {"type": "integer", "minimum": 1},
                             },
                             "required": ["type", "key", "value"],
+                            "if": {"properties": {"type": {"const": "capped_push"}}},
+                            "then": {"required": ["max_length"]},
+                            "else": {"not": {"required": ["max_length"]}},
                         },
                     },
                 },
@@ -167,6 +178,7 @@ schema = {
                                             "get_all",
                                             "size",
                                             "string",
+                                            "slice",
                                         ],
                                     },
                                     "key": {"type": "string"},
@@ -221,6 +233,7 @@ schema = {
                                         "get_all",
                                         "size",
                                         "string",
+                                        "slice",
                                     ],
                                 },
                                 "key": {"type": "string"},
@@ -243,6 +256,7 @@ schema = {
                                             "get_all",
                                             "size",
                                             "string",
+                                            "slice",
                                         ],
                                     },
                                     "key": {"type": "string"},
@@ -1,16 +1,10 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from .workflow import Workflow
 from .builder import WorkflowBuilder, ConditionBuilder
 from .interface import Config, Task, Edge, TaskOutput, Condition
-from .tools import (
-    NousParser,
-    LlamaParser,
-    OpenAIParser,
-    CustomTool,
-    ParseResult,
-    HttpMethod,
-    HttpRequestTool,
-    CustomToolTemplate,
-)
+from .tools import CustomTool, HttpMethod, HttpRequestTool, CustomToolTemplate
 from .w_types import (
     InputValueType,
     OutputType,
@@ -20,12 +14,143 @@ from .w_types import (
     Model,
     ModelProvider,
 )
-from .io import Read, Pop, Peek, GetAll, Size, String, Write, Insert, Push
+from .io import Read, Pop, Peek, GetAll, Size, Slice, String, Write, Insert, Push, CappedPush
+
+# Loaded on first access, so that importing the models does not pay for
+# parsers, storage backends and their stdlib dependencies.
+_LAZY = {
+    "BundleWriter": ".bundle",
+    "BundleReader": ".bundle",
+    "WorkflowCorpus": ".corpus",
+    "write_jsonl": ".corpus",
+    "workflow_hash": ".hashing",
+    "canonical_json": ".hashing",
+    "deduplicate": ".hashing",
+    "WorkflowStore": ".store",
+    "CompiledWorkflow": ".ir",
+    "compile_workflow": ".ir",
+    "footprint": ".footprint",
+    "slim_workflow": ".footprint",
+    "measure_resident": ".footprint",
+    "TokenEstimator": ".tokens",
+    "TokenEstimate": ".tokens",
+    "estimate_tokens": ".tokens",
+    "heuristic_tokens": ".tokens",
+    "ModelRouter": ".routing",
+    "ModelProfile": ".routing",
+    "Route": ".routing",
+    "MODEL_PROFILES": ".routing",
+    "analyze_limits": ".limits",
+    "simulate_limits": ".limits",
+    "StepAnalysis": ".limits",
+    "Simulation": ".limits",
+    "Loop": ".limits",
+    "OPERATOR_LATENCY": ".limits",
+    "optimize_workflow": ".optimize",
+    "OptimizationReport": ".optimize",
+    "parallel_plan": ".parallel",
+    "annotate_parallel": ".parallel",
+    "ParallelPlan": ".parallel",
+    "minimal_dict": ".minimal",
+    "minimal_json": ".minimal",
+    "payload_savings": ".minimal",
+    "pack_workflows": ".pack",
+    "unpack_result": ".pack",
+    "PackManifest": ".pack",
+    "SubWorkflow": ".subworkflow",
+    "BuildCache": ".build_cache",
+    "CachedWorkflowBuilder": ".build_cache",
+    "NousParser": ".tools",
+    "LlamaParser": ".tools",
+    "OpenAIParser": ".tools",
+    "ParseResult": ".tools",
+    "ToolResultCache": ".tools",
+}
+
+if TYPE_CHECKING:
+    from .bundle import BundleWriter, BundleReader
+    from .corpus import WorkflowCorpus, write_jsonl
+    from .hashing import workflow_hash, canonical_json, deduplicate
+    from .store import WorkflowStore
+    from .ir import CompiledWorkflow, compile_workflow
+    from .footprint import footprint, slim_workflow, measure_resident
+    from .tokens import TokenEstimator, TokenEstimate, estimate_tokens, heuristic_tokens
+    from .routing import ModelRouter, ModelProfile, Route, MODEL_PROFILES
+    from .limits import (
+        analyze_limits,
+        simulate_limits,
+        StepAnalysis,
+        Simulation,
+        Loop,
+        OPERATOR_LATENCY,
+    )
+    from .optimize import optimize_workflow, OptimizationReport
+    from .parallel import parallel_plan, annotate_parallel, ParallelPlan
+    from .minimal import minimal_dict, minimal_json, payload_savings
+    from .pack import pack_workflows, unpack_result, PackManifest
+    from .subworkflow import SubWorkflow
+    from .build_cache import BuildCache, CachedWorkflowBuilder
+    from .tools import NousParser, LlamaParser, OpenAIParser, ParseResult, ToolResultCache
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "Workflow",
+    "BundleWriter",
+    "BundleReader",
+    "WorkflowCorpus",
+    "write_jsonl",
+    "workflow_hash",
+    "canonical_json",
+    "deduplicate",
+    "WorkflowStore",
+    "CompiledWorkflow",
+    "compile_workflow",
+    "footprint",
+    "slim_workflow",
+    "measure_resident",
+    "TokenEstimator",
+    "TokenEstimate",
+    "estimate_tokens",
+    "heuristic_tokens",
+    "ModelRouter",
+    "ModelProfile",
+    "Route",
+    "MODEL_PROFILES",
+    "analyze_limits",
+    "simulate_limits",
+    "StepAnalysis",
+    "Simulation",
+    "Loop",
+    "OPERATOR_LATENCY",
+    "optimize_workflow",
+    "OptimizationReport",
+    "parallel_plan",
+    "annotate_parallel",
+    "ParallelPlan",
+    "minimal_dict",
+    "minimal_json",
+    "payload_savings",
+    "pack_workflows",
+    "unpack_result",
+    "PackManifest",
+    "SubWorkflow",
     "WorkflowBuilder",
     "ConditionBuilder",
+    "BuildCache",
+    "CachedWorkflowBuilder",
     "Config",
     "Task",
     "Edge",
@@ -43,10 +168,12 @@ __all__ = [
     "Peek",
     "GetAll",
     "Size",
+    "Slice",
     "String",
     "Write",
     "Insert",
     "Push",
+    "CappedPush",
     "NousParser",
     "LlamaParser",
     "OpenAIParser",
@@ -55,4 +182,5 @@ __all__ = [
     "HttpRequestTool",
     "HttpMethod",
     "CustomToolTemplate",
+    "ToolResultCache",
 ]
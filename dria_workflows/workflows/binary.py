@@ -0,0 +1,192 @@
+import struct
+from collections import Counter
+from typing import Any, Dict, List, Tuple, Union
+
+# Compact binary encoding of workflows.
+#
+# Layout: MAGIC, varint string count, the strings (varint length + UTF-8), then
+# a single tagged value. Dict keys are always string table references, and
+# string values that repeat (operators, input types, "__result", memory keys,
+# task ids, identical prompts, ...) are stored once and referenced by index. Integers are zigzag
+# varints.
+
+MAGIC = b"DWB\x01"
+
+_NULL = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_REF = 6
+_LIST = 7
+_DICT = 8
+
+_pack_float = struct.Struct("<d").pack
+_unpack_float = struct.Struct("<d").unpack_from
+
+
+def encode(obj: Any) -> bytes:
+    """
+    Encode JSON-compatible python data to the compact binary format.
+
+    Args:
+        obj (Any): dicts with string keys, lists, strings, numbers, booleans and None.
+
+    Returns:
+        bytes: The encoded document.
+    """
+    counts: Counter = Counter()
+    keys = set()
+    _count_strings(obj, counts, keys)
+    strings = [s for s in counts if s in keys or counts[s] > 1]
+    table = {s: i for i, s in enumerate(strings)}
+
+    out = bytearray(MAGIC)
+    _write_varint(out, len(strings))
+    for s in strings:
+        raw = s.encode("utf-8")
+        _write_varint(out, len(raw))
+        out += raw
+    _encode_value(obj, out, table)
+    return bytes(out)
+
+
+def decode(data: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode a document produced by `encode` back into python data.
+
+    Raises:
+        ValueError: If the data is not a complete document.
+    """
+    view = memoryview(data)
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary workflow document")
+    try:
+        pos = len(MAGIC)
+        count, pos = _read_varint(view, pos)
+        strings = []
+        for _ in range(count):
+            length, pos = _read_varint(view, pos)
+            strings.append(_read_str(view, pos, length))
+            pos += length
+        value, pos = _decode_value(view, pos, strings)
+    except (IndexError, struct.error):
+        raise ValueError("truncated workflow binary") from None
+    if pos != len(view):
+        raise ValueError("Trailing data after binary workflow document")
+    return value
+
+
+def _count_strings(obj: Any, counts: Counter, keys: set) -> None:
+    if isinstance(obj, str):
+        counts[obj] += 1
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            counts[key] += 1
+            keys.add(key)
+            _count_strings(value, counts, keys)
+    elif isinstance(obj, list):
+        for item in obj:
+            _count_strings(item, counts, keys)
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(view: memoryview, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode_value(obj: Any, out: bytearray, table: Dict[str, int]) -> None:
+    if isinstance(obj, str):
+        index = table.get(obj)
+        if index is not None:
+            out.append(_REF)
+            _write_varint(out, index)
+        else:
+            raw = obj.encode("utf-8")
+            out.append(_STR)
+            _write_varint(out, len(raw))
+            out += raw
+    elif isinstance(obj, dict):
+        out.append(_DICT)
+        _write_varint(out, len(obj))
+        for key, value in obj.items():
+            _write_varint(out, table[key])
+            _encode_value(value, out, table)
+    elif isinstance(obj, list):
+        out.append(_LIST)
+        _write_varint(out, len(obj))
+        for item in obj:
+            _encode_value(item, out, table)
+    elif obj is None:
+        out.append(_NULL)
+    elif obj is True:
+        out.append(_TRUE)
+    elif obj is False:
+        out.append(_FALSE)
+    elif isinstance(obj, int):
+        out.append(_INT)
+        _write_varint(out, (obj << 1) if obj >= 0 else ((-obj << 1) - 1))
+    elif isinstance(obj, float):
+        out.append(_FLOAT)
+        out += _pack_float(obj)
+    else:
+        raise TypeError(f"Cannot encode value of type {type(obj).__name__}")
+
+
+def _read_str(view: memoryview, pos: int, length: int) -> str:
+    if pos + length > len(view):
+        # slicing would silently return a shorter string
+        raise IndexError(pos + length)
+    return str(view[pos : pos + length], "utf-8")
+
+
+def _decode_value(view: memoryview, pos: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = view[pos]
+    pos += 1
+    if tag == _REF:
+        index, pos = _read_varint(view, pos)
+        return strings[index], pos
+    if tag == _STR:
+        length, pos = _read_varint(view, pos)
+        return _read_str(view, pos, length), pos + length
+    if tag == _DICT:
+        count, pos = _read_varint(view, pos)
+        result = {}
+        for _ in range(count):
+            index, pos = _read_varint(view, pos)
+            result[strings[index]], pos = _decode_value(view, pos, strings)
+        return result, pos
+    if tag == _LIST:
+        count, pos = _read_varint(view, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(view, pos, strings)
+            items.append(item)
+        return items, pos
+    if tag == _NULL:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _INT:
+        n, pos = _read_varint(view, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == _FLOAT:
+        return _unpack_float(view, pos)[0], pos + 8
+    raise ValueError(f"Unknown tag {tag} at offset {pos - 1}")
@@ -0,0 +1,513 @@
+import copy
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+
+from .builder import WorkflowBuilder
+from .subworkflow import SubWorkflow
+from .tools.builder import BaseTool
+from .w_types import InputValueType
+from .workflow import Workflow
+
+_SCHEMA_CACHE: "WeakKeyDictionary[type, str]" = WeakKeyDictionary()
+
+# Fingerprints of frozen models by id, holding the model so the id stays unique.
+# Interned inputs and outputs (see io.py) are shared between calls, so most argument
+# models are fingerprinted once; cleared when full, like the tables in io.py.
+_MAX_FROZEN = 1 << 16
+_FROZEN: Dict[int, Tuple[BaseModel, Any]] = {}
+
+# how `_freeze` handles the arguments of each type
+_ATOM, _ENUM, _SUBWORKFLOW, _TOOL, _FROZEN_MODEL, _MODEL, _CLASS = range(7)
+_KINDS: Dict[type, int] = {str: _ATOM, int: _ATOM, float: _ATOM, bool: _ATOM, type(None): _ATOM}
+
+# WorkflowBuilder methods recorded by CachedWorkflowBuilder and replayed on a miss
+_RECORDED = (
+    "generative_step",
+    "search_step",
+    "add_custom_tool",
+    "flow",
+    "set_return_value",
+    "set_max_tokens",
+    "set_max_steps",
+    "set_max_time",
+    "set_tools",
+    "set_parallel",
+    "set_window",
+    "reduce_step",
+)
+
+
+@lru_cache(maxsize=None)
+def _package_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("dria_workflows")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def _parameters(name: str) -> Tuple[Tuple[str, ...], Dict[str, Any]]:
+    # names after `self`, and the defaults, of a WorkflowBuilder method
+    parameters = list(inspect.signature(getattr(WorkflowBuilder, name)).parameters.values())[1:]
+    return (
+        tuple(parameter.name for parameter in parameters),
+        {
+            parameter.name: parameter.default
+            for parameter in parameters
+            if parameter.default is not inspect.Parameter.empty
+        },
+    )
+
+
+class BuildCache:
+    """
+    On-disk cache of built workflows, one compact JSON file per entry, evicting the
+    least recently used entries once the files exceed `max_bytes`.
+
+    The last `memo_size` workflows read or written are also kept in memory, so repeated
+    hits in one process do not touch the file; each hit gets its own copy of the tasks
+    and edges.
+
+    Args:
+        :param directory (str): Where to keep the cached workflows. Created if missing.
+        :param max_bytes (int, optional): Maximum total size of the cached files. Defaults to 256MiB.
+        :param memo_size (int, optional): Workflows kept in memory. Defaults to 64.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20, memo_size: int = 64):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+        if memo_size < 0:
+            raise ValueError("memo_size must not be negative")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # key -> (last use, size); files are touched on every hit
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                self._entries[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+        self._bytes = sum(size for _, size in self._entries.values())
+        self._memo: "OrderedDict[str, Workflow]" = OrderedDict()
+
+    @staticmethod
+    def make_key(mmap: Dict[str, List[InputValueType]], recipe: str) -> str:
+        """
+        Cache key of a build: the memory layout, the builder calls with their arguments
+        and the package version.
+
+        The memory layout is what the builder looks at: the memory keys and the input types
+        each one allows (see `WorkflowBuilder.map`); the memory itself is attached after a hit.
+
+        Args:
+            mmap (Dict[str, List[InputValueType]]): The builder's memory layout.
+            recipe (str): Digest of the builder calls, see `CachedWorkflowBuilder`.
+
+        Returns:
+            str: The hex digest.
+        """
+        layout = sorted((key, [t.value for t in types]) for key, types in mmap.items())
+        data = repr((_package_version(), layout, recipe)).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Workflow]:
+        """
+        The cached workflow (with an empty external memory), or None on a miss.
+        """
+        path = self._path(key)
+        with self._lock:
+            workflow = self._memo.get(key)
+            if workflow is not None:
+                self._memo.move_to_end(key)
+        if workflow is not None:
+            # the file is only touched when read, so memo hits make no system calls
+            with self._lock:
+                self.hits += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries[key] = (time.time(), entry[1])
+            return _copy_workflow(workflow)
+        try:
+            workflow = Workflow.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            # missing, or a file we cannot read back
+            with self._lock:
+                self.misses += 1
+                self._forget(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            size = self._entries.get(key, (0, os.path.getsize(path)))[1]
+            self._set(key, size)
+            self._remember(key, workflow)
+        return _copy_workflow(workflow)
+
+    def put(self, key: str, workflow: Workflow) -> None:
+        """
+        Cache a workflow. Its external memory is not stored.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        workflow = _copy_workflow(workflow)
+        workflow.save(tmp_path, compact=True)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._set(key, os.path.getsize(path))
+            self._remember(key, workflow)
+            self._evict()
+
+    def _remember(self, key: str, workflow: Workflow) -> None:
+        if not self.memo_size:
+            return
+        self._memo[key] = workflow
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def _set(self, key: str, size: int) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        self._entries[key] = (os.path.getmtime(self._path(key)), size)
+        self._bytes += size
+
+    def _forget(self, key: str) -> None:
+        self._memo.pop(key, None)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self) -> None:
+        if self._bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._bytes <= self.max_bytes:
+                break
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._forget(key)
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _replace(model: Any, **update: Any) -> Any:
+    """
+    Copies `model` with the fields it has set replaced, leaving unset fields
+    unset so that dumps excluding them match the original.
+    """
+    fields_set = model.model_fields_set
+    return model.model_copy(update={name: value for name, value in update.items() if name in fields_set})
+
+
+def _copy_workflow(workflow: Workflow) -> Workflow:
+    """
+    A copy of a cached workflow, without external memory, whose tasks, edges and
+    settings can be changed without affecting the cache. The input and output
+    descriptors are immutable and shared.
+    """
+    config = workflow.config
+    return_value = workflow.return_value
+    if return_value is not None:
+        return_value = _replace(
+            return_value,
+            input=list(return_value.input)
+            if isinstance(return_value.input, list)
+            else return_value.input,
+            post_process=[process.model_copy() for process in return_value.post_process]
+            if return_value.post_process is not None
+            else None,
+        )
+    # deep copies are slow, so only the mutable parts are copied
+    return _replace(
+        workflow,
+        config=_replace(
+            config,
+            tools=list(config.tools),
+            custom_tools=copy.deepcopy(config.custom_tools),
+            parallel_groups=[list(group) for group in config.parallel_groups]
+            if config.parallel_groups is not None
+            else None,
+        ),
+        external_memory={},
+        tasks=[
+            _replace(
+                task,
+                messages=[message.model_copy() for message in task.messages],
+                inputs=list(task.inputs),
+                outputs=list(task.outputs),
+            )
+            for task in workflow.tasks
+        ],
+        steps=[
+            _replace(edge, condition=edge.condition.model_copy())
+            if edge.condition is not None
+            else edge.model_copy()
+            for edge in workflow.steps
+        ],
+        return_value=return_value,
+    )
+
+
+class _Dumped:
+    """
+    A mutable model argument as it was when the call was recorded; rebuilt on replay.
+    """
+
+    __slots__ = ("cls", "data")
+
+    def __init__(self, cls: type, data: str):
+        self.cls = cls
+        self.data = data
+
+
+def _model_fingerprint(value: BaseModel) -> Tuple[str, ...]:
+    fingerprint = (
+        f"{type(value).__module__}.{type(value).__qualname__}",
+        value.model_dump_json(exclude_unset=True),
+    )
+    if isinstance(value, BaseTool):
+        fingerprint += (type(value).parameters_json(),)
+    return fingerprint
+
+
+def _kind(cls: type) -> int:
+    kind = _KINDS.get(cls)
+    if kind is None:
+        if issubclass(cls, Enum):
+            kind = _ENUM
+        elif issubclass(cls, SubWorkflow):
+            kind = _SUBWORKFLOW
+        elif issubclass(cls, BaseTool):
+            kind = _TOOL
+        elif issubclass(cls, BaseModel):
+            kind = _FROZEN_MODEL if cls.model_config.get("frozen") else _MODEL
+        elif issubclass(cls, type):
+            kind = _CLASS
+        elif issubclass(cls, (str, int, float)):
+            kind = _ATOM
+        else:
+            raise TypeError(f"Cannot use a value of type {cls.__name__} in a build cache key")
+        _KINDS[cls] = kind
+    return kind
+
+
+def _freeze(value: Any) -> Tuple[Any, Any]:
+    """
+    The fingerprint of a builder argument, a tuple whose repr enters the cache key,
+    and a snapshot of it to replay, which later changes to the argument do not affect.
+    """
+    cls = type(value)
+    if cls is list or cls is tuple:
+        fingerprints = ["list"]
+        snapshots = []
+        for item in value:
+            # shortcut for interned descriptors that were seen before
+            cached = _FROZEN.get(id(item))
+            if cached is not None:
+                fingerprints.append(cached[1])
+                snapshots.append(item)
+            else:
+                fingerprint, snapshot = _freeze(item)
+                fingerprints.append(fingerprint)
+                snapshots.append(snapshot)
+        return tuple(fingerprints), snapshots if cls is list else tuple(snapshots)
+    if cls is dict:
+        fingerprints = []
+        snapshots = {}
+        for key in sorted(value):
+            item = value[key]
+            if _KINDS.get(type(item)) == _ATOM:
+                fingerprints.append((key, item))
+                snapshots[key] = item
+            else:
+                fingerprint, snapshots[key] = _freeze(item)
+                fingerprints.append((key, fingerprint))
+        return ("dict", tuple(fingerprints)), snapshots
+    kind = _kind(cls)
+    if kind == _ATOM:
+        return value, value
+    if kind == _FROZEN_MODEL:
+        cached = _FROZEN.get(id(value))
+        if cached is None:
+            if len(_FROZEN) >= _MAX_FROZEN:
+                _FROZEN.clear()
+            data = repr(_model_fingerprint(value)).encode("utf-8")
+            cached = _FROZEN[id(value)] = (value, hashlib.sha256(data).hexdigest())
+        return cached[1], value
+    if kind == _MODEL:
+        fingerprint = _model_fingerprint(value)
+        return fingerprint, _Dumped(cls, fingerprint[1])
+    if kind == _ENUM:
+        return value.value, value
+    if kind == _SUBWORKFLOW:
+        # immutable, keyed by its digest
+        return ("SubWorkflow", value.name, value.digest), value
+    if kind == _TOOL:
+        # tools may hold private state, so they are copied as objects
+        return _model_fingerprint(value), value.model_copy(deep=True)
+    # a class: only models can be fingerprinted, by their schema
+    if not issubclass(value, BaseModel):
+        raise TypeError(f"Cannot use the class {value.__name__} in a build cache key")
+    schema = _SCHEMA_CACHE.get(value)
+    if schema is None:
+        schema = _SCHEMA_CACHE[value] = json.dumps(value.model_json_schema(), sort_keys=True)
+    return ("schema", schema), value
+
+
+def _thaw(value: Any) -> Any:
+    """
+    The argument to replay for a snapshot from `_freeze`.
+    """
+    if isinstance(value, _Dumped):
+        return value.cls.model_validate_json(value.data)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_thaw(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+class CachedWorkflowBuilder(WorkflowBuilder):
+    """
+    A `WorkflowBuilder` that looks the workflow up in a `BuildCache` before building it.
+
+    Step, flow and setter calls are recorded instead of executed. `build()` hashes the
+    memory layout, the recorded calls and the package version, and on a hit returns the
+    cached workflow with this builder's memory without creating any task, so building the
+    same definition over different memory contents hits the cache. On a miss the calls
+    are replayed on this builder and the result is cached, so errors in step definitions
+    are raised by `build()`. Arguments are keyed as they were when the call was made, and
+    prompts read from `.md` files by their content.
+
+    A hit skips creating the tasks but still records every call and copies the cached
+    workflow, so it only pays off beyond a few tasks; for one or two tasks, building
+    directly is as fast or faster.
+
+    Args:
+        :param cache (BuildCache): The cache to use.
+        :param memory (Dict[str, Any], optional): The initial memory, see `WorkflowBuilder`.
+    """
+
+    def __init__(self, cache: BuildCache, memory=None, **kwargs):
+        super().__init__(memory, **kwargs)
+        self.cache = cache
+        # snapshots of the calls to replay on a miss, and a digest of their fingerprints
+        self._recipe: List[Tuple[str, Dict[str, Any]]] = []
+        self._digest = hashlib.sha256()
+
+    def _record(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+        """
+        Record a builder call. Its arguments are fingerprinted and copied now, so changing
+        them after the call changes neither the key nor the replayed call.
+        """
+        names, defaults = _parameters(name)
+        if len(args) > len(names):
+            raise TypeError(f"{name}() takes {len(names)} arguments but {len(args)} were given")
+        arguments = dict(zip(names, args))
+        arguments.update(kwargs)
+        # arguments left at their default key like omitted ones
+        for key, default in defaults.items():
+            if key in arguments and arguments[key] is default:
+                del arguments[key]
+        fingerprint, snapshot = _freeze(arguments)
+        path = arguments.get("path")
+        if name == "generative_step" and path is not None and arguments.get("prompt") is None:
+            # key the prompt file by its content rather than its name
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            fingerprint = _freeze({**arguments, "path": digest})[0]
+        data = repr((name, fingerprint)).encode("utf-8")
+        self._digest.update(len(data).to_bytes(8, "little"))
+        self._digest.update(data)
+        self._recipe.append((name, snapshot))
+
+    def inline(self, fragment: SubWorkflow, namespace: str, bind=None, next: str = "_end") -> str:
+        # recorded like the steps, but the fragment's memory is part of the cache key
+        self._inline_memory(fragment, namespace, bind)
+        self._record("inline", (fragment, namespace), {"bind": bind, "next": next})
+        return f"{namespace}_{fragment.entry}"
+
+    inline.__doc__ = WorkflowBuilder.inline.__doc__
+
+    def map_step(self, key: str, prompt: str, output: str, id=None, size=None, **kwargs):
+        # the number of tasks depends on the list length, which the memory layout misses
+        if size is None and isinstance(self.memory.get(key), list):
+            size = len(self.memory[key])
+        self._record("map_step", (key, prompt, output), {"id": id, "size": size, **kwargs})
+
+    map_step.__doc__ = WorkflowBuilder.map_step.__doc__
+
+    def cache_key(self) -> str:
+        return self.cache.make_key(self.map, self._digest.hexdigest())
+
+    def build(self) -> Workflow:
+        key = self.cache_key()
+        workflow = self.cache.get(key)
+        if workflow is not None:
+            workflow.external_memory = self.memory
+        else:
+            for name, arguments in self._recipe:
+                getattr(WorkflowBuilder, name)(self, **_thaw(arguments))
+            workflow = super().build()
+            self.cache.put(key, workflow)
+        self.workflow = workflow
+        return workflow
+
+
+def _recorded(name: str):
+    def method(self, *args, **kwargs):
+        self._record(name, args, kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"CachedWorkflowBuilder.{name}"
+    method.__doc__ = getattr(WorkflowBuilder, name).__doc__
+    return method
+
+
+for _name in _RECORDED:
+    setattr(CachedWorkflowBuilder, _name, _recorded(_name))
@@ -1,6 +1,6 @@
 import logging
 from pydantic import Field, ConfigDict, BaseModel
-from typing import Optional, List, Union, Dict, Literal, get_args, Type
+from typing import TYPE_CHECKING, Optional, List, Set, Tuple, Union, Dict, Literal, get_args, Type
 from .interface import (
     Input,
     Output,
@@ -14,11 +14,18 @@ from .interface import (
     MessageInput,
 )
 from .workflow import Workflow, Edge
+from .io import interned_input, Peek, Write
 from .w_types import Operator, Tools
 from .tools import ToolBuilder, HttpRequestTool, CustomTool, CustomToolMode
 import json
 import re
 
+if TYPE_CHECKING:
+    from .subworkflow import SubWorkflow
+
+# outputs that make their key a list
+_LIST_OUTPUTS = (OutputType.PUSH, OutputType.CAPPED_PUSH)
+
 
 class ConditionBuilder:
     @staticmethod
@@ -101,6 +108,7 @@ class TaskBuilder:
         _inputs: Optional[List[Input]] = None,
         name: str = "Task",
         description: str = "Task Description",
+        windows: Optional[Dict[str, int]] = None,
     ) -> DraftTask:
         # if prompt, messages and path is empty, fail
         if prompt is None and path is None:
@@ -122,7 +130,22 @@ class TaskBuilder:
                 continue
             if input_name in mmap:
                 input_type = mmap[input_name]
-                if InputValueType.GET_ALL in input_type:
+                if (
+                    windows
+                    and input_name in windows
+                    and InputValueType.SLICE in input_type
+                ):
+                    # the newest values only
+                    inputs.append(
+                        interned_input(
+                            InputValueType.SLICE,
+                            input_name,
+                            True,
+                            index=-windows[input_name],
+                            trusted=True,
+                        )
+                    )
+                elif InputValueType.GET_ALL in input_type:
                     cls._add_input(inputs, input_name, InputValueType.GET_ALL)
                 else:
                     cls._add_input(inputs, input_name, InputValueType.READ)
@@ -158,9 +181,8 @@ class TaskBuilder:
 
     @staticmethod
     def _add_input(inputs: List[Input], key: str, value_type: InputValueType) -> None:
-        input_value = InputValue(type=value_type, key=key)
-        input_obj = Input(name=key, value=input_value, required=True)
-        inputs.append(input_obj)
+        # keys come from the prompt regex and types from the memory map
+        inputs.append(interned_input(value_type, key, True, trusted=True))
 
 
 class WorkflowBuilder:
@@ -195,8 +217,18 @@ class WorkflowBuilder:
         self.workflow = Workflow()
         self.workflow.external_memory = memory
         self.tasks: List[Task] = []
+        # ids of self.tasks, for constant-time duplicate and edge checks
+        self._task_ids: Set[str] = set()
         self.steps = []
         self.memory = memory
+        self._parallel = False
+        # (fragment digest, namespace, bind, next) of inlined sub-workflows
+        self._inlined: Set[tuple] = set()
+        # output name of each map_step -> its per-element keys, and the group bounds
+        self._maps: Dict[str, List[str]] = {}
+        self._map_bounds: Dict[str, Tuple[str, int]] = {}
+        # list keys that prompts read the newest values of, see set_window
+        self._windows: Dict[str, int] = {}
         # match memory with InputValueType
         self.map = {}
         [self.__mmap(k, v) for k, v in memory.items()]
@@ -213,15 +245,16 @@ class WorkflowBuilder:
             ValueError: If the value type is not supported (i.e., not str or List[str]).
 
         Note:
-            - For List[str] values, it maps to [GET_ALL, PEEK, POP, SIZE] InputValueTypes.
+            - For List[str] values, it maps to [GET_ALL, PEEK, POP, SIZE, SLICE] InputValueTypes.
             - For str values, it maps to [READ] InputValueType.
         """
-        if isinstance(value, list) and isinstance(value[0], str):
+        if isinstance(value, list) and (not value or isinstance(value[0], str)):
             self.map[key] = [
                 InputValueType.GET_ALL,
                 InputValueType.PEEK,
                 InputValueType.POP,
                 InputValueType.SIZE,
+                InputValueType.SLICE,
             ]
         elif isinstance(value, str):
             self.map[key] = [InputValueType.READ]
@@ -257,7 +290,7 @@ class WorkflowBuilder:
             id = str(len(self.tasks))
         else:
             # Check if the id already exists in the tasks array
-            if any(task.id == id for task in self.tasks):
+            if id in self._task_ids:
                 raise ValueError(f"Task with id '{id}' already exists")
 
         task = TaskBuilder.new(
@@ -269,13 +302,14 @@ class WorkflowBuilder:
             _inputs=inputs,
             operator=operator,
             mmap=self.map,
+            windows=self._windows,
         )
 
         for input in inputs:
             task.add_input(input)
         for output in outputs:
             task.add_output(output)
-            if output.type == OutputType.PUSH:
+            if output.type in _LIST_OUTPUTS:
                 self.__mmap(output.key, [" "])
             elif output.type == OutputType.WRITE:
                 self.__mmap(output.key, "")
@@ -283,6 +317,7 @@ class WorkflowBuilder:
                 pass
 
         self.tasks.append(task.build())
+        self._task_ids.add(id)
 
     def search_step(
         self,
@@ -321,7 +356,7 @@ class WorkflowBuilder:
             id = str(len(self.tasks))
         else:
             # Check if the id already exists in the tasks array
-            if any(task.id == id for task in self.tasks):
+            if id in self._task_ids:
                 raise ValueError(f"Task with id '{id}' already exists")
 
         task = TaskBuilder.new(
@@ -330,13 +365,14 @@ class WorkflowBuilder:
             _inputs=inputs,
             operator=Operator.SEARCH,
             mmap=self.map,
+            windows=self._windows,
         )
 
         for input in inputs:
             task.add_input(input)
         for output in outputs:
             task.add_output(output)
-            if output.type == OutputType.PUSH:
+            if output.type in _LIST_OUTPUTS:
                 self.__mmap(output.key, [" "])
             elif output.type == OutputType.WRITE:
                 self.__mmap(output.key, "")
@@ -344,6 +380,197 @@ class WorkflowBuilder:
                 pass
 
         self.tasks.append(task.build())
+        self._task_ids.add(id)
+
+    def map_step(
+        self,
+        key: str,
+        prompt: str,
+        output: str,
+        id: Optional[str] = None,
+        size: Optional[int] = None,
+        parallelism: Optional[int] = None,
+        operator: Literal[Operator.GENERATION, Operator.FUNCTION_CALLING] = Operator.GENERATION,
+    ):
+        """
+        Apply a prompt to each element of a list memory key, with one task per element.
+
+        In the prompt, `{{key}}` stands for the element. The task for element `i` has the
+        id `{id}_{i}`, peeks element `i` and writes its result to `{output}_{i}`. An edge
+        has a single target, so this is not a fan-out: the tasks are chained from `{id}_0`
+        and the elements still run one after another, each costing a step. As the tasks
+        do not depend on each other, the built workflow also lists them in
+        `config.parallel_groups` (see `set_parallel`), at most `parallelism` per group,
+        which only executors that support it use to run them concurrently.
+        Use `{{output}}` in `reduce_step` prompts, or `output` in `set_return_value`, to
+        gather the results.
+
+        Args:
+            key (str): The list memory key to map over.
+            prompt (str): The prompt for each element.
+            output (str): Name of the results.
+            id (str): Prefix of the task ids. Default is `output`.
+            size (int): Number of elements. Default is the length of the list in memory.
+            parallelism (int): Most tasks to run at a time. Default is no limit.
+            operator (Operator): GENERATION or FUNCTION_CALLING. Default is GENERATION.
+
+        Raises:
+            ValueError: If `key` is not a list, the size is unknown or larger than the list,
+                or ids already exist. Nothing is added then.
+        """
+        if key not in self.map or InputValueType.PEEK not in self.map[key]:
+            raise ValueError(f"Memory key '{key}' is not a list")
+        known = self.memory.get(key)
+        if size is None:
+            if not isinstance(known, list):
+                raise ValueError(f"The size of '{key}' is not known, pass it as size")
+            size = len(known)
+        elif isinstance(known, list) and size > len(known):
+            raise ValueError(f"size {size} exceeds the {len(known)} elements of '{key}'")
+        if size < 1:
+            raise ValueError("size must be positive")
+        if parallelism is not None and parallelism < 1:
+            raise ValueError("parallelism must be positive")
+        if output in self._maps:
+            raise ValueError(f"Map output '{output}' already exists")
+        id = output if id is None else id
+
+        ids = [f"{id}_{i}" for i in range(size)]
+        existing = [task_id for task_id in ids if task_id in self._task_ids]
+        if existing:
+            raise ValueError(f"Tasks with ids {', '.join(existing)} already exist")
+        keys = [f"{output}_{i}" for i in range(size)]
+        for task_id, output_key, index in zip(ids, keys, range(size)):
+            # not self.generative_step: CachedWorkflowBuilder only records that
+            WorkflowBuilder.generative_step(
+                self,
+                operator=operator,
+                prompt=prompt,
+                id=task_id,
+                inputs=[Peek.new(key, index, True)],
+                outputs=[Write.new(output_key)],
+            )
+            self._map_bounds[task_id] = (output, parallelism or size)
+        self.steps.extend(Edge(source=a, target=b) for a, b in zip(ids, ids[1:]))
+        self._maps[output] = keys
+
+    def reduce_step(
+        self,
+        prompt: str,
+        id: Optional[str] = None,
+        operator: Literal[Operator.GENERATION, Operator.FUNCTION_CALLING] = Operator.GENERATION,
+        inputs=None,
+        outputs=None,
+    ):
+        """
+        Add a step that combines the results of `map_step`s.
+
+        `{{output}}` in the prompt, for the output name of a map step, is replaced by the
+        results of all its elements, one per line. Otherwise this is `generative_step`.
+
+        Args:
+            prompt (str): The prompt.
+            id (str): The id of the task. Default is None.
+            operator (Operator): GENERATION or FUNCTION_CALLING. Default is GENERATION.
+            inputs (List[Input]): The inputs for the task. Default is None.
+            outputs (List[Output]): The outputs for the task. Default is None.
+        """
+
+        def gather(match: "re.Match") -> str:
+            keys = self._maps.get(match.group(1))
+            if keys is None:
+                return match.group(0)
+            return "\n".join("{{" + key + "}}" for key in keys)
+
+        WorkflowBuilder.generative_step(
+            self,
+            operator=operator,
+            prompt=re.sub(r"\{\{(\w+)\}\}", gather, prompt),
+            id=id,
+            inputs=inputs,
+            outputs=outputs,
+        )
+
+    def inline(
+        self,
+        fragment: "SubWorkflow",
+        namespace: str,
+        bind: Optional[Dict[str, str]] = None,
+        next: str = "_end",
+    ) -> str:
+        """
+        Add the tasks and edges of a sub-workflow.
+
+        Task ids get the prefix `{namespace}_` and memory keys are renamed as described in
+        `SubWorkflow`; keys in `bind` are used as the given keys of this workflow instead.
+        Memory of the fragment is added under the new keys, unless bound to keys this
+        workflow already has. Inlining the same fragment with the same arguments again
+        adds nothing, so branches can share one instance.
+
+        Args:
+            fragment (SubWorkflow): The fragment.
+            namespace (str): Prefix of the task ids and state keys of this instance.
+            bind (Dict[str, str]): Fragment keys to replace with keys of this workflow. Default is None.
+            next (str): Id of the task to continue with after the fragment. Default is '_end'.
+
+        Returns:
+            str: Id of the first task of the instance, for edges into it.
+
+        Raises:
+            ValueError: If a task id of the instance already exists or memory values conflict.
+        """
+        entry = f"{namespace}_{fragment.entry}"
+        key = (fragment.digest, namespace, tuple(sorted((bind or {}).items())), next)
+        if key in self._inlined:
+            return entry
+        tasks, steps = fragment.instance(namespace, bind, next)
+        existing = [task.id for task in tasks if task.id in self._task_ids]
+        if existing:
+            raise ValueError(f"Tasks with ids {', '.join(existing)} already exist")
+        self._inline_memory(fragment, namespace, bind)
+
+        for task in tasks:
+            for output in task.outputs:
+                if output.type in _LIST_OUTPUTS:
+                    self.__mmap(output.key, [" "])
+                elif output.type == OutputType.WRITE:
+                    self.__mmap(output.key, "")
+            # instances are cached by the fragment, so each build gets its own copies
+            self.tasks.append(
+                task.model_copy(
+                    update={
+                        "messages": [message.model_copy() for message in task.messages],
+                        "inputs": list(task.inputs),
+                        "outputs": list(task.outputs),
+                    }
+                )
+            )
+            self._task_ids.add(task.id)
+        self.steps.extend(
+            edge.model_copy(
+                update={"condition": edge.condition.model_copy()}
+                if edge.condition is not None
+                else None
+            )
+            for edge in steps
+        )
+        self._inlined.add(key)
+        return entry
+
+    def _inline_memory(
+        self, fragment: "SubWorkflow", namespace: str, bind: Optional[Dict[str, str]]
+    ) -> None:
+        for key, value in fragment.memory.items():
+            name = fragment.key(key, namespace, bind)
+            if name in self.memory:
+                if bind and key in bind:
+                    continue
+                if self.memory[name] != value:
+                    raise ValueError(f"Memory key '{name}' already has a different value")
+            else:
+                self.memory[name] = list(value) if isinstance(value, list) else value
+            if name not in self.map:
+                self.__mmap(name, value)
 
     def add_custom_tool(self, tool: Union[CustomTool, HttpRequestTool]):
         """
@@ -420,6 +647,15 @@ class WorkflowBuilder:
                 step.source, step.target, step.condition, step.fallback
             )
 
+        if self._parallel or self._map_bounds:
+            from .parallel import annotate_parallel
+
+            annotate_parallel(self.workflow)
+            if self._map_bounds:
+                self.workflow.config.parallel_groups = self._bound_groups(
+                    self.workflow.config.parallel_groups
+                )
+
         if self.workflow.return_value is None:
             # logging.debug out existing outputs
             keys = [output.key for task in self.tasks for output in task.outputs]
@@ -431,19 +667,44 @@ class WorkflowBuilder:
 
         return self.workflow
 
-    def build_to_dict(self) -> Dict:
-        """ """
+    def _bound_groups(self, groups: List[List[str]]) -> List[List[str]]:
+        # split groups so that each holds at most `parallelism` tasks of a map step
+        bounded = []
+        for group in groups:
+            chunks: List[List[str]] = [[]]
+            counts: Dict[Tuple[int, str], int] = {}
+            for task_id in group:
+                map_bound = self._map_bounds.get(task_id)
+                if map_bound is None:
+                    chunks[0].append(task_id)
+                    continue
+                output, parallelism = map_bound
+                chunk = 0
+                while counts.get((chunk, output), 0) >= parallelism:
+                    chunk += 1
+                counts[(chunk, output)] = counts.get((chunk, output), 0) + 1
+                if chunk == len(chunks):
+                    chunks.append([])
+                chunks[chunk].append(task_id)
+            bounded.extend(chunk for chunk in chunks if chunk)
+        return bounded
+
+    def build_to_dict(self, compact: bool = False) -> Dict:
+        """
+        Build the workflow and dump it to JSON-compatible python data.
+
+        Args:
+            compact (bool): Drop values equal to their defaults. Default is False.
+        """
         workflow = self.build()
-        return json.loads(
-            workflow.model_dump_json(exclude_unset=True, exclude_none=True)
-        )
+        return workflow.to_dict(compact=compact)
 
     def flow(self, edges: List[Edge]):
         for edge in edges:
-            if not any(task.id == edge.source for task in self.tasks):
+            if edge.source not in self._task_ids:
                 raise ValueError(f"Source task '{edge.source}' not found")
             if edge.target != "_end":
-                if not any(task.id == edge.target for task in self.tasks):
+                if edge.target not in self._task_ids:
                     raise ValueError(f"Target task '{edge.target}' not found")
             self.steps.append(edge)
 
@@ -455,7 +716,7 @@ class WorkflowBuilder:
         The key should correspond to an output key from one of the tasks in the workflow.
 
         Args:
-            key (str): The key of the output to be set as the return value.
+            key (str): The key of the output to be set as the return value, or the output name of a map_step.
 
         Returns:
             None
@@ -466,6 +727,8 @@ class WorkflowBuilder:
         # Check if the key exists in any of the task outputs
         if isinstance(key, str):
             key = [key]
+        # the results of a map step are returned as a list
+        key = [k for name in key for k in self._maps.get(name, [name])]
         for k in key:
             if not any(
                 k in [output.key for output in task.outputs] for task in self.tasks
@@ -520,6 +783,36 @@ class WorkflowBuilder:
         """
         self.workflow.config.max_time = max_time
 
+    def set_parallel(self, enabled: bool = True):
+        """
+        Annotate the built workflow with groups of data-independent tasks in
+        `config.parallel_groups`, so that executors can run them concurrently.
+
+        Args:
+            enabled (bool): Whether to annotate the workflow. Default is True.
+        """
+        self._parallel = enabled
+
+    def set_window(self, key: str, size: int):
+        """
+        Make the prompts of steps added afterwards read only the newest `size` values of
+        the list `key` where they use `{{key}}`, instead of all of them. Together with
+        `CappedPush` outputs this bounds the prompts of loops that accumulate a history.
+        A key that is not in memory yet and is later written as a string is read whole.
+
+        Args:
+            key (str): The list memory key.
+            size (int): How many values to read.
+
+        Raises:
+            ValueError: If `key` is a string or `size` is not positive.
+        """
+        if key in self.map and InputValueType.SLICE not in self.map[key]:
+            raise ValueError(f"Memory key '{key}' is not a list")
+        if size < 1:
+            raise ValueError("size must be positive")
+        self._windows[key] = size
+
     def set_tools(self, tools: List[Tools]):
         """
         Set the tools for the workflow.
@@ -0,0 +1,249 @@
+import gzip
+import hashlib
+import lzma
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List
+
+from .serialization import dumps, loads, to_dict
+from .workflow import Workflow
+
+# Bundle layout:
+#
+#   MAGIC | codec | frame | frame | ... | index frame | footer
+#
+# Frames are independently compressed runs of payloads (~`frame_size` bytes
+# before compression). Config, steps, return value and every task are stored
+# once per distinct content, as are memory strings of at least
+# `min_blob_size` characters; each workflow is a small skeleton referencing
+# those blobs by content hash. The index maps hashes and workflow positions to
+# (frame, start, length) and the footer holds the index frame's offset/size.
+
+MAGIC = b"DWBUNDLE\x01"
+_CODEC = struct.Struct("8s")
+_FOOTER = struct.Struct("<QQ")
+
+_CODECS = {
+    "gzip": (gzip.compress, gzip.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class BundleWriter:
+    """
+    Writes many workflows into one compressed archive, storing identical tasks, steps,
+    config blocks and large memory strings only once.
+
+    Args:
+        :param path (str): The path of the bundle file.
+        :param codec (str, optional): "gzip" or "lzma". Defaults to "gzip".
+        :param frame_size (int, optional): Uncompressed bytes per compressed frame. Smaller frames make
+            random access cheaper, larger frames compress better. Defaults to 256KiB.
+        :param min_blob_size (int, optional): Memory strings at least this long are deduplicated. Defaults to 256.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: str = "gzip",
+        frame_size: int = 1 << 18,
+        min_blob_size: int = 256,
+    ):
+        if codec not in _CODECS:
+            raise ValueError(f"Unsupported codec '{codec}'. Choose from: {', '.join(_CODECS)}")
+        self.path = path
+        self.codec = codec
+        self.frame_size = frame_size
+        self.min_blob_size = min_blob_size
+        self._compress = _CODECS[codec][0]
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + _CODEC.pack(codec.encode("ascii")))
+        self._frames: List[List[int]] = []
+        self._buffer = bytearray()
+        self._blobs: Dict[str, List[int]] = {}
+        self._workflows: List[List[int]] = []
+
+    def add(self, workflow: Workflow) -> int:
+        """
+        Add a workflow to the bundle.
+
+        Returns:
+            int: The index of the workflow in the bundle.
+        """
+        data = to_dict(workflow, compact=True)
+        skeleton: Dict[str, Any] = {}
+        for key, value in data.items():
+            if key == "external_memory":
+                skeleton[key] = {k: self._memory_value(v) for k, v in value.items()}
+            elif key == "tasks":
+                skeleton[key] = [self._blob(dumps(task)) for task in value]
+            else:
+                skeleton[key] = self._blob(dumps(value))
+        self._workflows.append(self._payload(dumps(skeleton)))
+        return len(self._workflows) - 1
+
+    def _memory_value(self, value: Any) -> List[Any]:
+        # ["s", str] | ["r", hash] | ["l", [items]] | ["o", other]; list items are
+        # ["s", str], ["r", hash] or ["o", dict]
+        if isinstance(value, str):
+            return self._memory_str(value)
+        if isinstance(value, list):
+            return [
+                "l",
+                [
+                    self._memory_str(item) if isinstance(item, str) else ["o", item]
+                    for item in value
+                ],
+            ]
+        return ["o", value]
+
+    def _memory_str(self, value: str) -> List[str]:
+        if len(value) < self.min_blob_size:
+            return ["s", value]
+        return ["r", self._blob(value.encode("utf-8"))]
+
+    def _blob(self, data: bytes) -> str:
+        digest = _content_hash(data)
+        if digest not in self._blobs:
+            self._blobs[digest] = self._payload(data)
+        return digest
+
+    def _payload(self, data: bytes) -> List[int]:
+        location = [len(self._frames), len(self._buffer), len(data)]
+        self._buffer += data
+        if len(self._buffer) >= self.frame_size:
+            self._flush()
+        return location
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        compressed = self._compress(bytes(self._buffer))
+        self._frames.append([self._file.tell(), len(compressed)])
+        self._file.write(compressed)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._flush()
+        index = self._compress(
+            dumps(
+                {
+                    "frames": self._frames,
+                    "blobs": self._blobs,
+                    "workflows": self._workflows,
+                }
+            )
+        )
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_FOOTER.pack(offset, len(index)))
+        self._file.close()
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BundleReader:
+    """
+    Random access to the workflows of a bundle written by `BundleWriter`.
+
+    Args:
+        :param path (str): The path of the bundle file.
+        :param cache_frames (int, optional): Number of decompressed frames kept in memory. Defaults to 16.
+    """
+
+    def __init__(self, path: str, cache_frames: int = 16):
+        self.path = path
+        self.cache_frames = cache_frames
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"'{path}' is not a workflow bundle")
+        (codec,) = _CODEC.unpack(self._file.read(_CODEC.size))
+        self.codec = codec.rstrip(b"\0").decode("ascii")
+        self._decompress = _CODECS[self.codec][1]
+        self._file.seek(-_FOOTER.size, 2)
+        offset, size = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        self._file.seek(offset)
+        index = loads(self._decompress(self._file.read(size)))
+        self._frames = index["frames"]
+        self._blobs = index["blobs"]
+        self._workflows = index["workflows"]
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._workflows)
+
+    def __getitem__(self, i: int) -> Workflow:
+        return self.get(i)
+
+    def __iter__(self) -> Iterator[Workflow]:
+        for i in range(len(self)):
+            yield self.get(i)
+
+    def get(self, i: int) -> Workflow:
+        """
+        Load the i-th workflow.
+        """
+        return Workflow.from_dict(self.get_dict(i))
+
+    def get_dict(self, i: int) -> Dict[str, Any]:
+        """
+        The i-th workflow as JSON-compatible python data.
+        """
+        skeleton = loads(self._read(self._workflows[i]))
+        data: Dict[str, Any] = {}
+        for key, value in skeleton.items():
+            if key == "external_memory":
+                data[key] = {k: self._memory_value(v) for k, v in value.items()}
+            elif key == "tasks":
+                data[key] = [loads(self._blob(digest)) for digest in value]
+            else:
+                data[key] = loads(self._blob(value))
+        return data
+
+    def _memory_value(self, value: List[Any]) -> Any:
+        kind, payload = value
+        if kind == "l":
+            return [self._memory_value(item) for item in payload]
+        if kind == "r":
+            return self._blob(payload).decode("utf-8")
+        return payload
+
+    def _blob(self, digest: str) -> bytes:
+        return self._read(self._blobs[digest])
+
+    def _read(self, location: List[int]) -> bytes:
+        frame, start, length = location
+        return self._frame(frame)[start : start + length]
+
+    def _frame(self, i: int) -> bytes:
+        data = self._cache.get(i)
+        if data is not None:
+            self._cache.move_to_end(i)
+            return data
+        offset, size = self._frames[i]
+        self._file.seek(offset)
+        data = self._decompress(self._file.read(size))
+        self._cache[i] = data
+        if len(self._cache) > self.cache_frames:
+            self._cache.popitem(last=False)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BundleReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
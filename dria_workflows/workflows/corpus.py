@@ -0,0 +1,235 @@
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from .serialization import loads
+from .workflow import Workflow
+
+# Sidecar index: header (magic, data size, data mtime, record count) followed by
+# the start and end offsets of every non-empty line as uint64 arrays.
+_INDEX_MAGIC = b"DWIDX\x00\x00\x01"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+class WorkflowCorpus:
+    """
+    Random access to a JSONL file of workflows (one JSON document per line).
+
+    An offset index is written next to the data file (`<path>.idx`) on first use and
+    rebuilt when the data file changes; if it cannot be written, it is only kept in
+    memory. The data file is memory-mapped, so reading the i-th workflow only touches
+    its own bytes.
+
+    Args:
+        :param path (str): The JSONL file.
+        :param index_path (str, optional): Where to keep the offset index. Defaults to `<path>.idx`.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map empty files
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+        self._starts, self._ends = self._load_index() or self._build_index()
+
+    def _stamp(self) -> Tuple[int, int]:
+        stat = os.fstat(self._file.fileno())
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self) -> Optional[Tuple[array, array]]:
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, size, mtime, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _INDEX_MAGIC or (size, mtime) != self._stamp():
+                    return None
+                starts = array("Q")
+                ends = array("Q")
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+                return starts, ends
+        except (OSError, struct.error, EOFError):
+            return None
+
+    def _build_index(self) -> Tuple[array, array]:
+        starts = array("Q")
+        ends = array("Q")
+        data = self._data
+        pos = 0
+        size = len(data)
+        while pos < size:
+            end = data.find(b"\n", pos)
+            if end == -1:
+                end = size
+            # skip blank lines (and a trailing \r from CRLF files)
+            stop = end - 1 if end > pos and data[end - 1 : end] == b"\r" else end
+            if data[pos:stop].strip():
+                starts.append(pos)
+                ends.append(stop)
+            pos = end + 1
+
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_INDEX_MAGIC, *self._stamp(), len(starts)))
+                starts.tofile(f)
+                ends.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            # e.g. a read-only directory: keep the index in memory only
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return starts, ends
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, i: int) -> Workflow:
+        return self.get(i)
+
+    def __iter__(self) -> Iterator[Workflow]:
+        return self.iter_range()
+
+    def get_bytes(self, i: int) -> bytes:
+        """
+        The raw JSON of the i-th workflow.
+        """
+        return self._data[self._starts[i] : self._ends[i]]
+
+    def get_dict(self, i: int) -> dict:
+        return loads(self.get_bytes(i))
+
+    def get(self, i: int) -> Workflow:
+        """
+        Load the i-th workflow.
+        """
+        return Workflow.from_json(self.get_bytes(i))
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Workflow]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield self.get(i)
+
+    def search(self, pattern: Union[bytes, str, "re.Pattern"]) -> List[int]:
+        """
+        Indices of the workflows whose raw JSON matches `pattern`, without parsing them.
+
+        The whole mapped file is scanned at C speed and matches are mapped back to
+        records through the offset index, e.g. `search(b'"operator":"search"')` or
+        `search(re.compile(rb'"key":\\s*"history"'))`.
+
+        Args:
+            pattern (Union[bytes, str, re.Pattern]): A literal byte string (or str) or a compiled bytes regex.
+
+        Returns:
+            List[int]: Sorted indices of the matching workflows.
+        """
+        if isinstance(pattern, str):
+            pattern = pattern.encode("utf-8")
+        if isinstance(pattern, bytes):
+            pattern = re.compile(re.escape(pattern))
+
+        matches = []
+        pos = 0
+        size = len(self._data)
+        while pos < size:
+            match = pattern.search(self._data, pos)
+            if match is None:
+                break
+            i = bisect_right(self._starts, match.start()) - 1
+            if i >= 0 and match.end() <= self._ends[i]:
+                matches.append(i)
+                # continue after this record; one hit is enough
+                pos = self._ends[i] + 1
+            else:
+                pos = match.start() + 1
+        return matches
+
+    def ranges(self, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the corpus into at most `parts` contiguous index ranges of similar size.
+        """
+        count = len(self)
+        parts = max(1, min(parts, count))
+        step, extra = divmod(count, parts)
+        ranges = []
+        start = 0
+        for part in range(parts):
+            stop = start + step + (1 if part < extra else 0)
+            ranges.append((start, stop))
+            start = stop
+        return ranges
+
+    def parallel_map(
+        self,
+        func: Callable[[dict], Any],
+        processes: Optional[int] = None,
+        parts: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Apply `func` to every workflow (as a dict) in worker processes, each of which
+        maps the file itself and handles one index range.
+
+        Args:
+            func (Callable[[dict], Any]): A picklable (module-level) function.
+            processes (int, optional): Number of worker processes. Defaults to the CPU count.
+            parts (int, optional): Number of index ranges. Defaults to 4 per process.
+
+        Returns:
+            List[Any]: The results, in corpus order.
+        """
+        processes = processes or os.cpu_count() or 1
+        ranges = self.ranges(parts or processes * 4)
+        results: List[Any] = []
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(_map_range, self.path, self.index_path, start, stop, func)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                results.extend(future.result())
+        return results
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "WorkflowCorpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _map_range(
+    path: str, index_path: str, start: int, stop: int, func: Callable[[dict], Any]
+) -> List[Any]:
+    with WorkflowCorpus(path, index_path) as corpus:
+        return [func(corpus.get_dict(i)) for i in range(start, stop)]
+
+
+def write_jsonl(workflows, path: str, append: bool = False) -> int:
+    """
+    Write workflows as compact JSON lines, the format `WorkflowCorpus` reads.
+
+    Returns:
+        int: The number of workflows written.
+    """
+    count = 0
+    with open(path, "ab" if append else "wb") as f:
+        for workflow in workflows:
+            f.write(workflow.to_json(compact=True))
+            f.write(b"\n")
+            count += 1
+    return count
@@ -0,0 +1,189 @@
+import sys
+import tracemalloc
+from enum import Enum
+from typing import Any, Callable, Dict, Set
+
+from pydantic import BaseModel
+
+from .interface import Input, InputValue, Output
+from .io import interned_input, interned_output
+from .workflow import Workflow
+
+SECTIONS = ("memory", "prompts", "inputs_outputs", "edges", "tasks", "other")
+
+# Strings shared between slimmed workflows (ids, prompts, memory values); cleared
+# when full, like the descriptor tables in io.py.
+_MAX_STRINGS = 1 << 18
+_STRINGS: Dict[str, str] = {}
+
+
+def footprint(workflow: Workflow) -> Dict[str, int]:
+    """
+    Approximate bytes held by a workflow, by section.
+
+    Sections are external memory, prompts (task messages), task inputs and outputs,
+    edges (steps and the return value), tasks (the task objects, ids, names and
+    descriptions) and other (the workflow object and config). Objects reachable from
+    several sections are counted once, in the first; objects shared with other
+    workflows, such as interned inputs, are included.
+
+    Args:
+        workflow (Workflow): The workflow.
+
+    Returns:
+        Dict[str, int]: Bytes per section and their "total".
+    """
+    seen: Set[int] = set()
+    report = dict.fromkeys(SECTIONS, 0)
+    report["memory"] = _deep_size(workflow.external_memory, seen)
+    for task in workflow.tasks:
+        report["prompts"] += _deep_size(task.messages, seen)
+        report["inputs_outputs"] += _deep_size(task.inputs, seen)
+        report["inputs_outputs"] += _deep_size(task.outputs, seen)
+    report["edges"] = _deep_size(workflow.steps, seen) + _deep_size(
+        workflow.return_value, seen
+    )
+    report["tasks"] = _deep_size(workflow.tasks, seen)
+    report["other"] = _deep_size(workflow, seen)
+    report["total"] = sum(report[section] for section in SECTIONS)
+    return report
+
+
+def _deep_size(obj: Any, seen: Set[int]) -> int:
+    if obj is None or isinstance(obj, (bool, Enum, type)) or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, BaseModel):
+        # field names are the class's own strings; only count the values
+        fields = obj.__dict__
+        if id(fields) not in seen:
+            seen.add(id(fields))
+            size += sys.getsizeof(fields)
+            size += sum(_deep_size(value, seen) for value in fields.values())
+        # a set of field names, counted once when shared
+        size += _deep_size(obj.__pydantic_fields_set__, seen)
+        size += _deep_size(obj.__pydantic_extra__, seen)
+        size += _deep_size(obj.__pydantic_private__, seen)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_size(key, seen) + _deep_size(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    return size
+
+
+def measure_resident(factory: Callable[[int], Any], count: int) -> float:
+    """
+    Average bytes allocated per object while `count` objects made by `factory(i)`
+    are alive, measured with tracemalloc.
+
+    Args:
+        factory (Callable[[int], Any]): Builds the i-th object, e.g. loads a workflow.
+        count (int): How many objects to keep alive at once.
+
+    Returns:
+        float: Traced bytes per object.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def slim_workflow(workflow: Workflow, include_memory: bool = True) -> Workflow:
+    """
+    Reduce the memory a workflow holds, in place. Dumps and equality are unchanged.
+
+    Inputs and outputs are replaced with the shared instances from io.py, ids, prompts
+    and (optionally) memory strings are deduplicated across all slimmed workflows.
+    Fields are assigned normally, so which fields are set does not change. This mostly
+    helps workflows that were loaded or constructed without the builder, e.g. many
+    workflows of the same template, where `benchmarks/bench_footprint.py` measures
+    about 12.5 kB instead of 33 kB resident per workflow.
+
+    Args:
+        workflow (Workflow): The workflow.
+        include_memory (bool, optional): Also deduplicate memory strings. Defaults to True.
+
+    Returns:
+        Workflow: The same workflow.
+    """
+    for task in workflow.tasks:
+        for name in ("id", "name", "description"):
+            _assign(task, name, _string(getattr(task, name)))
+        for message in task.messages:
+            _assign(message, "role", _string(message.role))
+            _assign(message, "content", _string(message.content))
+        _assign(task, "inputs", [_slim_input(input) for input in task.inputs])
+        _assign(task, "outputs", [_slim_output(output) for output in task.outputs])
+    for edge in workflow.steps:
+        _assign(edge, "source", _string(edge.source))
+        _assign(edge, "target", _string(edge.target))
+        if edge.fallback is not None:
+            _assign(edge, "fallback", _string(edge.fallback))
+        condition = edge.condition
+        if condition is not None:
+            _assign(condition, "input", _slim_value(condition.input))
+            _assign(condition, "target_if_not", _string(condition.target_if_not))
+    if include_memory and workflow.external_memory:
+        memory = workflow.external_memory
+        for key, value in list(memory.items()):
+            if isinstance(value, str):
+                value = _string(value)
+            elif isinstance(value, list):
+                value = [_string(item) if isinstance(item, str) else item for item in value]
+            memory[_string(key)] = value
+    return workflow
+
+
+def _string(value: str) -> str:
+    shared = _STRINGS.get(value)
+    if shared is None:
+        if len(_STRINGS) >= _MAX_STRINGS:
+            _STRINGS.clear()
+        shared = _STRINGS[value] = value
+    return shared
+
+
+def _assign(obj: BaseModel, name: str, value: Any) -> None:
+    # fields left at their default stay unset, so `exclude_unset` dumps are unchanged
+    if name in obj.model_fields_set:
+        setattr(obj, name, value)
+
+
+def _slim_input(input: Input) -> Input:
+    value = input.value
+    if value.search_query is not None:
+        return input
+    return interned_input(
+        value.type,
+        value.key,
+        input.required,
+        index=value.index,
+        name=input.name,
+        trusted=True,
+        end=value.end,
+    )
+
+
+def _slim_value(value: InputValue) -> InputValue:
+    if value.search_query is not None:
+        return value
+    return interned_input(
+        value.type, value.key, True, index=value.index, trusted=True, end=value.end
+    ).value
+
+
+def _slim_output(output: Output) -> Output:
+    if output.value != "__result":
+        return output
+    return interned_output(output.type, output.key, output.max_length)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .workflow import Workflow
+
+_END = "_end"
+
+
+def canonical_dict(
+    workflow: Workflow,
+    include_memory: bool = True,
+    normalize_ids: bool = False,
+    include_schema: bool = False,
+) -> Dict[str, Any]:
+    """
+    A representation of the workflow that only depends on its content.
+
+    Values equal to their defaults are dropped (so built, loaded and compact-saved
+    workflows agree) and task inputs are sorted, as their order comes from a set.
+
+    Args:
+        workflow (Workflow): The workflow.
+        include_memory (bool, optional): Include `external_memory`. Defaults to True.
+        normalize_ids (bool, optional): Replace task ids with their position, so workflows that only
+            differ in naming hash the same. Defaults to False.
+        include_schema (bool, optional): Include the JSON schema of each task's output `schema`, which
+            is not part of the dumped workflow. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The canonical representation.
+    """
+    exclude = None if include_memory else {"external_memory"}
+    data = workflow.model_dump(
+        mode="json", exclude=exclude, exclude_none=True, exclude_defaults=True
+    )
+    for task, model in zip(data.get("tasks", ()), workflow.tasks):
+        if "inputs" in task:
+            task["inputs"].sort(key=lambda i: json.dumps(i, sort_keys=True))
+        if include_schema and model.schema is not None:
+            task["schema"] = model.schema.model_json_schema()
+    if include_memory and not data.get("external_memory"):
+        # None and {} mean the same thing
+        data.pop("external_memory", None)
+    if normalize_ids:
+        _normalize_ids(data)
+    return data
+
+
+def _normalize_ids(data: Dict[str, Any]) -> None:
+    ids = {
+        task["id"]: str(i) if task["id"] != _END else _END
+        for i, task in enumerate(data.get("tasks", ()))
+    }
+    for task in data.get("tasks", ()):
+        task["id"] = ids[task["id"]]
+    for edge in data.get("steps", ()):
+        for key in ("source", "target", "fallback"):
+            if key in edge:
+                edge[key] = ids.get(edge[key], edge[key])
+        condition = edge.get("condition")
+        if condition:
+            condition["target_if_not"] = ids.get(
+                condition["target_if_not"], condition["target_if_not"]
+            )
+
+
+def canonical_json(workflow: Workflow, **options) -> bytes:
+    """
+    Canonical JSON bytes of the workflow (sorted keys, no whitespace). See `canonical_dict` for options.
+    """
+    return _encode(canonical_dict(workflow, **options))
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    # always the stdlib encoder: hashes must not depend on whether orjson is installed
+    return json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def workflow_hash(workflow: Workflow, algorithm: str = "sha256", **options) -> str:
+    """
+    Stable content hash of a workflow, e.g. for deduplication or cache keys.
+
+    Args:
+        workflow (Workflow): The workflow.
+        algorithm (str, optional): A `hashlib` algorithm name. Defaults to "sha256".
+        **options: See `canonical_dict`.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.new(algorithm, canonical_json(workflow, **options)).hexdigest()
+
+
+def deduplicate(
+    workflows: Iterable[Workflow], **options
+) -> Tuple[List[Workflow], List[int]]:
+    """
+    Drop workflows with identical content.
+
+    Args:
+        workflows (Iterable[Workflow]): The workflows.
+        **options: See `workflow_hash`.
+
+    Returns:
+        Tuple[List[Workflow], List[int]]: The unique workflows (first occurrences, in order), and for
+        every input workflow the index of its unique representative, to fan results back out.
+    """
+    unique: List[Workflow] = []
+    positions: Dict[str, int] = {}
+    mapping: List[int] = []
+    for workflow in workflows:
+        digest = workflow_hash(workflow, **options)
+        position = positions.get(digest)
+        if position is None:
+            position = positions[digest] = len(unique)
+            unique.append(workflow)
+        mapping.append(position)
+    return unique, mapping
@@ -1,5 +1,5 @@
 from typing import Dict, List, Optional, Union, Type
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from .w_types import *
 from .tools import CustomToolTemplate
 import json
@@ -12,30 +12,55 @@ class Config(BaseModel):
     tools: List[str] = Field(default_factory=list)
     custom_tools: Optional[List[Union[Dict, CustomToolTemplate]]] = None
     max_tokens: Optional[int] = None
+    # task ids grouped by dependency level; tasks of a group may run concurrently
+    parallel_groups: Optional[List[List[str]]] = None
 
 
+# Input and output descriptors are immutable so that identical ones can be
+# shared between tasks (see io.py).
 class SearchQuery(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     value_type: InputValueType
     key: str
 
 
 class InputValue(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     type: InputValueType
     index: Optional[int] = None
+    # end of a SLICE, which starts at `index`; negative values count from the top
+    end: Optional[int] = None
     search_query: Optional[SearchQuery] = None
     key: str
 
 
 class Input(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     value: InputValue
     required: bool
 
 
 class Output(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     type: OutputType
     key: str
     value: str
+    # for CAPPED_PUSH: the oldest entries are dropped beyond this length
+    max_length: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _check_max_length(self) -> "Output":
+        if self.type == OutputType.CAPPED_PUSH:
+            if self.max_length is None or self.max_length < 1:
+                raise ValueError("capped_push outputs need a positive max_length")
+        elif self.max_length is not None:
+            raise ValueError("max_length is only allowed on capped_push outputs")
+        return self
 
 
 class MessageInput(BaseModel):
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Tuple, Union
 from .interface import (
     Input,
     Output,
@@ -12,6 +12,81 @@ from .interface import (
     OutputType,
 )
 
+# Inputs and outputs are frozen, so identical descriptors are created once and
+# shared: workflows with thousands of tasks reading the same few keys hold a
+# handful of objects instead of one set per task. The tables are bounded by
+# clearing them when full.
+_MAX_INTERNED = 65536
+_INPUTS: Dict[Tuple, Input] = {}
+_OUTPUTS: Dict[Tuple, Output] = {}
+
+
+def interned_input(
+    value_type: InputValueType,
+    key: str,
+    required: bool,
+    index: Optional[int] = None,
+    name: Optional[str] = None,
+    trusted: bool = False,
+    end: Optional[int] = None,
+) -> Input:
+    """
+    A shared Input for (type, key, index, end, required, name).
+
+    Args:
+        value_type (InputValueType): The input value type.
+        key (str): The memory key (or the literal, for STRING inputs).
+        required (bool): Whether the input is required.
+        index (int, optional): The index, for PEEK inputs. Defaults to None.
+        name (str, optional): The input name. Defaults to `key`.
+        trusted (bool, optional): Build with `model_construct`, skipping validation; only for
+            arguments that are known to be valid. Defaults to False.
+        end (int, optional): The end, for SLICE inputs. Defaults to None.
+
+    Returns:
+        Input: The interned input.
+    """
+    name = key if name is None else name
+    cache_key = (value_type, key, index, end, required, name)
+    interned = _INPUTS.get(cache_key)
+    if interned is None:
+        value = {"type": value_type, "key": key}
+        if index is not None:
+            value["index"] = index
+        if end is not None:
+            value["end"] = end
+        if trusted:
+            interned = Input.model_construct(
+                name=name, value=InputValue.model_construct(**value), required=required
+            )
+        else:
+            interned = Input(name=name, value=InputValue(**value), required=required)
+        if len(_INPUTS) >= _MAX_INTERNED:
+            _INPUTS.clear()
+        _INPUTS[cache_key] = interned
+    return interned
+
+
+def interned_output(
+    output_type: OutputType, key: str, max_length: Optional[int] = None
+) -> Output:
+    """
+    A shared Output writing the task result to `key`, with `max_length` for CAPPED_PUSH.
+    """
+    cache_key = (output_type, key, max_length)
+    interned = _OUTPUTS.get(cache_key)
+    if interned is None:
+        if max_length is None:
+            interned = Output(type=output_type, key=key, value="__result")
+        else:
+            interned = Output(
+                type=output_type, key=key, value="__result", max_length=max_length
+            )
+        if len(_OUTPUTS) >= _MAX_INTERNED:
+            _OUTPUTS.clear()
+        _OUTPUTS[cache_key] = interned
+    return interned
+
 
 class Read:
     """
@@ -23,11 +98,7 @@ class Read:
 
     @staticmethod
     def new(key: str, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.READ, key=key),
-            required=required,
-        )
+        return interned_input(InputValueType.READ, key, required)
 
 
 class Pop:
@@ -40,11 +111,7 @@ class Pop:
 
     @staticmethod
     def new(key: str, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.POP, key=key),
-            required=required,
-        )
+        return interned_input(InputValueType.POP, key, required)
 
 
 class Peek:
@@ -57,11 +124,7 @@ class Peek:
 
     @staticmethod
     def new(key: str, index: int, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.PEEK, key=key, index=index),
-            required=required,
-        )
+        return interned_input(InputValueType.PEEK, key, required, index=index)
 
 
 class GetAll:
@@ -74,11 +137,29 @@ class GetAll:
 
     @staticmethod
     def new(key: str, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.GET_ALL, key=key),
-            required=required,
-        )
+        return interned_input(InputValueType.GET_ALL, key, required)
+
+
+class Slice:
+    """
+    A utility class for creating Input objects with SLICE value type.
+
+    This class provides static methods to create Input objects specifically
+    for retrieving part of a list in the workflow's memory, like `values[start:end]`.
+    """
+
+    @staticmethod
+    def new(key: str, start: int, end: Optional[int], required: bool) -> Input:
+        return interned_input(InputValueType.SLICE, key, required, index=start, end=end)
+
+    @staticmethod
+    def last(key: str, size: int, required: bool) -> Input:
+        """
+        The newest `size` values of the list, e.g. a bounded window of a history.
+        """
+        if size < 1:
+            raise ValueError("size must be positive")
+        return interned_input(InputValueType.SLICE, key, required, index=-size)
 
 
 class Size:
@@ -91,11 +172,7 @@ class Size:
 
     @staticmethod
     def new(key: str, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.SIZE, key=key),
-            required=required,
-        )
+        return interned_input(InputValueType.SIZE, key, required)
 
 
 class String:
@@ -108,11 +185,7 @@ class String:
 
     @staticmethod
     def new(key: str, value: str, required: bool) -> Input:
-        return Input(
-            name=key,
-            value=InputValue(type=InputValueType.STRING, key=value),
-            required=required,
-        )
+        return interned_input(InputValueType.STRING, value, required, name=key)
 
 
 class Write:
@@ -125,7 +198,7 @@ class Write:
 
     @staticmethod
     def new(key: str) -> Output:
-        return Output(type=OutputType.WRITE, key=key, value="__result")
+        return interned_output(OutputType.WRITE, key)
 
 
 class Insert:
@@ -138,7 +211,7 @@ class Insert:
 
     @staticmethod
     def new(key: str) -> Output:
-        return Output(type=OutputType.INSERT, key=key, value="__result")
+        return interned_output(OutputType.INSERT, key)
 
 
 class Push:
@@ -151,8 +224,24 @@ class Push:
 
     @staticmethod
     def new(key: str) -> Output:
-        return Output(type=OutputType.PUSH, key=key, value="__result")
+        return interned_output(OutputType.PUSH, key)
+
+
+class CappedPush:
+    """
+    A utility class for creating Output objects with CAPPED_PUSH value type.
+
+    This class provides a static method to create Output objects specifically
+    for pushing values onto a list that keeps only the newest `max_length` values,
+    like a ring buffer.
+    """
+
+    @staticmethod
+    def new(key: str, max_length: int) -> Output:
+        if max_length < 1:
+            raise ValueError("max_length must be positive")
+        return interned_output(OutputType.CAPPED_PUSH, key, max_length)
 
 
-INPUTS = Union[Read, GetAll, Size, Peek, Pop]
-OUTPUTS = Union[Write, Insert, Push]
+INPUTS = Union[Read, GetAll, Size, Peek, Pop, Slice]
+OUTPUTS = Union[Write, Insert, Push, CappedPush]
@@ -0,0 +1,364 @@
+from array import array
+from collections import Counter, deque
+from itertools import accumulate
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .w_types import InputValueType, Operator, OutputType
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+_END = "_end"
+_NONE = -1
+
+
+class IRCondition:
+    """
+    A lowered edge condition; `key` and `target_if_not` are indices.
+    """
+
+    __slots__ = ("input_type", "key", "index", "expected", "expression", "target_if_not")
+
+    def __init__(self, input_type, key, index, expected, expression, target_if_not):
+        self.input_type = input_type
+        self.key = key
+        self.index = index
+        self.expected = expected
+        self.expression = expression
+        self.target_if_not = target_if_not
+
+
+class IRTask:
+    """
+    A lowered task. `inputs` holds (type, key, required) and `outputs` (type, key)
+    tuples, with keys as indices into `CompiledWorkflow.keys`.
+    """
+
+    __slots__ = ("id", "operator", "inputs", "outputs")
+
+    def __init__(
+        self,
+        id: str,
+        operator: Operator,
+        inputs: Tuple[Tuple[InputValueType, int, bool], ...],
+        outputs: Tuple[Tuple[OutputType, int], ...],
+    ):
+        self.id = id
+        self.operator = operator
+        self.inputs = inputs
+        self.outputs = outputs
+
+
+def _csr(n: int, pairs: Sequence[Tuple[int, int]]) -> Tuple[array, array]:
+    # group (row, value) pairs by row into offsets + values arrays; the sort is
+    # stable, so values keep their order within a row
+    pairs = sorted(pairs, key=itemgetter(0))
+    counts = Counter(map(itemgetter(0), pairs))
+    offsets = array("i", accumulate(map(counts.__getitem__, range(n)), initial=0))
+    return offsets, array("i", map(itemgetter(1), pairs))
+
+
+class CompiledWorkflow:
+    """
+    An index-based form of a workflow for graph queries.
+
+    Tasks are numbered in workflow order (a referenced but missing `_end` task is
+    appended), memory keys are interned, and edges are stored column-wise in arrays
+    with CSR adjacency: the out-edges, successors and predecessors of a task are
+    contiguous slices. Successors include condition (`target_if_not`) and fallback
+    targets. Build it with `compile_workflow` or `Workflow.compile()`; it does not
+    follow later changes to the workflow.
+    """
+
+    __slots__ = (
+        "tasks",
+        "index",
+        "keys",
+        "key_index",
+        "entry",
+        "end",
+        "edge_source",
+        "edge_target",
+        "edge_fallback",
+        "edge_condition",
+        "_out_offsets",
+        "_out_edges",
+        "_succ_offsets",
+        "_succ",
+        "_pred_offsets",
+        "_pred",
+        "_access",
+    )
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def task_index(self, task_id: str) -> int:
+        """
+        The index of a task.
+
+        Raises:
+            KeyError: If there is no such task.
+        """
+        return self.index[task_id]
+
+    def out_edges(self, task: int) -> array:
+        """
+        Indices of the edges leaving `task`, in workflow order.
+        """
+        return self._out_edges[self._out_offsets[task] : self._out_offsets[task + 1]]
+
+    def successors(self, task: int) -> array:
+        """
+        Indices of the tasks `task` can hand over to.
+        """
+        return self._succ[self._succ_offsets[task] : self._succ_offsets[task + 1]]
+
+    def predecessors(self, task: int) -> array:
+        """
+        Indices of the tasks that can hand over to `task`.
+        """
+        return self._pred[self._pred_offsets[task] : self._pred_offsets[task + 1]]
+
+    def reachable(self, start: Optional[int] = None) -> bytearray:
+        """
+        A 0/1 flag per task: whether it can be reached from `start` (the entry by default).
+        """
+        seen = bytearray(len(self.tasks))
+        if not self.tasks:
+            return seen
+        start = self.entry if start is None else start
+        offsets = self._succ_offsets
+        succ = self._succ
+        seen[start] = 1
+        queue = deque((start,))
+        while queue:
+            task = queue.popleft()
+            for j in range(offsets[task], offsets[task + 1]):
+                target = succ[j]
+                if not seen[target]:
+                    seen[target] = 1
+                    queue.append(target)
+        return seen
+
+    def distances(self, start: Optional[int] = None, reverse: bool = False) -> array:
+        """
+        The number of transitions from `start` (the entry by default) to each task, or -1
+        where it cannot be reached. With `reverse`, the distances from each task to `start`.
+        """
+        dist = array("i", [_NONE]) * len(self.tasks)
+        if not self.tasks:
+            return dist
+        start = self.entry if start is None else start
+        if reverse:
+            offsets, adjacent = self._pred_offsets, self._pred
+        else:
+            offsets, adjacent = self._succ_offsets, self._succ
+        dist[start] = 0
+        queue = deque((start,))
+        while queue:
+            task = queue.popleft()
+            for j in range(offsets[task], offsets[task + 1]):
+                target = adjacent[j]
+                if dist[target] == _NONE:
+                    dist[target] = dist[task] + 1
+                    queue.append(target)
+        return dist
+
+    def topological_order(self) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        The tasks reachable from the entry in topological order of the graph without its
+        back edges, and those back edges as (source, target) pairs. Back edges are the
+        transitions that close a loop, e.g. a condition jumping back to an earlier task.
+        """
+        if not self.tasks:
+            return [], []
+        offsets = self._succ_offsets
+        succ = self._succ
+        # 0: new, 1: on the DFS stack, 2: done
+        state = bytearray(len(self.tasks))
+        postorder: List[int] = []
+        back: List[Tuple[int, int]] = []
+        state[self.entry] = 1
+        stack = [(self.entry, offsets[self.entry])]
+        while stack:
+            task, j = stack[-1]
+            if j == offsets[task + 1]:
+                stack.pop()
+                state[task] = 2
+                postorder.append(task)
+                continue
+            stack[-1] = (task, j + 1)
+            target = succ[j]
+            if state[target] == 1:
+                back.append((task, target))
+            elif not state[target]:
+                state[target] = 1
+                stack.append((target, offsets[target]))
+        postorder.reverse()
+        return postorder, back
+
+    def max_executions(self, max_steps: int) -> array:
+        """
+        An upper bound on how often each task can run within `max_steps` steps: 0 if it is
+        unreachable, 1 if it is on no loop, and otherwise `max_steps` divided by the length
+        of the shortest loop through it, rounded up.
+        """
+        runs = array("i", list(self.reachable()))
+        _, back = self.topological_order()
+        # every loop contains a back edge u -> v, so a loop through t is at least
+        # dist(v, t) + dist(t, u) + 1 transitions long
+        shortest = array("i", [0]) * len(self.tasks)
+        for u, v in back:
+            to_task = self.distances(v)
+            from_task = self.distances(u, reverse=True)
+            for t in range(len(self.tasks)):
+                if to_task[t] != _NONE and from_task[t] != _NONE:
+                    length = to_task[t] + from_task[t] + 1
+                    if not shortest[t] or length < shortest[t]:
+                        shortest[t] = length
+        for t, length in enumerate(shortest):
+            if length and runs[t]:
+                runs[t] = max(1, -(-max_steps // length))
+        return runs
+
+    def readers(self, key: str) -> List[int]:
+        """
+        Indices of the tasks with an input on memory `key`.
+        """
+        return self._key_access()[0].get(self.key_index.get(key, _NONE), [])
+
+    def writers(self, key: str) -> List[int]:
+        """
+        Indices of the tasks with an output to memory `key`.
+        """
+        return self._key_access()[1].get(self.key_index.get(key, _NONE), [])
+
+    def _key_access(self) -> Tuple[Dict[int, List[int]], Dict[int, List[int]]]:
+        if self._access is None:
+            readers: Dict[int, List[int]] = {}
+            writers: Dict[int, List[int]] = {}
+            for i, task in enumerate(self.tasks):
+                for input_type, key, _ in task.inputs:
+                    if input_type != InputValueType.STRING:
+                        readers.setdefault(key, []).append(i)
+                for _, key in task.outputs:
+                    writers.setdefault(key, []).append(i)
+            self._access = (readers, writers)
+        return self._access
+
+
+def compile_workflow(workflow: "Workflow") -> CompiledWorkflow:
+    """
+    Lower a workflow to a `CompiledWorkflow` in a single pass over tasks and steps.
+
+    Args:
+        workflow (Workflow): The workflow.
+
+    Returns:
+        CompiledWorkflow: The compiled form.
+
+    Raises:
+        ValueError: If task ids are duplicated or an edge refers to an unknown task.
+    """
+    ir = CompiledWorkflow.__new__(CompiledWorkflow)
+    keys: List[str] = []
+    key_index: Dict[str, int] = {}
+
+    def intern(key: str) -> int:
+        i = key_index.get(key)
+        if i is None:
+            i = key_index[key] = len(keys)
+            keys.append(key)
+        return i
+
+    # Inputs and outputs are interned (see io.py), so most tasks share descriptor
+    # objects; lower each object once. Keyed by id(), which is stable while the
+    # workflow holds the objects.
+    lowered: Dict[int, tuple] = {}
+
+    def lower_input(input) -> tuple:
+        item = lowered.get(id(input))
+        if item is None:
+            item = lowered[id(input)] = (
+                input.value.type,
+                intern(input.value.key),
+                input.required,
+            )
+        return item
+
+    def lower_output(output) -> tuple:
+        item = lowered.get(id(output))
+        if item is None:
+            item = lowered[id(output)] = (output.type, intern(output.key))
+        return item
+
+    tasks: List[IRTask] = []
+    index: Dict[str, int] = {}
+    for task in workflow.tasks:
+        if task.id in index:
+            raise ValueError(f"Duplicate task id '{task.id}'")
+        index[task.id] = len(tasks)
+        tasks.append(
+            IRTask(
+                task.id,
+                task.operator,
+                tuple(map(lower_input, task.inputs)),
+                tuple(map(lower_output, task.outputs)),
+            )
+        )
+
+    def resolve(task_id: str) -> int:
+        i = index.get(task_id)
+        if i is None:
+            if task_id != _END:
+                raise ValueError(f"Edge refers to unknown task '{task_id}'")
+            i = index[_END] = len(tasks)
+            tasks.append(IRTask(_END, Operator.END, (), ()))
+        return i
+
+    steps = workflow.steps
+    edge_source = array("i", bytes(4 * len(steps)))
+    edge_target = array("i", bytes(4 * len(steps)))
+    edge_fallback = array("i", [_NONE]) * len(steps)
+    edge_condition: List[Optional[IRCondition]] = [None] * len(steps)
+    transitions: List[Tuple[int, int]] = []
+    for e, edge in enumerate(steps):
+        source = edge_source[e] = resolve(edge.source)
+        edge_target[e] = resolve(edge.target)
+        transitions.append((source, edge_target[e]))
+        condition = edge.condition
+        if condition is not None:
+            target_if_not = resolve(condition.target_if_not)
+            edge_condition[e] = IRCondition(
+                condition.input.type,
+                intern(condition.input.key),
+                condition.input.index,
+                condition.expected,
+                condition.expression,
+                target_if_not,
+            )
+            transitions.append((source, target_if_not))
+        if edge.fallback is not None:
+            edge_fallback[e] = resolve(edge.fallback)
+            transitions.append((source, edge_fallback[e]))
+
+    n = len(tasks)
+    ir.tasks = tasks
+    ir.index = index
+    ir.keys = keys
+    ir.key_index = key_index
+    ir.entry = 0
+    ir.end = index.get(_END)
+    ir.edge_source = edge_source
+    ir.edge_target = edge_target
+    ir.edge_fallback = edge_fallback
+    ir.edge_condition = edge_condition
+    ir._out_offsets, ir._out_edges = _csr(n, [(s, e) for e, s in enumerate(edge_source)])
+    unique = list(dict.fromkeys(transitions))
+    ir._succ_offsets, ir._succ = _csr(n, unique)
+    ir._pred_offsets, ir._pred = _csr(n, [(t, s) for s, t in unique])
+    ir._access = None
+    return ir
+
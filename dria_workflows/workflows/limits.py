@@ -0,0 +1,310 @@
+import heapq
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+from .interface import Condition
+from .w_types import Operator
+from .workflow import Workflow
+
+# Rough seconds per task by operator, for sizing `max_time`. The `latency` and
+# `task_latency` arguments below override them by operator and by task id.
+OPERATOR_LATENCY: Dict[Operator, float] = {
+    Operator.GENERATION: 10.0,
+    Operator.FUNCTION_CALLING: 15.0,
+    Operator.FUNCTION_CALLING_RAW: 15.0,
+    Operator.SEARCH: 5.0,
+    Operator.SAMPLE: 1.0,
+    Operator.END: 0.0,
+}
+
+
+class Loop:
+    """
+    A loop of the step graph, closed by the transition `back` (source id, target id).
+
+    `tasks` are the task ids on it, in workflow order, and `exits` the edges leaving it as
+    (source id, target id, condition) triples; the condition, if any, is what has to hold
+    for the edge's target to be taken rather than `target_if_not`.
+    """
+
+    __slots__ = ("back", "tasks", "exits")
+
+    def __init__(
+        self,
+        back: Tuple[str, str],
+        tasks: List[str],
+        exits: List[Tuple[str, str, Optional[Condition]]],
+    ):
+        self.back = back
+        self.tasks = tasks
+        self.exits = exits
+
+
+class StepAnalysis:
+    """
+    Static step and time bounds of a workflow.
+
+    `shortest_*` are the fewest steps and least time to reach the end, `longest_*` the
+    most along a path that does not repeat a loop. Steps count executed tasks, not the
+    end task. `max_steps` and `max_time` are the recommended limits (see `analyze_limits`).
+    """
+
+    __slots__ = (
+        "shortest_steps",
+        "longest_steps",
+        "shortest_time",
+        "longest_time",
+        "loops",
+        "max_steps",
+        "max_time",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+def analyze_limits(
+    workflow: Workflow,
+    latency: Optional[Dict[Operator, float]] = None,
+    task_latency: Optional[Dict[str, float]] = None,
+    loop_iterations: int = 3,
+    margin: float = 1.5,
+) -> StepAnalysis:
+    """
+    Bound the steps and time of a workflow from its step graph.
+
+    The recommended limits allow the longest path without loops plus `loop_iterations`
+    extra rounds of every loop, times `margin`.
+
+    Args:
+        workflow (Workflow): The workflow.
+        latency (Dict[Operator, float], optional): Seconds per task by operator. Defaults to `OPERATOR_LATENCY`.
+        task_latency (Dict[str, float], optional): Seconds of individual tasks, by id.
+        loop_iterations (int, optional): Extra rounds to allow per loop. Defaults to 3.
+        margin (float, optional): Factor applied to the recommended limits. Defaults to 1.5.
+
+    Returns:
+        StepAnalysis: The bounds and recommended limits.
+    """
+    ir = workflow.compile()
+    steps = [0 if task.operator == Operator.END else 1 for task in ir.tasks]
+    seconds = _task_latency(ir, latency, task_latency)
+    order, back = ir.topological_order()
+    back_set = set(back)
+    end = ir.end if ir.end is not None and ir.reachable()[ir.end] else None
+
+    def shortest(weight) -> float:
+        # Dijkstra on task weights; the weight of a path includes its first task
+        if end is None:
+            return 0
+        best = [math.inf] * len(ir.tasks)
+        best[ir.entry] = weight[ir.entry]
+        heap = [(best[ir.entry], ir.entry)]
+        while heap:
+            total, task = heapq.heappop(heap)
+            if total > best[task]:
+                continue
+            for target in ir.successors(task):
+                if total + weight[target] < best[target]:
+                    best[target] = total + weight[target]
+                    heapq.heappush(heap, (best[target], target))
+        return best[end]
+
+    def longest(weight) -> float:
+        best = [-math.inf] * len(ir.tasks)
+        if not order:
+            return 0
+        best[ir.entry] = weight[ir.entry]
+        for task in order:
+            for target in ir.successors(task):
+                if (task, target) not in back_set:
+                    best[target] = max(best[target], best[task] + weight[target])
+        return best[end] if end is not None else max(best[task] for task in order)
+
+    loops = []
+    loop_steps = loop_time = 0
+    for u, v in back:
+        from_v = ir.distances(v)
+        to_u = ir.distances(u, reverse=True)
+        body = [t for t in range(len(ir.tasks)) if from_v[t] >= 0 and to_u[t] >= 0]
+        inside = set(body)
+        exits = []
+        for t in body:
+            for e in ir.out_edges(t):
+                condition = ir.edge_condition[e]
+                targets = [ir.edge_target[e]]
+                if condition is not None:
+                    targets.append(condition.target_if_not)
+                if ir.edge_fallback[e] >= 0:
+                    targets.append(ir.edge_fallback[e])
+                if any(target not in inside for target in targets):
+                    exits.append(
+                        (
+                            ir.tasks[t].id,
+                            ir.tasks[ir.edge_target[e]].id,
+                            workflow.steps[e].condition,
+                        )
+                    )
+        loops.append(
+            Loop((ir.tasks[u].id, ir.tasks[v].id), [ir.tasks[t].id for t in body], exits)
+        )
+        loop_steps += sum(steps[t] for t in body)
+        loop_time += sum(seconds[t] for t in body)
+
+    longest_steps = int(longest(steps))
+    longest_time = longest(seconds)
+    return StepAnalysis(
+        shortest_steps=int(shortest(steps)),
+        longest_steps=longest_steps,
+        shortest_time=shortest(seconds),
+        longest_time=longest_time,
+        loops=loops,
+        max_steps=math.ceil((longest_steps + loop_iterations * loop_steps) * margin),
+        max_time=math.ceil((longest_time + loop_iterations * loop_time) * margin),
+    )
+
+
+class Simulation:
+    """
+    Steps and seconds of simulated runs, one entry per run. `truncated` counts the runs
+    stopped at the step cap before reaching the end.
+    """
+
+    __slots__ = ("steps", "times", "truncated")
+
+    def __init__(self, steps: List[int], times: List[float], truncated: int):
+        self.steps = steps
+        self.times = times
+        self.truncated = truncated
+
+    def percentile(self, q: float) -> Tuple[int, float]:
+        """
+        The `q`-th percentile (0-100) of steps and of time.
+        """
+        if not self.steps:
+            return 0, 0.0
+        i = min(len(self.steps) - 1, max(0, math.ceil(q / 100 * len(self.steps)) - 1))
+        return sorted(self.steps)[i], sorted(self.times)[i]
+
+    def exceeding(self, max_steps: int, max_time: float) -> float:
+        """
+        The fraction of runs that would hit either limit.
+        """
+        if not self.steps:
+            return 0.0
+        over = sum(
+            1 for s, t in zip(self.steps, self.times) if s > max_steps or t > max_time
+        )
+        return over / len(self.steps)
+
+    def recommend(self, q: float = 99, margin: float = 1.2) -> Tuple[int, int]:
+        """
+        `max_steps` and `max_time` covering the `q`-th percentile run, times `margin`.
+        """
+        steps, time = self.percentile(q)
+        return math.ceil(steps * margin), math.ceil(time * margin)
+
+
+def simulate_limits(
+    workflow: Workflow,
+    probabilities: Optional[Dict[str, float]] = None,
+    latency: Optional[Dict[Operator, float]] = None,
+    task_latency: Optional[Dict[str, float]] = None,
+    failure_rate: float = 0.0,
+    runs: int = 10000,
+    max_steps: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Simulation:
+    """
+    Monte Carlo runs of the step graph.
+
+    At each task the edge leaving it is followed. A condition on it holds with the
+    probability given for the edge's source task (0.5 if not given), otherwise the run
+    goes to `target_if_not`; a fallback is taken with probability `failure_rate`.
+
+    Workflows that branch through `target_if_not` are simulated; a task with several
+    outgoing edges cannot be, since nothing says which of them a run takes. Use
+    `analyze_limits` for those, which considers every edge.
+
+    Args:
+        workflow (Workflow): The workflow.
+        probabilities (Dict[str, float], optional): Per source task id, how likely its edge's condition holds.
+        latency (Dict[Operator, float], optional): Seconds per task by operator, see `analyze_limits`.
+        task_latency (Dict[str, float], optional): Seconds of individual tasks, by id.
+        failure_rate (float, optional): How likely a task fails over to its fallback. Defaults to 0.
+        runs (int, optional): Number of runs. Defaults to 10000.
+        max_steps (int, optional): Stop runs after this many steps. Defaults to 10 times `config.max_steps`.
+        seed (int, optional): Random seed.
+
+    Returns:
+        Simulation: Steps and time per run.
+
+    Raises:
+        ValueError: If a task has more than one outgoing edge.
+    """
+    ir = workflow.compile()
+    probabilities = probabilities or {}
+    cap = max_steps if max_steps is not None else 10 * workflow.config.max_steps
+    seconds = _task_latency(ir, latency, task_latency)
+    n = len(ir.tasks)
+    # per task: (target, probability, target_if_not, fallback), -1 where missing
+    moves: List[Optional[Tuple[int, float, int, int]]] = [None] * n
+    for t in range(n):
+        edges = ir.out_edges(t)
+        if not len(edges) or ir.tasks[t].operator == Operator.END:
+            continue
+        if len(edges) > 1:
+            raise ValueError(
+                f"Task {ir.tasks[t].id} has {len(edges)} outgoing edges; "
+                "simulate_limits can only follow one edge per task"
+            )
+        (e,) = edges
+        condition = ir.edge_condition[e]
+        moves[t] = (
+            ir.edge_target[e],
+            probabilities.get(ir.tasks[t].id, 0.5) if condition is not None else 1.0,
+            condition.target_if_not if condition is not None else -1,
+            ir.edge_fallback[e],
+        )
+
+    rng = random.Random(seed)
+    draw = rng.random
+    all_steps: List[int] = []
+    all_times: List[float] = []
+    truncated = 0
+    for _ in range(runs):
+        task = ir.entry
+        steps = 0
+        time = 0.0
+        while n:
+            if ir.tasks[task].operator != Operator.END:
+                steps += 1
+            time += seconds[task]
+            move = moves[task]
+            if move is None:
+                break
+            if steps >= cap:
+                truncated += 1
+                break
+            target, p, target_if_not, fallback = move
+            if fallback >= 0 and failure_rate and draw() < failure_rate:
+                task = fallback
+            elif p >= 1.0 or draw() < p:
+                task = target
+            else:
+                task = target_if_not
+        all_steps.append(steps)
+        all_times.append(time)
+    return Simulation(all_steps, all_times, truncated)
+
+
+def _task_latency(
+    ir, latency: Optional[Dict[Operator, float]], task_latency: Optional[Dict[str, float]]
+) -> List[float]:
+    latency = {**OPERATOR_LATENCY, **(latency or {})}
+    task_latency = task_latency or {}
+    return [
+        task_latency.get(task.id, latency.get(task.operator, 0.0)) for task in ir.tasks
+    ]
@@ -0,0 +1,137 @@
+import re
+from typing import Any, Dict, List, Set
+
+from .serialization import dumps, to_dict, to_json
+from .workflow import Workflow
+
+# Placeholder name and description the builder gives every task
+_DEFAULT_NAME = "Task"
+_DEFAULT_DESCRIPTION = "Task Description"
+
+_VARIABLE = re.compile(r"(\{\{\w+\}\})")
+# A shared string costs a memory entry, and each use a `{{key}}` and an input object.
+_MEMORY_ENTRY_BYTES = 10
+_USE_BYTES = 80
+
+
+def minimal_dict(
+    workflow: Workflow, share_strings: bool = True, min_length: int = 64
+) -> Dict[str, Any]:
+    """
+    Dump a workflow with as few bytes as the node needs, for dispatch.
+
+    Starts from the compact dump and, keeping it valid against `validate_workflow_json`:
+
+    - empties task names and descriptions that are the builder's placeholders,
+    - empties the messages of end tasks, which are never sent to a model,
+    - drops `to_json: false` from the return value,
+    - with `share_strings`, moves prompt text of at least `min_length` characters that
+      repeats across messages to `external_memory`, in its place a `{{key}}` variable
+      with a read input, when that is smaller. Only text between variables is shared,
+      so substituting the variables gives back the original prompts.
+
+    Args:
+        workflow (Workflow): The workflow.
+        share_strings (bool, optional): Share repeated prompt text. Defaults to True.
+        min_length (int, optional): Shortest text worth sharing. Defaults to 64.
+
+    Returns:
+        Dict[str, Any]: JSON-compatible data; `Workflow.from_dict` loads it.
+    """
+    data = to_dict(workflow, compact=True)
+    for task in data.get("tasks", ()):
+        if task.get("name") == _DEFAULT_NAME:
+            task["name"] = ""
+        if task.get("description") == _DEFAULT_DESCRIPTION:
+            task["description"] = ""
+        if task.get("operator") == "end":
+            task["messages"] = []
+    return_value = data.get("return_value")
+    if return_value and return_value.get("to_json") is False:
+        del return_value["to_json"]
+    if share_strings:
+        _share_strings(data, min_length)
+    return data
+
+
+def _share_strings(data: Dict[str, Any], min_length: int) -> None:
+    tasks = data.get("tasks", ())
+    counts: Dict[str, int] = {}
+    for task in tasks:
+        for message in task.get("messages", ()):
+            for part in _VARIABLE.split(message["content"])[::2]:
+                if len(part.encode("utf-8")) >= min_length:
+                    counts[part] = counts.get(part, 0) + 1
+
+    memory = data.get("external_memory") or {}
+    taken = _used_keys(data)
+    shared: Dict[str, str] = {}
+    for text, uses in counts.items():
+        size = len(dumps(text))
+        if uses > 1 and size * (uses - 1) > _MEMORY_ENTRY_BYTES + uses * _USE_BYTES:
+            key = f"_s{len(shared)}"
+            while key in taken:
+                key = "_" + key
+            shared[text] = key
+    if not shared:
+        return
+
+    for task in tasks:
+        used: List[str] = []
+        for message in task.get("messages", ()):
+            parts = _VARIABLE.split(message["content"])
+            for i in range(0, len(parts), 2):
+                key = shared.get(parts[i])
+                if key is not None:
+                    parts[i] = "{{" + key + "}}"
+                    if key not in used:
+                        used.append(key)
+            message["content"] = "".join(parts)
+        if used:
+            task.setdefault("inputs", []).extend(
+                {"name": key, "value": {"type": "read", "key": key}, "required": True}
+                for key in used
+            )
+    data["external_memory"] = {
+        **memory,
+        **{key: text for text, key in shared.items()},
+    }
+
+
+def _used_keys(data: Dict[str, Any]) -> Set[str]:
+    # memory keys, input names and prompt variables the dump already uses
+    used = set(data.get("external_memory") or ())
+    for task in data.get("tasks", ()):
+        for input in task.get("inputs", ()):
+            used.add(input["name"])
+            used.add(input["value"]["key"])
+        used.update(output["key"] for output in task.get("outputs", ()))
+        for message in task.get("messages", ()):
+            used.update(variable[2:-2] for variable in _VARIABLE.findall(message["content"]))
+    for step in data.get("steps", ()):
+        if step.get("condition"):
+            used.add(step["condition"]["input"]["key"])
+    return_value = data.get("return_value") or {}
+    returned = return_value.get("input", ())
+    for value in returned if isinstance(returned, list) else [returned]:
+        used.add(value["key"])
+    return used
+
+
+def minimal_json(workflow: Workflow, **options) -> bytes:
+    """
+    JSON bytes of `minimal_dict`. See `minimal_dict` for options.
+    """
+    return dumps(minimal_dict(workflow, **options))
+
+
+def payload_savings(workflow: Workflow, **options) -> Dict[str, int]:
+    """
+    Bytes of a workflow's dumps: "full" (`to_json`), "compact" (`to_json(compact=True)`),
+    "minimal" (`minimal_json`) and "saved", the difference between full and minimal.
+    See `minimal_dict` for options.
+    """
+    full = len(to_json(workflow))
+    compact = len(to_json(workflow, compact=True))
+    minimal = len(minimal_json(workflow, **options))
+    return {"full": full, "compact": compact, "minimal": minimal, "saved": full - minimal}
@@ -0,0 +1,244 @@
+from typing import Dict, List, Set, Tuple
+
+from .interface import Edge, InputValue, Task
+from .w_types import InputValueType, Operator
+from .workflow import Workflow
+
+_END = "_end"
+_LLM_OPERATORS = (
+    Operator.GENERATION,
+    Operator.FUNCTION_CALLING,
+    Operator.FUNCTION_CALLING_RAW,
+)
+# tool calls may act on the outside world, so these tasks are kept unless asked
+_TOOL_OPERATORS = (Operator.FUNCTION_CALLING, Operator.FUNCTION_CALLING_RAW)
+
+
+class OptimizationReport:
+    """
+    What `optimize_workflow` removed.
+
+    `llm_calls_saved` counts the removed reachable generation and function calling
+    tasks once each, i.e. per run of the workflow outside of loops.
+    """
+
+    __slots__ = (
+        "removed_tasks",
+        "removed_outputs",
+        "removed_memory_keys",
+        "llm_calls_saved",
+        "bytes_before",
+        "bytes_after",
+    )
+
+    def __init__(
+        self,
+        removed_tasks: List[str],
+        removed_outputs: List[Tuple[str, str]],
+        removed_memory_keys: List[str],
+        llm_calls_saved: int,
+        bytes_before: int,
+        bytes_after: int,
+    ):
+        self.removed_tasks = removed_tasks
+        self.removed_outputs = removed_outputs
+        self.removed_memory_keys = removed_memory_keys
+        self.llm_calls_saved = llm_calls_saved
+        self.bytes_before = bytes_before
+        self.bytes_after = bytes_after
+
+    @property
+    def bytes_saved(self) -> int:
+        """
+        Size reduction of the compact JSON.
+        """
+        return self.bytes_before - self.bytes_after
+
+
+def optimize_workflow(
+    workflow: Workflow, remove_tool_calls: bool = False
+) -> Tuple[Workflow, OptimizationReport]:
+    """
+    Remove the parts of a workflow that cannot affect its result.
+
+    Keys are live if the return value, an edge condition or a kept task reads them. Tasks
+    are kept if they are reachable and write (or pop from) a live key, or if they steer
+    the flow: tasks with a condition, a fallback or several edges leaving them. Removed
+    tasks are bypassed by pointing the edges to them at their successor. Outputs to keys
+    that are not live and memory keys that are not live are dropped. A workflow without
+    a return value has no observable result, so only unreachable tasks and unread
+    memory keys are removed from it.
+
+    The input workflow is not modified; unchanged tasks and edges are shared with it.
+
+    Args:
+        workflow (Workflow): The workflow.
+        remove_tool_calls (bool, optional): Also remove dead function calling tasks, whose tools may have
+            side effects. Defaults to False.
+
+    Returns:
+        Tuple[Workflow, OptimizationReport]: The optimized workflow and what was removed.
+    """
+    ir = workflow.compile()
+    reachable = ir.reachable()
+    tasks = [task for i, task in enumerate(workflow.tasks) if reachable[i]]
+    steps = [edge for edge in workflow.steps if reachable[ir.index[edge.source]]]
+    observed = workflow.return_value is not None
+
+    out_edges: Dict[str, List[Edge]] = {}
+    for edge in steps:
+        out_edges.setdefault(edge.source, []).append(edge)
+
+    def bypassable(task: Task) -> bool:
+        edges = out_edges.get(task.id, ())
+        return (
+            observed
+            and task.id != _END
+            and len(edges) == 1
+            and edges[0].condition is None
+            and edges[0].fallback is None
+            and (remove_tool_calls or task.operator not in _TOOL_OPERATORS)
+        )
+
+    forced = {task.id for task in tasks if not bypassable(task)}
+    while True:
+        live, kept = _liveness(workflow, tasks, steps, forced)
+        bypass = _bypass(tasks, kept, out_edges)
+        # removed tasks must lead to a kept one, and something must run before the end
+        stuck = {task_id for task_id in bypass if _resolve(task_id, bypass) in bypass}
+        if tasks and tasks[0].id in bypass and _resolve(tasks[0].id, bypass) == _END:
+            stuck.add(tasks[0].id)
+        if not stuck:
+            break
+        forced |= stuck
+
+    new_tasks: List[Task] = []
+    removed_outputs: List[Tuple[str, str]] = []
+    for task in tasks:
+        if task.id not in kept:
+            continue
+        outputs = [output for output in task.outputs if output.key in live]
+        if len(outputs) != len(task.outputs):
+            removed_outputs.extend(
+                (task.id, output.key) for output in task.outputs if output.key not in live
+            )
+            task = task.model_copy(update={"outputs": outputs})
+        new_tasks.append(task)
+    if tasks and tasks[0].id in bypass:
+        # the first task is the entry: start at the task it was bypassed to
+        entry = _resolve(tasks[0].id, bypass)
+        new_tasks.sort(key=lambda task: task.id != entry)
+
+    new_steps = []
+    for edge in steps:
+        if edge.source not in kept:
+            continue
+        update = {}
+        for field in ("target", "fallback"):
+            value = getattr(edge, field)
+            if value in bypass:
+                update[field] = _resolve(value, bypass)
+        condition = edge.condition
+        if condition is not None and condition.target_if_not in bypass:
+            update["condition"] = condition.model_copy(
+                update={"target_if_not": _resolve(condition.target_if_not, bypass)}
+            )
+        new_steps.append(edge.model_copy(update=update) if update else edge)
+
+    memory = workflow.external_memory or {}
+    removed_keys = [key for key in memory if key not in live]
+    new_memory = {key: value for key, value in memory.items() if key in live}
+
+    optimized = workflow.model_copy(
+        update={"tasks": new_tasks, "steps": new_steps, "external_memory": new_memory}
+    )
+    removed_tasks = [task.id for task in workflow.tasks if task.id not in kept]
+    llm_calls = sum(
+        1 for task in tasks if task.id not in kept and task.operator in _LLM_OPERATORS
+    )
+    report = OptimizationReport(
+        removed_tasks=removed_tasks,
+        removed_outputs=removed_outputs,
+        removed_memory_keys=removed_keys,
+        llm_calls_saved=llm_calls,
+        bytes_before=len(workflow.to_json(compact=True)),
+        bytes_after=len(optimized.to_json(compact=True)),
+    )
+    return optimized, report
+
+
+def _read_keys(value: InputValue) -> List[str]:
+    keys = [] if value.type == InputValueType.STRING else [value.key]
+    if value.search_query is not None:
+        keys.append(value.search_query.key)
+    return keys
+
+
+def _liveness(
+    workflow: Workflow, tasks: List[Task], steps: List[Edge], forced: Set[str]
+) -> Tuple[Set[str], Set[str]]:
+    """
+    Live keys and kept task ids, by a worklist over keys: a live key makes its writers
+    (and poppers) kept, and a kept task makes the keys it reads live.
+    """
+    writers: Dict[str, List[Task]] = {}
+    for task in tasks:
+        for output in task.outputs:
+            writers.setdefault(output.key, []).append(task)
+        for input in task.inputs:
+            if input.value.type == InputValueType.POP:
+                # popping changes what later readers see
+                writers.setdefault(input.value.key, []).append(task)
+
+    live: Set[str] = set()
+    kept: Set[str] = set()
+    pending: List[str] = []
+
+    def read(value: InputValue) -> None:
+        for key in _read_keys(value):
+            if key not in live:
+                live.add(key)
+                pending.append(key)
+
+    def keep(task: Task) -> None:
+        if task.id not in kept:
+            kept.add(task.id)
+            for input in task.inputs:
+                read(input.value)
+
+    return_value = workflow.return_value
+    if return_value is None:
+        # nothing is observable: keep every task and its outputs
+        for task in tasks:
+            keep(task)
+            for output in task.outputs:
+                live.add(output.key)
+    else:
+        values = return_value.input
+        for value in values if isinstance(values, list) else [values]:
+            read(value)
+    for edge in steps:
+        if edge.condition is not None:
+            read(edge.condition.input)
+    for task in tasks:
+        if task.id in forced:
+            keep(task)
+    while pending:
+        for task in writers.get(pending.pop(), ()):
+            keep(task)
+    return live, kept
+
+
+def _bypass(tasks: List[Task], kept: Set[str], out_edges: Dict[str, List[Edge]]) -> Dict[str, str]:
+    # removed task -> the target of its single unconditional edge
+    return {
+        task.id: out_edges[task.id][0].target for task in tasks if task.id not in kept
+    }
+
+
+def _resolve(task_id: str, bypass: Dict[str, str]) -> str:
+    seen = set()
+    while task_id in bypass and task_id not in seen:
+        seen.add(task_id)
+        task_id = bypass[task_id]
+    return task_id
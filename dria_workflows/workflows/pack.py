@@ -0,0 +1,290 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .interface import (
+    Config,
+    Edge,
+    Input,
+    InputValue,
+    MessageInput,
+    Output,
+    SearchQuery,
+    Task,
+    TaskOutput,
+)
+from .io import interned_input, interned_output
+from .w_types import InputValueType, Operator
+from .workflow import Workflow
+
+_END = "_end"
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+
+
+class PackManifest:
+    """
+    How a packed workflow maps back to the workflows in it.
+
+    `prefixes` are the namespaces of the workflows (task ids and memory keys of workflow
+    `i` start with `prefixes[i]`), and `returns` how many values each one returns: None
+    for a single value, otherwise the length of its list.
+    """
+
+    __slots__ = ("prefixes", "returns")
+
+    def __init__(self, prefixes: List[str], returns: List[Optional[int]]):
+        self.prefixes = prefixes
+        self.returns = returns
+
+    def __len__(self) -> int:
+        return len(self.prefixes)
+
+
+def pack_workflows(
+    workflows: Sequence[Workflow], prefix: str = "p"
+) -> Tuple[Workflow, PackManifest]:
+    """
+    Merge workflows into one that runs them one after the other, so many small
+    workflows cost one job.
+
+    Task ids and memory keys of workflow `i` are prefixed with `{prefix}{i}_` (also in
+    prompt variables, inputs, outputs and conditions), the end of each workflow leads to
+    the start of the next, and the return value lists the return values of all
+    workflows, as JSON. Limits add up. Split the result with `unpack_result`.
+
+    Args:
+        workflows (Sequence[Workflow]): The workflows; they need equal tools, custom tools and
+            `max_tokens`, a return value and no post-processing.
+        prefix (str, optional): Start of the namespaces; letters, digits or underscores. Defaults to "p".
+
+    Returns:
+        Tuple[Workflow, PackManifest]: The packed workflow and what `unpack_result` needs.
+
+    Raises:
+        ValueError: If the workflows cannot be packed together.
+    """
+    if not workflows:
+        raise ValueError("No workflows to pack")
+    if not re.fullmatch(r"\w+", prefix):
+        raise ValueError("prefix must only contain letters, digits or underscores")
+    first = workflows[0].config
+    for workflow in workflows:
+        config = workflow.config
+        if (config.tools, config.custom_tools, config.max_tokens) != (
+            first.tools,
+            first.custom_tools,
+            first.max_tokens,
+        ):
+            raise ValueError("Workflows with different tools or max_tokens cannot be packed")
+        if workflow.return_value is None or workflow.return_value.post_process:
+            raise ValueError(
+                "Only workflows with a return value and no post-processing can be packed"
+            )
+
+    prefixes = [f"{prefix}{i}_" for i in range(len(workflows))]
+    entries = [
+        prefixes[i] + workflow.tasks[0].id if workflow.tasks else None
+        for i, workflow in enumerate(workflows)
+    ]
+    tasks: List[Task] = []
+    steps: List[Edge] = []
+    memory: Dict[str, Any] = {}
+    returns: List[InputValue] = []
+    counts: List[Optional[int]] = []
+    groups: List[List[str]] = []
+    for i, workflow in enumerate(workflows):
+        # the end of this workflow is the start of the next non-empty one
+        following = next((entry for entry in entries[i + 1 :] if entry), _END)
+        ids = {task.id: prefixes[i] + task.id for task in workflow.tasks}
+        ids[_END] = following
+        rename_key = _prefixer(prefixes[i])
+        tasks.extend(
+            rename_task(task, ids[task.id], rename_key)
+            for task in workflow.tasks
+            if task.id != _END
+        )
+        steps.extend(rename_edge(edge, ids, rename_key) for edge in workflow.steps)
+        for key, value in (workflow.external_memory or {}).items():
+            memory[rename_key(key)] = value
+        values = workflow.return_value.input
+        if isinstance(values, list):
+            returns.extend(rename_value(value, rename_key) for value in values)
+            counts.append(len(values))
+        else:
+            returns.append(rename_value(values, rename_key))
+            counts.append(None)
+        groups.extend(
+            [ids[task_id] for task_id in group]
+            for group in workflow.config.parallel_groups or ()
+        )
+    end = next(
+        (task for workflow in workflows for task in workflow.tasks if task.id == _END),
+        None,
+    )
+    if end is None:
+        end = Task(
+            id=_END,
+            name="Task",
+            description="Task Description",
+            messages=[MessageInput(role="user", content="")],
+            operator=Operator.END,
+        )
+    tasks.append(end)
+
+    config = Config(
+        max_steps=sum(workflow.config.max_steps for workflow in workflows),
+        max_time=sum(workflow.config.max_time for workflow in workflows),
+        tools=first.tools,
+        custom_tools=first.custom_tools,
+        max_tokens=first.max_tokens,
+    )
+    if any(workflow.config.parallel_groups for workflow in workflows):
+        config.parallel_groups = groups
+    packed = Workflow(
+        config=config,
+        external_memory=memory,
+        tasks=tasks,
+        steps=steps,
+        return_value=TaskOutput(input=returns, to_json=True),
+    )
+    return packed, PackManifest(prefixes, counts)
+
+
+def unpack_result(
+    result: Union[str, bytes, List[Any]], manifest: PackManifest
+) -> List[Any]:
+    """
+    Split the result of a packed workflow into the results of its workflows.
+
+    Args:
+        result (Union[str, bytes, List[Any]]): The returned JSON list, raw or decoded.
+        manifest (PackManifest): The manifest from `pack_workflows`.
+
+    Returns:
+        List[Any]: One result per workflow: a value, or a list for workflows returning several.
+
+    Raises:
+        ValueError: If the result does not have one value per returned key.
+    """
+    if isinstance(result, (str, bytes)):
+        result = json.loads(result)
+    expected = sum(1 if count is None else count for count in manifest.returns)
+    if not isinstance(result, list) or len(result) != expected:
+        raise ValueError(f"Expected a list of {expected} values")
+    results = []
+    position = 0
+    for count in manifest.returns:
+        if count is None:
+            results.append(result[position])
+            position += 1
+        else:
+            results.append(result[position : position + count])
+            position += count
+    return results
+
+
+def _prefixer(prefix: str) -> Callable[[str], str]:
+    def rename(key: str) -> str:
+        return prefix + key
+
+    return rename
+
+
+def rename_value(value: InputValue, rename_key: Callable[[str], str]) -> InputValue:
+    """
+    An InputValue reading the renamed key. Literal (STRING) values are kept.
+    """
+    if value.type == InputValueType.STRING and value.search_query is None:
+        return value
+    update: Dict[str, Any] = {}
+    if value.type != InputValueType.STRING:
+        update["key"] = rename_key(value.key)
+    if value.search_query is not None:
+        update["search_query"] = SearchQuery(
+            value_type=value.search_query.value_type,
+            key=rename_key(value.search_query.key),
+        )
+    return value.model_copy(update=update)
+
+
+def rename_input(input: Input, rename_key: Callable[[str], str]) -> Input:
+    """
+    A copy of an input reading the renamed key; inputs named after their key are renamed too.
+    """
+    value = input.value
+    if value.search_query is None and value.type != InputValueType.STRING:
+        key = rename_key(value.key)
+        name = key if input.name == value.key else input.name
+        return interned_input(
+            value.type,
+            key,
+            input.required,
+            index=value.index,
+            name=name,
+            trusted=True,
+            end=value.end,
+        )
+    return input.model_copy(update={"value": rename_value(value, rename_key)})
+
+
+def rename_output(output: Output, rename_key: Callable[[str], str]) -> Output:
+    """
+    A copy of an output writing to the renamed key.
+    """
+    if output.value == "__result":
+        return interned_output(output.type, rename_key(output.key), output.max_length)
+    return output.model_copy(update={"key": rename_key(output.key)})
+
+
+def rename_task(task: Task, task_id: str, rename_key: Callable[[str], str]) -> Task:
+    """
+    A copy of a task with a new id and its memory keys renamed, in prompt variables too.
+    """
+    inputs = [rename_input(input, rename_key) for input in task.inputs]
+    # prompt variables name inputs, so follow the inputs whose name changed
+    names = {
+        old.name: new.name for old, new in zip(task.inputs, inputs) if old.name != new.name
+    }
+    messages = [
+        MessageInput(
+            role=message.role,
+            content=_VARIABLE.sub(
+                lambda m: "{{" + names[m.group(1)] + "}}"
+                if m.group(1) in names
+                else m.group(0),
+                message.content,
+            ),
+        )
+        for message in task.messages
+    ]
+    return task.model_copy(
+        update={
+            "id": task_id,
+            "messages": messages,
+            "inputs": inputs,
+            "outputs": [rename_output(output, rename_key) for output in task.outputs],
+        }
+    )
+
+
+def rename_edge(
+    edge: Edge, ids: Dict[str, str], rename_key: Callable[[str], str]
+) -> Edge:
+    """
+    A copy of an edge with task ids mapped through `ids` and condition keys renamed.
+    """
+    update: Dict[str, Any] = {
+        "source": ids.get(edge.source, edge.source),
+        "target": ids.get(edge.target, edge.target),
+    }
+    if edge.fallback is not None:
+        update["fallback"] = ids.get(edge.fallback, edge.fallback)
+    condition = edge.condition
+    if condition is not None:
+        update["condition"] = condition.model_copy(
+            update={
+                "input": rename_value(condition.input, rename_key),
+                "target_if_not": ids.get(condition.target_if_not, condition.target_if_not),
+            }
+        )
+    return edge.model_copy(update=update)
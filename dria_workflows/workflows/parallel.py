@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Set
+
+from .limits import OPERATOR_LATENCY
+from .w_types import InputValueType, Operator
+from .workflow import Workflow
+
+
+class ParallelPlan:
+    """
+    Dependency levels of a workflow's tasks.
+
+    `levels` maps task ids to their level and `groups` lists the task ids of each level,
+    in execution order: the tasks of a group only depend on tasks of earlier groups.
+    `serial_time` is the time of running every task in turn and `parallel_time` of
+    running group after group, each as long as its slowest task.
+    """
+
+    __slots__ = ("levels", "groups", "serial_time", "parallel_time")
+
+    def __init__(
+        self,
+        levels: Dict[str, int],
+        groups: List[List[str]],
+        serial_time: float,
+        parallel_time: float,
+    ):
+        self.levels = levels
+        self.groups = groups
+        self.serial_time = serial_time
+        self.parallel_time = parallel_time
+
+    @property
+    def speedup(self) -> float:
+        """
+        Theoretical speedup of running the groups concurrently, along the critical path.
+        """
+        return self.serial_time / self.parallel_time if self.parallel_time else 1.0
+
+
+def parallel_plan(
+    workflow: Workflow,
+    latency: Optional[Dict[Operator, float]] = None,
+    task_latency: Optional[Dict[str, float]] = None,
+) -> ParallelPlan:
+    """
+    Group the tasks of a workflow by data dependencies.
+
+    Tasks are visited in execution order. A task comes after every earlier task that
+    writes a key it reads (or pops), reads a key it writes, or writes the same key. Tasks
+    that steer the flow (a condition, a fallback or several edges leaving them) and tasks
+    on loops are barriers: they get a level of their own, after everything before them.
+    Unreachable tasks and the end task are left out.
+
+    Args:
+        workflow (Workflow): The workflow.
+        latency (Dict[Operator, float], optional): Seconds per task by operator, for the speedup.
+            Defaults to `OPERATOR_LATENCY`.
+        task_latency (Dict[str, float], optional): Seconds of individual tasks, by id.
+
+    Returns:
+        ParallelPlan: The levels and groups.
+    """
+    ir = workflow.compile()
+    order, _ = ir.topological_order()
+    # a loop has at most len(tasks) transitions, so tasks on one run at least twice
+    runs = ir.max_executions(2 * len(ir.tasks))
+    latency = {**OPERATOR_LATENCY, **(latency or {})}
+    task_latency = task_latency or {}
+
+    last_write: Dict[int, int] = {}
+    last_read: Dict[int, int] = {}
+    levels: Dict[str, int] = {}
+    floor = 0
+    top = 0
+    for t in order:
+        task = ir.tasks[t]
+        if task.operator == Operator.END:
+            continue
+        edges = ir.out_edges(t)
+        barrier = runs[t] > 1 or len(edges) > 1 or any(
+            ir.edge_condition[e] is not None or ir.edge_fallback[e] >= 0 for e in edges
+        )
+        reads: Set[int] = set()
+        writes: Set[int] = {key for _, key in task.outputs}
+        for input_type, key, _ in task.inputs:
+            if input_type == InputValueType.STRING:
+                continue
+            reads.add(key)
+            if input_type == InputValueType.POP:
+                writes.add(key)
+        if barrier:
+            level = top + 1
+            floor = level
+        else:
+            level = 1 + max(
+                [floor]
+                + [last_write.get(key, 0) for key in reads | writes]
+                + [last_read.get(key, 0) for key in writes]
+            )
+        for key in reads:
+            last_read[key] = max(last_read.get(key, 0), level)
+        for key in writes:
+            last_write[key] = level
+        levels[task.id] = level
+        top = max(top, level)
+
+    groups: List[List[str]] = [[] for _ in range(top)]
+    for task_id, level in levels.items():
+        groups[level - 1].append(task_id)
+    groups = [group for group in groups if group]
+
+    seconds = {
+        task.id: task_latency.get(task.id, latency.get(task.operator, 0.0))
+        for task in ir.tasks
+    }
+    return ParallelPlan(
+        levels=levels,
+        groups=groups,
+        serial_time=sum(seconds[task_id] for task_id in levels),
+        parallel_time=sum(max(seconds[task_id] for task_id in group) for group in groups),
+    )
+
+
+def annotate_parallel(workflow: Workflow, **options) -> ParallelPlan:
+    """
+    Store the groups of `parallel_plan` in `workflow.config.parallel_groups`, for
+    executors that run the tasks of a group concurrently. See `parallel_plan` for options.
+    """
+    plan = parallel_plan(workflow, **options)
+    workflow.config.parallel_groups = plan.groups
+    return plan
@@ -0,0 +1,229 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+from .tokens import TokenEstimator, Tokenizer
+from .w_types import Model, ModelProvider, Operator
+from .workflow import Workflow
+
+
+class ModelProfile(BaseModel):
+    """
+    What the router knows about a model.
+
+    Args:
+        :param provider (ModelProvider): Where the model runs.
+        :param context (int): Context length in tokens, prompt and output together.
+        :param throughput (float): Relative generation speed; higher is faster.
+        :param cost (float): Relative cost per token; lower is cheaper.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    provider: ModelProvider
+    context: int
+    throughput: float
+    cost: float
+
+
+# Context lengths are the models' own; throughput and cost are relative figures for
+# comparing models with each other (for local models, cost follows compute time).
+# Pass `profiles` to the router to use measured values.
+MODEL_PROFILES: Dict[Model, ModelProfile] = {
+    Model.PHI3_5_MINI: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=3.0, cost=0.3
+    ),
+    Model.PHI3_5_MINI_FP16: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=1.6, cost=0.6
+    ),
+    Model.LLAMA3_1_8B: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=2.0, cost=0.5
+    ),
+    Model.LLAMA3_1_8BQ8: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=1.5, cost=0.7
+    ),
+    Model.NOUS_THETA: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=1.5, cost=0.7
+    ),
+    Model.GEMMA2_9B: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=8192, throughput=1.3, cost=0.8
+    ),
+    Model.PHI3_MEDIUM: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=4096, throughput=1.0, cost=1.0
+    ),
+    Model.PHI3_MEDIUM_128K: ModelProfile(
+        provider=ModelProvider.OLLAMA, context=131072, throughput=0.6, cost=1.6
+    ),
+    Model.GPT4O_MINI: ModelProfile(
+        provider=ModelProvider.OPENAI, context=128000, throughput=2.5, cost=0.4
+    ),
+    Model.GPT3_5_TURBO: ModelProfile(
+        provider=ModelProvider.OPENAI, context=16385, throughput=2.5, cost=1.3
+    ),
+    Model.GPT4O: ModelProfile(
+        provider=ModelProvider.OPENAI, context=128000, throughput=1.5, cost=6.0
+    ),
+    Model.GPT4_TURBO: ModelProfile(
+        provider=ModelProvider.OPENAI, context=128000, throughput=0.8, cost=25.0
+    ),
+}
+
+
+class Route:
+    """
+    The model recommended for one workflow.
+
+    `model` is the cheapest candidate whose context fits every reachable task, or None
+    if none does; `tokens` is the largest task (prompt and output) it was sized for.
+    `tasks` has the cheapest fitting model per task that calls one (not `_end`), for
+    workflows that could be split.
+    """
+
+    __slots__ = ("model", "tokens", "tasks")
+
+    def __init__(self, model: Optional[Model], tokens: int, tasks: Dict[str, Optional[Model]]):
+        self.model = model
+        self.tokens = tokens
+        self.tasks = tasks
+
+
+class ModelRouter:
+    """
+    Recommend the cheapest model whose context fits a workflow's prompts.
+
+    Task sizes come from `TokenEstimator`, with the memory substituted into the prompts;
+    a workflow fits a model when its largest task, plus `headroom`, fits the context.
+    Among fitting models the lowest cost wins, then the highest throughput. Workflows
+    with the same tasks, steps and config share one estimator, so batches of one
+    template only tokenize their memories.
+
+    Args:
+        :param models (Iterable[Model], optional): The candidates, e.g. the models the nodes serve. Defaults to all profiled models.
+        :param profiles (Dict[Model, ModelProfile], optional): Model profiles. Defaults to `MODEL_PROFILES`.
+        :param tokenizer (Callable[[str], int], optional): See `TokenEstimator`.
+        :param output_tokens (int, optional): See `TokenEstimator`.
+        :param headroom (float, optional): Fraction of the context kept free. Defaults to 0.1.
+    """
+
+    def __init__(
+        self,
+        models: Optional[Iterable[Model]] = None,
+        profiles: Optional[Dict[Model, ModelProfile]] = None,
+        tokenizer: Optional[Tokenizer] = None,
+        output_tokens: Optional[int] = None,
+        headroom: float = 0.1,
+    ):
+        if not 0 <= headroom < 1:
+            raise ValueError("headroom must be in [0, 1)")
+        self.profiles = MODEL_PROFILES if profiles is None else profiles
+        models = list(self.profiles) if models is None else list(models)
+        for model in models:
+            if model not in self.profiles:
+                raise ValueError(f"No profile for model '{model.value}'")
+        # cheapest first, so the first model that fits is the answer
+        self.models = sorted(
+            models,
+            key=lambda m: (self.profiles[m].cost, -self.profiles[m].throughput),
+        )
+        self.tokenizer = tokenizer
+        self.output_tokens = output_tokens
+        self.headroom = headroom
+        self._limits = [
+            int(self.profiles[m].context * (1 - headroom)) for m in self.models
+        ]
+        # per template: its estimator and the ids of its end tasks
+        self._estimators: Dict[Tuple, Tuple[TokenEstimator, Set[str]]] = {}
+
+    def model_for(self, tokens: int) -> Optional[Model]:
+        """
+        The cheapest candidate that fits `tokens`, or None.
+        """
+        for model, limit in zip(self.models, self._limits):
+            if tokens <= limit:
+                return model
+        return None
+
+    def route(self, workflow: Workflow) -> Route:
+        """
+        Route one workflow, sized over its own external memory.
+        """
+        return self.route_batch([workflow])[0]
+
+    def route_batch(self, workflows: Sequence[Workflow]) -> List[Route]:
+        """
+        Route each workflow of a batch.
+        """
+        if len(self._estimators) > 1024:
+            self._estimators.clear()
+        # group by template, then estimate each group over its memories at once
+        groups: Dict[Tuple, List[int]] = {}
+        for i, workflow in enumerate(workflows):
+            groups.setdefault(_template_key(workflow), []).append(i)
+        routes: List[Optional[Route]] = [None] * len(workflows)
+        for key, positions in groups.items():
+            cached = self._estimators.get(key)
+            if cached is None:
+                workflow = workflows[positions[0]]
+                # end tasks call no model; compiling adds `_end` if only edges name it
+                ends = {
+                    task.id for task in workflow.compile().tasks if task.operator == Operator.END
+                }
+                estimator = TokenEstimator(
+                    workflow, tokenizer=self.tokenizer, output_tokens=self.output_tokens
+                )
+                cached = self._estimators[key] = (estimator, ends)
+            estimator, ends = cached
+            memories = [workflows[i].external_memory or {} for i in positions]
+            for i, estimate in zip(positions, estimator.estimate_batch(memories)):
+                # unreachable tasks never run
+                sizes = {
+                    id: tokens + estimate.output[id]
+                    for id, tokens in estimate.prompt.items()
+                    if estimator.runs[id] and id not in ends
+                }
+                largest = max(sizes.values(), default=0)
+                routes[i] = Route(
+                    self.model_for(largest),
+                    largest,
+                    {id: self.model_for(tokens) for id, tokens in sizes.items()},
+                )
+        return routes
+
+    @staticmethod
+    def table(routes: Iterable[Route]) -> Dict[Optional[Model], List[int]]:
+        """
+        The routing table of a batch: for each model, the positions of its workflows.
+        Workflows that fit no candidate are listed under None.
+        """
+        table: Dict[Optional[Model], List[int]] = {}
+        for i, route in enumerate(routes):
+            table.setdefault(route.model, []).append(i)
+        return table
+
+
+def _template_key(workflow: Workflow) -> Tuple:
+    # everything TokenEstimator reads, apart from the memory
+    config = workflow.config
+    return (
+        config.max_steps,
+        config.max_tokens,
+        tuple(
+            (
+                task.id,
+                task.operator,
+                tuple(message.content for message in task.messages),
+                tuple(task.inputs),
+                tuple(task.outputs),
+            )
+            for task in workflow.tasks
+        ),
+        tuple(
+            (
+                edge.source,
+                edge.target,
+                edge.fallback,
+                edge.condition.target_if_not if edge.condition else None,
+            )
+            for edge in workflow.steps
+        ),
+    )
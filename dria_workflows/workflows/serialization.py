@@ -0,0 +1,173 @@
+import json
+import os
+from typing import Any, Callable, Dict, Union
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode JSON-compatible data to UTF-8 bytes, using orjson when it is installed.
+
+    Args:
+        obj (Any): The data to encode.
+        indent (bool, optional): Indent with two spaces instead of emitting compact JSON. Defaults to False.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_dict(workflow: BaseModel, compact: bool = False) -> Dict[str, Any]:
+    """
+    Dump a workflow to JSON-compatible python data in a single pass.
+
+    Args:
+        workflow (Workflow): The workflow to dump.
+        compact (bool, optional): Also drop empty lists that default to empty on load. Defaults to False.
+    """
+    return workflow.model_dump(
+        mode="json",
+        exclude=_compact_exclude(workflow) if compact else None,
+        exclude_unset=True,
+        exclude_none=True,
+    )
+
+
+def to_json(workflow: BaseModel, compact: bool = False, indent: bool = False) -> bytes:
+    """
+    Serialize a workflow to JSON bytes in a single pass. See `to_dict` for `compact`.
+    """
+    return workflow.model_dump_json(
+        indent=2 if indent else None,
+        exclude=_compact_exclude(workflow) if compact else None,
+        exclude_unset=True,
+        exclude_none=True,
+    ).encode("utf-8")
+
+
+def _compact_exclude(workflow: BaseModel) -> Dict[str, Any]:
+    # Only fields the schema leaves optional; tasks, steps and messages must stay.
+    exclude: Dict[str, Any] = {}
+    tasks = {}
+    for i, task in enumerate(workflow.tasks):
+        empty = {key for key in ("inputs", "outputs") if not getattr(task, key)}
+        if empty:
+            tasks[i] = empty
+    if tasks:
+        exclude["tasks"] = tasks
+    if not workflow.config.tools:
+        exclude["config"] = {"tools"}
+    return exclude
+
+
+def write_json(
+    workflow: BaseModel,
+    sink: Any,
+    compact: bool = False,
+    chunk_size: int = 1 << 16,
+) -> int:
+    """
+    Stream a workflow as JSON, section by section, without building the whole document.
+
+    Config, each memory entry (and each item of a list entry), each task and each step
+    are encoded separately and written in chunks of about `chunk_size` bytes, so peak
+    memory is bounded by the largest single item rather than the whole workflow.
+    The output is the same document `to_json` produces.
+
+    Args:
+        workflow (Workflow): The workflow to write.
+        sink (Any): A file path, a binary file-like object with `write`, or a socket-like object with `sendall`.
+        compact (bool, optional): See `to_dict`. Defaults to False.
+        chunk_size (int, optional): Number of bytes buffered before each write. Defaults to 64KiB.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if isinstance(sink, (str, os.PathLike)):
+        with open(sink, "wb") as f:
+            return write_json(workflow, f, compact=compact, chunk_size=chunk_size)
+
+    if hasattr(sink, "write"):
+        write = sink.write
+    elif hasattr(sink, "sendall"):
+        write = sink.sendall
+    else:
+        raise TypeError("sink must be a path or have a 'write' or 'sendall' method")
+
+    buffer = bytearray()
+    written = 0
+
+    def emit(chunk: bytes) -> None:
+        nonlocal written
+        buffer.extend(chunk)
+        if len(buffer) >= chunk_size:
+            write(bytes(buffer))
+            written += len(buffer)
+            buffer.clear()
+
+    exclude = _compact_exclude(workflow) if compact else {}
+    options = {"exclude_unset": True, "exclude_none": True}
+    separator = b"{"
+    for name in type(workflow).model_fields:
+        value = getattr(workflow, name)
+        if name not in workflow.model_fields_set or value is None:
+            continue
+        emit(separator + dumps(name) + b":")
+        separator = b","
+        if name == "external_memory":
+            _write_memory(value, emit)
+        elif name in ("tasks", "steps"):
+            item_exclude = exclude.get(name, {})
+            emit(b"[")
+            for i, item in enumerate(value):
+                if i:
+                    emit(b",")
+                emit(item.model_dump_json(exclude=item_exclude.get(i), **options).encode("utf-8"))
+            emit(b"]")
+        else:
+            emit(value.model_dump_json(exclude=exclude.get(name), **options).encode("utf-8"))
+    emit(b"}" if separator == b"," else b"{}")
+
+    if buffer:
+        write(bytes(buffer))
+        written += len(buffer)
+    return written
+
+
+# List memory entries are encoded this many items at a time.
+_MEMORY_BATCH = 256
+
+
+def _write_memory(memory: Dict[str, Any], emit: Callable[[bytes], None]) -> None:
+    emit(b"{")
+    for i, (key, value) in enumerate(memory.items()):
+        emit((b"," if i else b"") + dumps(key) + b":")
+        if isinstance(value, list):
+            emit(b"[")
+            for j in range(0, len(value), _MEMORY_BATCH):
+                # encode a slice as a list and drop its brackets
+                chunk = dumps(value[j : j + _MEMORY_BATCH])[1:-1]
+                emit(b"," + chunk if j else chunk)
+            emit(b"]")
+        elif isinstance(value, BaseModel):
+            emit(value.model_dump_json(exclude_unset=True, exclude_none=True).encode("utf-8"))
+        else:
+            emit(dumps(value))
+    emit(b"}")
+
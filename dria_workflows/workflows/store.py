@@ -0,0 +1,223 @@
+import hashlib
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from .hashing import canonical_dict, _encode
+from .workflow import Workflow
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    hash TEXT PRIMARY KEY,
+    template TEXT NOT NULL,
+    created REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workflows_template ON workflows (template, created);
+CREATE INDEX IF NOT EXISTS workflows_created ON workflows (created);
+CREATE TABLE IF NOT EXISTS memory_keys (
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES workflows (hash) ON DELETE CASCADE,
+    PRIMARY KEY (key, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS memory_keys_hash ON memory_keys (hash);
+"""
+
+
+class WorkflowStore:
+    """
+    A local, content-addressed store of workflows.
+
+    Workflows are kept as compact JSON (the `Workflow.save(compact=True)` format) in a
+    sqlite database, keyed by `workflow_hash`. Template, creation time, size and memory
+    keys are indexed columns, so queries never deserialize workflows.
+
+    The template of a workflow defaults to its hash without external memory, i.e. all
+    workflows built from the same tasks and steps share a template.
+
+    Args:
+        :param path (str): The database file, or ":memory:".
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def put(
+        self,
+        workflow: Workflow,
+        template: Optional[str] = None,
+        created: Optional[float] = None,
+    ) -> str:
+        """
+        Store a workflow. Storing the same content twice keeps the first entry.
+
+        Args:
+            workflow (Workflow): The workflow.
+            template (str, optional): Template label. Defaults to the workflow's hash without memory.
+            created (float, optional): Creation time as a unix timestamp. Defaults to now.
+
+        Returns:
+            str: The workflow's hash.
+        """
+        return self.put_many([workflow], template=template, created=created)[0]
+
+    def put_many(
+        self,
+        workflows: Iterable[Workflow],
+        template: Optional[str] = None,
+        created: Optional[float] = None,
+        batch_size: int = 1000,
+    ) -> List[str]:
+        """
+        Store many workflows, committing one transaction per `batch_size` workflows.
+        See `put` for the other arguments.
+
+        Returns:
+            List[str]: The hashes, in input order.
+        """
+        hashes: List[str] = []
+        rows: List[Tuple] = []
+        keys: List[Tuple[str, str]] = []
+        for workflow in workflows:
+            # one canonical dump for both hashes, equal to workflow_hash(workflow) and
+            # workflow_hash(workflow, include_memory=False)
+            canonical = canonical_dict(workflow)
+            digest = hashlib.sha256(_encode(canonical)).hexdigest()
+            if template is None:
+                canonical.pop("external_memory", None)
+                row_template = hashlib.sha256(_encode(canonical)).hexdigest()
+            else:
+                row_template = template
+            data = workflow.to_json(compact=True)
+            rows.append(
+                (
+                    digest,
+                    row_template,
+                    time.time() if created is None else created,
+                    len(data),
+                    data,
+                )
+            )
+            keys.extend((key, digest) for key in workflow.external_memory or ())
+            hashes.append(digest)
+            if len(rows) >= batch_size:
+                self._insert(rows, keys)
+                rows, keys = [], []
+        if rows:
+            self._insert(rows, keys)
+        return hashes
+
+    def _insert(self, rows: List[Tuple], keys: List[Tuple[str, str]]) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO workflows VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.executemany("INSERT OR IGNORE INTO memory_keys VALUES (?, ?)", keys)
+
+    def get_json(self, digest: str) -> bytes:
+        """
+        The stored JSON of a workflow.
+
+        Raises:
+            KeyError: If no workflow has this hash.
+        """
+        row = self._db.execute(
+            "SELECT data FROM workflows WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return row[0]
+
+    def get(self, digest: str) -> Workflow:
+        """
+        Load a workflow by hash.
+
+        Raises:
+            KeyError: If no workflow has this hash.
+        """
+        return Workflow.from_json(self.get_json(digest))
+
+    def find(
+        self,
+        template: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        memory_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Hashes of the stored workflows matching all given filters, oldest first.
+
+        Args:
+            template (str, optional): Only workflows with this template.
+            since (float, optional): Only workflows created at or after this unix timestamp.
+            until (float, optional): Only workflows created before this unix timestamp.
+            memory_key (str, optional): Only workflows whose external memory has this key.
+            limit (int, optional): Return at most this many hashes.
+
+        Returns:
+            List[str]: The matching hashes.
+        """
+        query = "SELECT w.hash FROM workflows w"
+        conditions = []
+        params: list = []
+        if memory_key is not None:
+            query += " JOIN memory_keys m ON m.hash = w.hash AND m.key = ?"
+            params.append(memory_key)
+        if template is not None:
+            conditions.append("w.template = ?")
+            params.append(template)
+        if since is not None:
+            conditions.append("w.created >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("w.created < ?")
+            params.append(until)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY w.created, w.hash"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self._db.execute(query, params)]
+
+    def templates(self) -> List[Tuple[str, int]]:
+        """
+        The distinct templates and how many workflows each has, most common first.
+        """
+        return self._db.execute(
+            "SELECT template, COUNT(*) FROM workflows GROUP BY template ORDER BY 2 DESC, 1"
+        ).fetchall()
+
+    def delete(self, digest: str) -> bool:
+        """
+        Remove a workflow. Returns whether it was stored.
+        """
+        with self._db:
+            cursor = self._db.execute("DELETE FROM workflows WHERE hash = ?", (digest,))
+        return cursor.rowcount > 0
+
+    def __contains__(self, digest: str) -> bool:
+        return (
+            self._db.execute("SELECT 1 FROM workflows WHERE hash = ?", (digest,)).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "WorkflowStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
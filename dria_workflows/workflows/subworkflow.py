@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .hashing import workflow_hash
+from .interface import Edge, Task
+from .pack import rename_edge, rename_task
+from .w_types import InputValueType
+from .workflow import Workflow
+
+_END = "_end"
+# instances kept per fragment; beyond this the table is cleared, as in io.py
+_MAX_INSTANCES = 4096
+
+
+class SubWorkflow:
+    """
+    A reusable fragment of a workflow, such as query -> search -> evaluate, to inline
+    into builders with `WorkflowBuilder.inline`.
+
+    The fragment is built once. Its tasks run from the first one, and its edges to
+    `_end` leave the fragment. Memory keys that no task of the fragment writes or pops
+    are constants: every instance shares one copy, under `{name}_{key}`. All other keys
+    are state, kept apart per instance under `{namespace}_{key}`. Only tasks, steps and
+    memory of the fragment are used, not its config or return value.
+
+    Args:
+        :param name (str): Name of the fragment, the prefix of its constants.
+        :param fragment (Union[Workflow, WorkflowBuilder]): The fragment, built or as a builder to build.
+    """
+
+    __slots__ = ("name", "tasks", "steps", "memory", "constants", "digest", "_instances")
+
+    def __init__(self, name: str, fragment: Any):
+        if not name.isidentifier():
+            raise ValueError("name must only contain letters, digits or underscores")
+        workflow: Workflow = fragment if isinstance(fragment, Workflow) else fragment.build()
+        self.name = name
+        self.tasks: List[Task] = [task for task in workflow.tasks if task.id != _END]
+        if not self.tasks:
+            raise ValueError("A sub-workflow needs at least one task")
+        self.steps: List[Edge] = list(workflow.steps)
+        self.memory: Dict[str, Any] = dict(workflow.external_memory or {})
+        written = set()
+        for task in self.tasks:
+            written.update(output.key for output in task.outputs)
+            written.update(
+                input.value.key
+                for input in task.inputs
+                if input.value.type == InputValueType.POP
+            )
+        self.constants = frozenset(key for key in self.memory if key not in written)
+        self.digest = workflow_hash(workflow)
+        self._instances: Dict[Tuple, Tuple[List[Task], List[Edge]]] = {}
+
+    @property
+    def entry(self) -> str:
+        """
+        Id of the task the fragment starts at.
+        """
+        return self.tasks[0].id
+
+    def key(self, key: str, namespace: str, bind: Optional[Dict[str, str]] = None) -> str:
+        """
+        The name a memory key of the fragment has in an instance.
+        """
+        if bind and key in bind:
+            return bind[key]
+        if key in self.constants:
+            return f"{self.name}_{key}"
+        return f"{namespace}_{key}"
+
+    def instance(
+        self, namespace: str, bind: Optional[Dict[str, str]] = None, next: str = _END
+    ) -> Tuple[List[Task], List[Edge]]:
+        """
+        Tasks and edges of an instance of the fragment.
+
+        Task ids are prefixed with `{namespace}_` and memory keys renamed as by `key`. The
+        edges leaving the fragment lead to `next`. Instances are built once per
+        (namespace, bind, next) and then shared, so do not modify them;
+        `WorkflowBuilder.inline` adds copies.
+
+        Args:
+            namespace (str): Prefix of the task ids and state keys.
+            bind (Dict[str, str], optional): Keys of the fragment to use as keys of the host workflow instead.
+            next (str, optional): Task to continue with after the fragment. Defaults to "_end".
+
+        Returns:
+            Tuple[List[Task], List[Edge]]: The tasks and edges.
+        """
+        cache_key = (namespace, tuple(sorted((bind or {}).items())), next)
+        instance = self._instances.get(cache_key)
+        if instance is None:
+            ids = {task.id: f"{namespace}_{task.id}" for task in self.tasks}
+            ids[_END] = next
+
+            def rename_key(key: str) -> str:
+                return self.key(key, namespace, bind)
+
+            instance = (
+                [rename_task(task, ids[task.id], rename_key) for task in self.tasks],
+                [rename_edge(edge, ids, rename_key) for edge in self.steps],
+            )
+            if len(self._instances) >= _MAX_INSTANCES:
+                self._instances.clear()
+            self._instances[cache_key] = instance
+        return instance
+
+    def __repr__(self) -> str:
+        return f"SubWorkflow({self.name!r}, {len(self.tasks)} tasks)"
+
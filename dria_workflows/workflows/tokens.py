@@ -0,0 +1,304 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .w_types import InputValueType, Operator, OutputType
+from .workflow import Workflow
+
+Tokenizer = Callable[[str], int]
+
+# Assumed length of a generated value when neither the estimator nor the workflow's
+# config caps it.
+DEFAULT_OUTPUT_TOKENS = 512
+# Chat formatting around each message (role and separators).
+MESSAGE_TOKENS = 4
+
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+_LIST_TYPES = (
+    InputValueType.GET_ALL,
+    InputValueType.PEEK,
+    InputValueType.POP,
+    InputValueType.SLICE,
+)
+_PUSH_TYPES = (OutputType.PUSH, OutputType.CAPPED_PUSH)
+
+
+def heuristic_tokens(text: str) -> int:
+    """
+    Offline token count: about four characters per token, as with BPE tokenizers on
+    English text. Pass a real tokenizer to `TokenEstimator` for exact counts, e.g.
+    `lambda text: len(encoding.encode(text))` with tiktoken.
+    """
+    return (len(text) + 3) // 4
+
+
+class TokenEstimate:
+    """
+    Token estimate of one workflow over one memory.
+
+    `prompt` and `output` are the tokens each task sends and may generate, by task id.
+    `worst_path` is the most expensive execution path from the first task that does not
+    repeat a loop, with its tokens in `worst_path_tokens`; `total_bound` bounds the
+    tokens of a whole run, with every task repeated as often as `max_steps` allows.
+    `over_limit` lists the tasks whose prompt and output exceed the context limit.
+    """
+
+    __slots__ = (
+        "prompt",
+        "output",
+        "worst_path",
+        "worst_path_tokens",
+        "total_bound",
+        "over_limit",
+    )
+
+    def __init__(self, prompt, output, worst_path, worst_path_tokens, total_bound, over_limit):
+        self.prompt: Dict[str, int] = prompt
+        self.output: Dict[str, int] = output
+        self.worst_path: List[str] = worst_path
+        self.worst_path_tokens: int = worst_path_tokens
+        self.total_bound: int = total_bound
+        self.over_limit: List[str] = over_limit
+
+
+class TokenEstimator:
+    """
+    Static estimate of the prompt tokens each task sends after `{{variable}}`
+    substitution, without running the workflow.
+
+    Prompts are split into text and variables once; text is tokenized once and each
+    variable is counted per memory, so a batch of memories only tokenizes the memory
+    values (each distinct string once). Values that tasks write are assumed to be as
+    long as the output cap, and stacks that tasks push to grow by one such value per run
+    of the pushing task, bounded through the loops by `config.max_steps` and by the
+    length of capped pushes. Counts are additive over the pieces of a prompt, which is
+    exact for the default heuristic and close for real tokenizers.
+
+    Args:
+        :param workflow (Workflow): The workflow.
+        :param tokenizer (Callable[[str], int], optional): Counts the tokens of a text. Defaults to `heuristic_tokens`.
+        :param output_tokens (int, optional): Tokens a task may generate. Defaults to `config.max_tokens`, or 512.
+        :param context_limit (int, optional): Flag tasks whose prompt and output exceed it. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        workflow: Workflow,
+        tokenizer: Optional[Tokenizer] = None,
+        output_tokens: Optional[int] = None,
+        context_limit: Optional[int] = None,
+    ):
+        self.workflow = workflow
+        self.tokenizer = tokenizer or heuristic_tokens
+        self.output_tokens = (
+            output_tokens or workflow.config.max_tokens or DEFAULT_OUTPUT_TOKENS
+        )
+        self.context_limit = context_limit
+
+        ir = workflow.compile()
+        self._ids = [task.id for task in ir.tasks]
+        self._runs = ir.max_executions(workflow.config.max_steps)
+        # upper bound on how often each task runs, 0 for unreachable tasks
+        self.runs: Dict[str, int] = dict(zip(self._ids, self._runs))
+        self._output = [
+            0 if task.operator == Operator.END else self.output_tokens for task in ir.tasks
+        ]
+        # keys written by tasks, and how many values can be pushed to each stack
+        self._written: Dict[str, int] = {}
+        self._pushed: Dict[str, int] = {}
+        for i, task in enumerate(ir.tasks):
+            for output_type, key in task.outputs:
+                key = ir.keys[key]
+                if output_type in _PUSH_TYPES:
+                    self._pushed[key] = self._pushed.get(key, 0) + self._runs[i]
+                else:
+                    self._written[key] = self.output_tokens
+        # stacks only pushed to with a cap keep at most the longest cap of new values
+        self._caps: Dict[str, int] = {}
+        uncapped = set()
+        for task in workflow.tasks:
+            for output in task.outputs:
+                if output.type == OutputType.CAPPED_PUSH and output.max_length:
+                    self._caps[output.key] = max(
+                        self._caps.get(output.key, 0), output.max_length
+                    )
+                elif output.type == OutputType.PUSH:
+                    uncapped.add(output.key)
+        for key in uncapped:
+            self._caps.pop(key, None)
+
+        order, back = ir.topological_order()
+        back = set(back)
+        self._order = order
+        self._forward = [
+            [target for target in ir.successors(task) if (task, target) not in back]
+            for task in range(len(ir.tasks))
+        ]
+        self._end = ir.end
+
+        # per task: tokens of the text around variables, and the variables
+        self._static: List[int] = [0] * len(ir.tasks)
+        self._slots: List[List[Tuple[InputValueType, str, Optional[int], Optional[int]]]] = [
+            [] for _ in ir.tasks
+        ]
+        for i, task in enumerate(workflow.tasks):
+            values = {input.value.key: input.value for input in task.inputs}
+            static = 0
+            for message in task.messages:
+                content = message.content
+                static += MESSAGE_TOKENS
+                last = 0
+                for match in _VARIABLE.finditer(content):
+                    value = values.get(match.group(1))
+                    if value is None:
+                        # not an input: the placeholder is sent as is
+                        continue
+                    static += self.tokenizer(content[last : match.start()])
+                    last = match.end()
+                    if value.type == InputValueType.STRING:
+                        static += self.tokenizer(value.key)
+                    else:
+                        self._slots[i].append((value.type, value.key, value.index, value.end))
+                static += self.tokenizer(content[last:])
+            self._static[i] = static
+
+    def estimate(self, memory: Optional[Dict[str, Any]] = None) -> TokenEstimate:
+        """
+        Estimate the workflow over `memory`, by default its own external memory.
+        """
+        if memory is None:
+            memory = self.workflow.external_memory or {}
+        return self.estimate_batch([memory])[0]
+
+    def estimate_batch(self, memories: Sequence[Dict[str, Any]]) -> List[TokenEstimate]:
+        """
+        Estimate the workflow over each memory of a batch.
+        """
+        counts: Dict[str, int] = {}
+        tokenizer = self.tokenizer
+
+        def count(text: str) -> int:
+            n = counts.get(text)
+            if n is None:
+                n = counts[text] = tokenizer(text)
+            return n
+
+        return [self._estimate(memory, count) for memory in memories]
+
+    def _estimate(self, memory: Dict[str, Any], count: Tokenizer) -> TokenEstimate:
+        values: Dict[Tuple, int] = {}
+        prompt = list(self._static)
+        for i, slots in enumerate(self._slots):
+            for slot in slots:
+                n = values.get(slot)
+                if n is None:
+                    n = values[slot] = self._value_tokens(memory, slot, count)
+                prompt[i] += n
+
+        weight = [p + o for p, o in zip(prompt, self._output)]
+        path, path_tokens = self._worst_path(weight)
+        over_limit = []
+        if self.context_limit is not None:
+            over_limit = [
+                self._ids[i] for i, w in enumerate(weight) if w > self.context_limit
+            ]
+        return TokenEstimate(
+            prompt=dict(zip(self._ids, prompt)),
+            output=dict(zip(self._ids, self._output)),
+            worst_path=[self._ids[i] for i in path],
+            worst_path_tokens=path_tokens,
+            total_bound=sum(runs * w for runs, w in zip(self._runs, weight)),
+            over_limit=over_limit,
+        )
+
+    def _value_tokens(
+        self, memory: Dict[str, Any], slot: Tuple, count: Tokenizer
+    ) -> int:
+        value_type, key, index, end = slot
+        value = memory.get(key)
+        written = self._written.get(key, 0)
+        pushed = self._pushed.get(key, 0)
+        if isinstance(value, list) or (value is None and value_type in _LIST_TYPES):
+            items = value or []
+            if value_type in (InputValueType.PEEK, InputValueType.POP):
+                if index is not None and -len(items) <= index < len(items):
+                    n = _item_tokens(items[index], count)
+                else:
+                    n = max((_item_tokens(item, count) for item in items), default=0)
+                return max(n, self.output_tokens if pushed else 0)
+            cap = self._caps.get(key)
+            if cap is None and value_type == InputValueType.SIZE:
+                return count(str(len(items) + pushed))
+            if cap is None and value_type == InputValueType.GET_ALL:
+                # the whole stack, one entry per line
+                return sum(_item_tokens(item, count) + 1 for item in items) + pushed * (
+                    self.output_tokens + 1
+                )
+            lengths = [_item_tokens(item, count) for item in items]
+            if cap is None or not pushed:
+                stacks = [lengths + [self.output_tokens] * pushed]
+            else:
+                # before the first push the stack is the memory, after it the newest values
+                newest = [self.output_tokens] * min(pushed, cap)
+                stacks = [lengths, (lengths + newest)[-cap:]]
+            if value_type == InputValueType.SIZE:
+                return count(str(max(len(stack) for stack in stacks)))
+            if value_type == InputValueType.SLICE:
+                stacks = [stack[index:end] for stack in stacks]
+            return max(sum(n + 1 for n in stack) for stack in stacks)
+        if value is None:
+            return written
+        if not isinstance(value, str):
+            value = str(value)
+        return max(count(value), written)
+
+    def _worst_path(self, weight: List[int]) -> Tuple[List[int], int]:
+        if not self._order:
+            return [], 0
+        best = [-1] * len(weight)
+        parent = [-1] * len(weight)
+        entry = self._order[0]
+        best[entry] = weight[entry]
+        for task in self._order:
+            if best[task] < 0:
+                continue
+            for target in self._forward[task]:
+                total = best[task] + weight[target]
+                if total > best[target]:
+                    best[target] = total
+                    parent[target] = task
+        last = self._end
+        if last is None or best[last] < 0:
+            last = max(
+                (task for task in self._order if not self._forward[task]),
+                key=best.__getitem__,
+                default=entry,
+            )
+        path = [last]
+        while parent[path[-1]] >= 0:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path, best[last]
+
+
+def _item_tokens(item: Any, count: Tokenizer) -> int:
+    if isinstance(item, str):
+        return count(item)
+    return count(json.dumps(item, ensure_ascii=False))
+
+
+def estimate_tokens(
+    workflow: Workflow, memory: Optional[Dict[str, Any]] = None, **options
+) -> TokenEstimate:
+    """
+    Estimate the tokens of a workflow over `memory` (its own external memory by default).
+
+    Args:
+        workflow (Workflow): The workflow.
+        memory (Dict[str, Any], optional): The memory to substitute. Defaults to the workflow's.
+        **options: See `TokenEstimator`.
+
+    Returns:
+        TokenEstimate: The estimate.
+    """
+    return TokenEstimator(workflow, **options).estimate(memory)
@@ -6,7 +6,34 @@ from .builder import (
     CustomToolTemplate,
     CustomToolMode,
 )
-from .parsers import NousParser, LlamaParser, OpenAIParser, ParseResult
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Parsers and the result cache are loaded on first access.
+_LAZY = {
+    "ToolResultCache": ".cache",
+    "NousParser": ".parsers",
+    "LlamaParser": ".parsers",
+    "OpenAIParser": ".parsers",
+    "ParseResult": ".parsers",
+}
+
+if TYPE_CHECKING:
+    from .cache import ToolResultCache
+    from .parsers import NousParser, LlamaParser, OpenAIParser, ParseResult
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 __all__ = [
     "ToolBuilder",
@@ -19,4 +46,5 @@ __all__ = [
     "CustomToolTemplate",
     "CustomToolMode",
     "ParseResult",
+    "ToolResultCache",
 ]
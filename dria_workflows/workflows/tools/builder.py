@@ -1,10 +1,30 @@
 import json
+import marshal
 from enum import Enum
-from typing import Any, Dict, List, Literal, Optional, Union, get_args, get_origin
-
-from pydantic import BaseModel, Field
+from typing import (
+    Annotated,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+)
+from types import UnionType
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from abc import ABC, abstractmethod
 
+# Generated parameter schemas, serialized once per tool class. Keyed by the class
+# itself so a subclass never sees (and recomputes over) its parent's entry.
+_PARAMETERS_CACHE: "WeakKeyDictionary[type, str]" = WeakKeyDictionary()
+# The same schemas decoded once and marshalled: loading those is the cheapest way to
+# hand out a fresh dict per call, about twice as fast as parsing the JSON again.
+_DECODED_CACHE: "WeakKeyDictionary[type, bytes]" = WeakKeyDictionary()
+
 
 class HttpMethod(str, Enum):
     GET = "GET"
@@ -21,7 +41,9 @@ class CustomToolMode(str, Enum):
 
 class ParameterProperty(BaseModel):
     type: str
-    description: str
+    description: str = ""
+    # nested schema keywords (items, enum, properties, required)
+    model_config = ConfigDict(extra="allow")
 
 
 class CustomParameters(BaseModel):
@@ -57,12 +79,24 @@ class CustomToolTemplate(BaseModel):
         ..., alias="mode"
     )
 
+    # the tool class whose cached parameter schema to emit, set by ToolBuilder.build_custom
+    _tool: Optional[type] = PrivateAttr(default=None)
+
     class Config:
         populate_by_name = True
 
     def serialize_model(self):
-        data = self.dict(by_alias=True, exclude_none=True)
-        mode_template = data.pop("mode")
+        if self._tool is None:
+            data = self.dict(by_alias=True, exclude_none=True)
+            mode_template = data.pop("mode")
+        else:
+            data = self.dict(
+                by_alias=True,
+                exclude_none=True,
+                exclude={"mode_template": {"parameters"}},
+            )
+            mode_template = data.pop("mode")
+            mode_template["parameters"] = self._tool._parameters_copy()
         data.update(mode_template)
         return data
 
@@ -72,44 +106,149 @@ class BaseTool(BaseModel):
     description: str
 
     def get_parameters(self) -> Dict[str, Any]:
+        return type(self)._parameters_copy()
+
+    @classmethod
+    def parameters_json(cls) -> str:
+        """
+        JSON parameter schema of the tool class, computed on first use and cached
+        for the class. Subclasses get their own entry.
+        """
+        cached = _PARAMETERS_CACHE.get(cls)
+        if cached is None:
+            cached = json.dumps(cls._build_parameters())
+            _PARAMETERS_CACHE[cls] = cached
+        return cached
+
+    @classmethod
+    def _parameters_copy(cls) -> Dict[str, Any]:
+        # a fresh copy of the cached schema, so callers may change it
+        decoded = _DECODED_CACHE.get(cls)
+        if decoded is None:
+            decoded = marshal.dumps(json.loads(cls.parameters_json()))
+            _DECODED_CACHE[cls] = decoded
+        return marshal.loads(decoded)
+
+    @classmethod
+    def _build_parameters(cls) -> Dict[str, Any]:
         properties = {}
         required = []
-        for field_name, field_info in self.__fields__.items():
+        for field_name, field_info in cls.model_fields.items():
             if field_name in ["name", "description"]:
                 continue
-            json_type = self.python_type_to_json_type(field_info.annotation)
-            properties[field_name] = {
-                "type": json_type,
-                "description": field_info.description or "",
-            }
+            properties[field_name] = cls.python_type_to_json_schema(
+                field_info.annotation, field_info.description
+            )
             if field_info.is_required():
                 required.append(field_name)
         return {"type": "object", "properties": properties, "required": required}
 
     @staticmethod
     def python_type_to_json_type(py_type):
+        return BaseTool.python_type_to_json_schema(py_type)["type"]
+
+    @staticmethod
+    def python_type_to_json_schema(
+        py_type, description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Map a python annotation to a JSON schema property.
+
+        Lists become arrays with typed items, fixed-length tuples arrays with
+        `prefixItems`, nested models become objects with their own properties, and
+        enums/Literals carry their allowed values. A model nested in itself is
+        described as a plain object where it recurs.
+        """
+        schema = BaseTool._json_schema(py_type)
+        schema["description"] = description or ""
+        return schema
+
+    @staticmethod
+    def _json_schema(py_type, seen: frozenset = frozenset()) -> Dict[str, Any]:
+        # `seen` holds the models being expanded, so self-referencing models end
+        # in a plain object instead of recursing forever
         origin = get_origin(py_type)
-        if origin is Union:
+        if origin is Annotated:
+            return BaseTool._json_schema(get_args(py_type)[0], seen)
+        if origin is Union or origin is UnionType:
             args = get_args(py_type)
             non_none_types = [arg for arg in args if arg is not type(None)]
             if len(non_none_types) == 1:
-                return BaseTool.python_type_to_json_type(non_none_types[0])
+                return BaseTool._json_schema(non_none_types[0], seen)
             else:
-                return "object"
-        elif py_type is str:
-            return "string"
+                return {"type": "object"}
+        if origin is Literal:
+            values = list(get_args(py_type))
+            return {"type": BaseTool._json_type_of_values(values), "enum": values}
+        if origin is tuple:
+            args = get_args(py_type)
+            if not args:
+                return {"type": "array"}
+            if len(args) == 2 and args[1] is Ellipsis:
+                return {"type": "array", "items": BaseTool._json_schema(args[0], seen)}
+            return {
+                "type": "array",
+                "prefixItems": [BaseTool._json_schema(arg, seen) for arg in args],
+                "minItems": len(args),
+                "maxItems": len(args),
+            }
+        if origin in (list, set, frozenset):
+            args = get_args(py_type)
+            schema = {"type": "array"}
+            if args:
+                schema["items"] = BaseTool._json_schema(args[0], seen)
+            return schema
+        if origin is dict:
+            return {"type": "object"}
+        if isinstance(py_type, type):
+            if issubclass(py_type, Enum):
+                values = [member.value for member in py_type]
+                return {"type": BaseTool._json_type_of_values(values), "enum": values}
+            if issubclass(py_type, BaseModel):
+                if py_type in seen:
+                    return {"type": "object"}
+                seen = seen | {py_type}
+                properties = {}
+                required = []
+                for field_name, field_info in py_type.model_fields.items():
+                    properties[field_name] = BaseTool._json_schema(field_info.annotation, seen)
+                    properties[field_name]["description"] = field_info.description or ""
+                    if field_info.is_required():
+                        required.append(field_name)
+                return {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required,
+                }
+        if py_type is str:
+            return {"type": "string"}
+        elif py_type is bool:
+            return {"type": "boolean"}
         elif py_type is int:
-            return "integer"
+            return {"type": "integer"}
         elif py_type is float:
-            return "number"
-        elif py_type is bool:
-            return "boolean"
+            return {"type": "number"}
         elif py_type is dict:
-            return "object"
-        elif py_type is list:
-            return "array"
+            return {"type": "object"}
+        elif py_type in (list, set, tuple):
+            return {"type": "array"}
         else:
-            return "string"
+            return {"type": "string"}
+
+    @staticmethod
+    def _json_type_of_values(values: List[Any]) -> str:
+        if values and all(isinstance(value, bool) for value in values):
+            return "boolean"
+        if values and all(
+            isinstance(value, int) and not isinstance(value, bool) for value in values
+        ):
+            return "integer"
+        if values and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            for value in values
+        ):
+            return "number"
+        return "string"
 
 
 class CustomTool(BaseTool, ABC):
@@ -128,13 +267,15 @@ class HttpRequestTool(BaseTool):
 class ToolBuilder:
     @staticmethod
     def build_custom(tool_instance: CustomTool) -> CustomToolTemplate:
-        parameters = tool_instance.get_parameters()
-        custom_parameters = CustomParameters(**parameters)
-        return CustomToolTemplate(
+        parameters_json = type(tool_instance).parameters_json()
+        custom_parameters = CustomParameters.model_validate_json(parameters_json)
+        template = CustomToolTemplate(
             name=tool_instance.name,
             description=tool_instance.description,
             mode=CustomToolCustom(parameters=custom_parameters),
         )
+        template._tool = type(tool_instance)
+        return template
 
     @staticmethod
     def build_http_request(tool_instance: HttpRequestTool) -> CustomToolTemplate:
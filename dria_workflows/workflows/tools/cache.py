@@ -0,0 +1,168 @@
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+_MISSING = object()
+
+
+class ToolResultCache:
+    """
+    LRU cache for tool call results, keyed by tool name and canonicalized arguments.
+
+    Args:
+        :param maxsize (int, optional): Maximum number of cached results. Defaults to 1024.
+        :param ttl (float, optional): Default time-to-live in seconds. Defaults to None (no expiry).
+        :param tool_ttls (Dict[str, float], optional): Per-tool time-to-live overrides. Defaults to None.
+        :param path (str, optional): File used by save() and loaded on creation if it exists. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        tool_ttls: Optional[Dict[str, float]] = None,
+        path: Optional[str] = None,
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tool_ttls = dict(tool_ttls or {})
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (expires_at, value); expiry uses wall time so it survives save/load
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def make_key(
+        name: str, arguments: Mapping[str, Any], kwargs: Optional[Mapping] = None
+    ) -> Optional[str]:
+        """
+        Canonical cache key: argument order and JSON whitespace do not matter.
+
+        Returns None for arguments that are not plain JSON data, as their string form
+        need not tell different values apart; such calls are not cached.
+        """
+        key = {"name": name, "arguments": arguments}
+        if kwargs:
+            key["kwargs"] = kwargs
+        try:
+            return json.dumps(key, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    def get(
+        self,
+        name: str,
+        arguments: Mapping[str, Any],
+        default: Any = None,
+        kwargs: Optional[Mapping] = None,
+    ) -> Any:
+        key = self.make_key(name, arguments, kwargs)
+        value = _MISSING if key is None else self._lookup(key)
+        return default if value is _MISSING else value
+
+    def put(
+        self,
+        name: str,
+        arguments: Mapping[str, Any],
+        value: Any,
+        kwargs: Optional[Mapping] = None,
+    ) -> None:
+        key = self.make_key(name, arguments, kwargs)
+        if key is not None:
+            self._store(key, name, value)
+
+    def call(self, name: str, arguments: Mapping[str, Any], func, kwargs=None) -> Any:
+        """
+        Return the cached result of a tool call, running `func()` on a miss or when
+        the call cannot be cached (see `make_key`).
+        """
+        key = self.make_key(name, arguments, kwargs)
+        if key is None:
+            return func()
+        value = self._lookup(key)
+        if value is _MISSING:
+            value = func()
+            self._store(key, name, value)
+        return value
+
+    def _lookup(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def _store(self, key: str, name: str, value: Any) -> None:
+        ttl = self.tool_ttls.get(name, self.ttl)
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Persist unexpired entries with pickle. Only load files you wrote yourself.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given to save the cache to")
+        now = time.time()
+        with self._lock:
+            entries = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry[0] is None or entry[0] > now
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given to load the cache from")
+        with open(path, "rb") as f:
+            entries = pickle.load(f)
+        now = time.time()
+        with self._lock:
+            for key, entry in entries:
+                if entry[0] is None or entry[0] > now:
+                    self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,8 +1,9 @@
 import json
 from abc import ABC, abstractmethod
-from typing import List, Type, Any
+from typing import List, Type, Any, Optional
 from types import SimpleNamespace
 from dria_workflows.workflows.tools import CustomTool
+from dria_workflows.workflows.tools.cache import ToolResultCache
 
 
 class ParseResult:
@@ -16,7 +17,20 @@ class ParseResult:
             raise ValueError("Both 'name' and 'arguments' are required.")
         self.arguments = SimpleNamespace(**arguments_dict)
 
-    def execute(self, tools: List[Type[CustomTool]], **kwargs):
+    def execute(
+        self,
+        tools: List[Type[CustomTool]],
+        result_cache: Optional[ToolResultCache] = None,
+        **kwargs,
+    ):
+        """
+        Run the tool named in this result.
+
+        Args:
+            tools (List[Type[CustomTool]]): The tool classes to choose from.
+            result_cache (ToolResultCache, optional): Cache of tool results to look the call up in.
+            **kwargs: Passed on to the tool's `execute`.
+        """
         if any(not issubclass(tool_class, CustomTool) for tool_class in tools):
             invalid_classes = [
                 tool_class.__name__
@@ -28,6 +42,16 @@ class ParseResult:
                 f"Method 'execute' can only be called with subclasses of 'CustomTool'."
             )
 
+        if result_cache is not None:
+            return result_cache.call(
+                self.name,
+                self.arguments.__dict__,
+                lambda: self._execute(tools, **kwargs),
+                kwargs,
+            )
+        return self._execute(tools, **kwargs)
+
+    def _execute(self, tools: List[Type[CustomTool]], **kwargs):
         for tool_class in tools:
             try:
                 tool = tool_class(**self.arguments.__dict__)
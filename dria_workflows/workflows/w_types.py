@@ -12,12 +12,14 @@ class InputValueType(str, Enum):
     GET_ALL = "get_all"
     SIZE = "size"
     STRING = "string"
+    SLICE = "slice"
 
 
 class OutputType(str, Enum):
     WRITE = "write"
     INSERT = "insert"
     PUSH = "push"
+    CAPPED_PUSH = "capped_push"
 
 
 class Operator(str, Enum):
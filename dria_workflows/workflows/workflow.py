@@ -1,5 +1,8 @@
 from .interface import *
-from typing import List, Union
+from typing import TYPE_CHECKING, List, Union
+
+if TYPE_CHECKING:
+    from .ir import CompiledWorkflow
 
 
 class Workflow(BaseModel):
@@ -15,18 +18,24 @@ class Workflow(BaseModel):
     """
 
     config: Config
-    external_memory: Optional[Dict[str, Union[str, StackPage, List[str]]]] = None
+    external_memory: Optional[
+        Dict[str, Union[str, StackPage, List[Union[str, Dict[str, str]]]]]
+    ] = None
     tasks: List[Task] = []
     steps: List[Edge] = []
     return_value: Optional[TaskOutput] = None
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None, **data):
         config = config or self.default_config()
-        super().__init__(config=config)
-        self.tasks = []
-        self.steps = []
-        self.external_memory = {}
-        self.return_value = None
+        super().__init__(config=config, **data)
+        if "tasks" not in data:
+            self.tasks = []
+        if "steps" not in data:
+            self.steps = []
+        if "external_memory" not in data:
+            self.external_memory = {}
+        if "return_value" not in data:
+            self.return_value = None
 
     @staticmethod
     def default_config() -> Config:
@@ -53,16 +62,119 @@ class Workflow(BaseModel):
         )
         self.steps.append(edge)
 
-    def save(self, file_path: str) -> None:
+    def save(self, file_path: str, compact: bool = False) -> None:
         """
         Save the workflow as a JSON file.
 
         Args:
             file_path (str): The path where the JSON file will be saved.
+            compact (bool, optional): Write without indentation and drop default values. Defaults to False.
+        """
+        from .serialization import to_json, write_json
+
+        if compact:
+            write_json(self, file_path, compact=True)
+            return
+
+        data = to_json(self, indent=True)
+        with open(file_path, "wb") as f:
+            f.write(data)
+
+    def dump(self, sink, compact: bool = False) -> int:
+        """
+        Stream the workflow as JSON to a path, binary file or socket-like sink with bounded memory.
+
+        Args:
+            sink: A file path, a binary file-like object or an object with `sendall`.
+            compact (bool, optional): Drop default values. Defaults to False.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        from .serialization import write_json
+
+        return write_json(self, sink, compact=compact)
+
+    def to_dict(self, compact: bool = False) -> Dict:
+        """
+        Dump the workflow to JSON-compatible python data, as written by `save`.
+        """
+        from .serialization import to_dict
+
+        return to_dict(self, compact=compact)
+
+    def to_json(self, compact: bool = False) -> bytes:
+        """
+        Serialize the workflow to JSON bytes without indentation.
+        """
+        from .serialization import to_json
+
+        return to_json(self, compact=compact)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the workflow in the compact binary format, with repeated keys and
+        values (types, operators, memory keys, task ids) stored once in a string table.
+        """
+        from .binary import encode
+        from .serialization import to_dict
+
+        return encode(to_dict(self, compact=True))
+
+    def compile(self) -> "CompiledWorkflow":
+        """
+        Lower the workflow to an index-based form for fast graph queries (task by id,
+        successors, predecessors, reachability). See `CompiledWorkflow`.
+        """
+        from .ir import compile_workflow
+
+        return compile_workflow(self)
+
+    @classmethod
+    def load(cls, file_path: str) -> "Workflow":
+        """
+        Load a workflow from a JSON file written by `save`.
+
+        Args:
+            file_path (str): The path of the JSON file.
+
+        Returns:
+            Workflow: The loaded workflow.
         """
-        import json
+        with open(file_path, "rb") as f:
+            return cls.from_json(f.read())
 
-        workflow_dict = self.model_dump(exclude_unset=True, exclude_none=True)
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> "Workflow":
+        """
+        Create a workflow from a JSON document.
+
+        Args:
+            data (Union[str, bytes]): The JSON document.
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(workflow_dict, f, indent=2)
+        Returns:
+            Workflow: The workflow.
+        """
+        return cls.model_validate_json(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Workflow":
+        """
+        Create a workflow from the compact binary format written by `to_bytes`.
+
+        Args:
+            data (bytes): The encoded workflow.
+
+        Returns:
+            Workflow: The workflow.
+        """
+        from .binary import decode
+
+        return cls.from_dict(decode(data))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Workflow":
+        """
+        Create a workflow from a decoded JSON object.
+        """
+        return cls.model_validate(data)
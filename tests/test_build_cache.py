@@ -0,0 +1,108 @@
+import pytest
+
+from dria_workflows import (
+    BuildCache,
+    CachedWorkflowBuilder,
+    Edge,
+    Operator,
+    Write,
+)
+
+from .test_bundle import build_workflow
+
+
+def build_cached(cache: BuildCache, i: int, suffix: str = ""):
+    builder = CachedWorkflowBuilder(
+        cache,
+        memory={
+            "topic": f"topic {i}",
+            "context": "shared context " * 50,
+            "history": ["first", f"unique {i} " * 30, {"role": "user"}],
+        },
+    )
+    builder.generative_step(
+        id="write",
+        prompt="Write about {{topic}} given {{context}} and {{history}}" + suffix,
+        operator=Operator.GENERATION,
+        outputs=[Write.new("text")],
+    )
+    builder.flow([Edge(source="write", target="_end")])
+    builder.set_return_value("text")
+    return builder.build()
+
+
+def test_build_cache_hits_and_misses(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    assert build_cached(cache, 1) == build_workflow(1)
+    assert build_cached(cache, 1) == build_workflow(1)
+    # only the memory layout is part of the key
+    assert build_cached(cache, 2) == build_workflow(2)
+    assert cache.stats()["hits"] == 2
+    build_cached(cache, 1, suffix=".")
+    assert cache.stats()["misses"] == 2
+
+    # entries survive the process
+    cache = BuildCache(str(tmp_path))
+    assert len(cache) == 2
+    assert build_cached(cache, 3) == build_workflow(3)
+    assert cache.stats()["hits"] == 1
+
+    # hits served from memory are copies that dump like a fresh build
+    cache = BuildCache(str(tmp_path / "memo"))
+    build_cached(cache, 4)
+    hit = build_cached(cache, 4)
+    assert hit.to_json() == build_workflow(4).to_json()
+    hit.tasks[0].outputs.clear()
+    hit.config.tools.append("extra")
+    assert build_cached(cache, 4) == build_workflow(4)
+    assert cache.stats()["hits"] == 2
+
+
+def test_build_cache_eviction_and_errors(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    build_cached(cache, 0)
+    size = cache.stats()["bytes"]
+
+    cache = BuildCache(str(tmp_path), max_bytes=int(size * 2.5))
+    for i in range(1, 4):
+        build_cached(cache, 0, suffix=str(i))
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 2
+
+    # step errors surface when building
+    builder = CachedWorkflowBuilder(cache, memory={"topic": "x"})
+    builder.generative_step(id="a", prompt="{{topic}}", operator=Operator.GENERATION)
+    builder.generative_step(id="a", prompt="{{topic}}", operator=Operator.GENERATION)
+    with pytest.raises(ValueError):
+        builder.build()
+
+
+def test_build_cache_key_snapshots_calls(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("Write about {{topic}}")
+
+    def build(memory, positional):
+        builder = CachedWorkflowBuilder(cache, memory=memory)
+        outputs = [Write.new("text")]
+        if positional:
+            builder.generative_step(Operator.GENERATION, None, str(prompt), None, "write", None, None, outputs)
+        else:
+            builder.generative_step(
+                operator=Operator.GENERATION, path=str(prompt), id="write", outputs=outputs
+            )
+        # changed after the call: neither the key nor the build sees it
+        outputs.append(Write.new("other"))
+        builder.flow([Edge(source="write", target="_end")])
+        builder.set_return_value("text")
+        return builder.build()
+
+    workflow = build({"topic": "x"}, positional=True)
+    assert [task.id for task in workflow.tasks] == ["write", "_end"]
+    assert [output.key for output in workflow.tasks[0].outputs] == ["text"]
+    # the same call by keyword hits
+    assert build({"topic": "y"}, positional=False).tasks == workflow.tasks
+    assert cache.stats()["hits"] == 1
+    # a list is a different layout than a string
+    build({"topic": ["x"]}, positional=False)
+    assert cache.stats()["misses"] == 2
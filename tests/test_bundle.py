@@ -0,0 +1,45 @@
+from dria_workflows import (
+    BundleReader,
+    BundleWriter,
+    Edge,
+    Operator,
+    Write,
+    WorkflowBuilder,
+)
+
+
+def build_workflow(i: int):
+    builder = WorkflowBuilder(
+        memory={
+            "topic": f"topic {i}",
+            "context": "shared context " * 50,
+            "history": ["first", f"unique {i} " * 30, {"role": "user"}],
+        }
+    )
+    builder.generative_step(
+        id="write",
+        prompt="Write about {{topic}} given {{context}} and {{history}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("text")],
+    )
+    builder.flow([Edge(source="write", target="_end")])
+    builder.set_return_value("text")
+    return builder.build()
+
+
+def test_bundle_round_trip_and_dedup(tmp_path):
+    workflows = [build_workflow(i) for i in range(50)]
+    path = str(tmp_path / "batch.bundle")
+
+    for codec in ("gzip", "lzma"):
+        with BundleWriter(path, codec=codec, frame_size=4096) as writer:
+            for workflow in workflows:
+                writer.add(workflow)
+            # shared tasks/config/steps/context plus one history item per workflow
+            assert len(writer._blobs) < 10 + len(workflows)
+
+        with BundleReader(path) as reader:
+            assert len(reader) == len(workflows)
+            assert reader[37] == workflows[37]
+            assert reader.get(3) == workflows[3]
+            assert list(reader) == workflows
@@ -0,0 +1,42 @@
+import os
+
+from dria_workflows import WorkflowCorpus, write_jsonl
+
+from .test_bundle import build_workflow
+
+
+def count_tasks(data: dict) -> int:
+    return len(data["tasks"])
+
+
+def test_corpus_random_access_and_search(tmp_path):
+    workflows = [build_workflow(i) for i in range(30)]
+    path = str(tmp_path / "workflows.jsonl")
+    assert write_jsonl(workflows, path) == 30
+
+    with WorkflowCorpus(path) as corpus:
+        assert len(corpus) == 30
+        assert corpus[12] == workflows[12]
+        assert corpus.get(29) == workflows[29]
+        assert corpus.search('"topic":"topic 7"') == [7]
+        assert corpus.search(b'"topic":"topic 1') == [1] + list(range(10, 20))
+        assert [len(r) for r in map(lambda r: range(*r), corpus.ranges(4))] == [8, 8, 7, 7]
+    assert os.path.exists(path + ".idx")
+
+    # appending invalidates the sidecar index
+    write_jsonl(workflows[:2], path, append=True)
+    with WorkflowCorpus(path) as corpus:
+        assert len(corpus) == 32
+        assert corpus[31] == workflows[1]
+        assert corpus.parallel_map(count_tasks, processes=2) == [2] * 32
+
+
+def test_corpus_index_not_writable(tmp_path):
+    workflows = [build_workflow(i) for i in range(3)]
+    path = str(tmp_path / "workflows.jsonl")
+    write_jsonl(workflows, path)
+    index_path = str(tmp_path / "missing" / "workflows.idx")
+    with WorkflowCorpus(path, index_path=index_path) as corpus:
+        assert len(corpus) == 3
+        assert corpus[2] == workflows[2]
+    assert not os.path.exists(index_path)
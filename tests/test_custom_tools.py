@@ -0,0 +1,146 @@
+from enum import Enum
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from dria_workflows import CustomTool, ParseResult, ToolResultCache
+from dria_workflows.workflows.tools import ToolBuilder
+
+
+class Unit(str, Enum):
+    CELSIUS = "celsius"
+    FAHRENHEIT = "fahrenheit"
+
+
+class Location(BaseModel):
+    city: str = Field(..., description="City name")
+    country: Optional[str] = None
+
+
+class WeatherTool(CustomTool):
+    name: str = "weather"
+    description: str = "Fetches the weather"
+    location: Location = Field(..., description="Where to look")
+    days: List[int] = Field(default_factory=list, description="Day offsets")
+    unit: Unit = Unit.CELSIUS
+    detail: Literal["short", "long"] = "short"
+
+    def execute(self, **kwargs):
+        return self.location.city
+
+
+def test_custom_tool_parameter_schema():
+    parameters = WeatherTool(location=Location(city="Paris")).get_parameters()
+
+    assert parameters["required"] == ["location"]
+    properties = parameters["properties"]
+    assert properties["location"]["type"] == "object"
+    assert properties["location"]["properties"]["city"]["type"] == "string"
+    assert properties["location"]["required"] == ["city"]
+    assert properties["days"] == {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Day offsets",
+    }
+    assert properties["unit"]["enum"] == ["celsius", "fahrenheit"]
+    assert properties["detail"]["enum"] == ["short", "long"]
+
+
+class Category(BaseModel):
+    name: str
+    children: List["Category"] = Field(default_factory=list)
+
+
+class TreeTool(CustomTool):
+    name: str = "tree"
+    description: str = "Walks categories"
+    root: Category
+    point: Tuple[int, str]
+    path: Tuple[str, ...] = ()
+
+    def execute(self, **kwargs):
+        return self.root.name
+
+
+def test_custom_tool_recursive_and_tuple_schema():
+    tool = TreeTool(root=Category(name="a"), point=(1, "x"))
+    properties = tool.get_parameters()["properties"]
+    # the nested Category is a plain object instead of recursing
+    children = properties["root"]["properties"]["children"]
+    assert children["items"] == {"type": "object"}
+    assert properties["point"] == {
+        "type": "array",
+        "prefixItems": [{"type": "integer"}, {"type": "string"}],
+        "minItems": 2,
+        "maxItems": 2,
+        "description": "",
+    }
+    assert properties["path"]["items"] == {"type": "string"}
+
+
+def test_custom_tool_parameter_schema_cached_per_class():
+    class ForecastTool(WeatherTool):
+        hours: int = Field(..., description="Hours ahead")
+
+    assert WeatherTool.parameters_json() is WeatherTool.parameters_json()
+    assert "hours" not in WeatherTool.parameters_json()
+    assert "hours" in ForecastTool.parameters_json()
+
+    # returned dicts are independent copies of the cached schema
+    tool = WeatherTool(location=Location(city="Paris"))
+    tool.get_parameters()["properties"].clear()
+    assert tool.get_parameters()["properties"]
+
+    template = ToolBuilder.build(tool)
+    serialized = template.serialize_model()
+    assert serialized["mode"] == "custom"
+    assert serialized["parameters"] == tool.get_parameters()
+    serialized["parameters"]["properties"].clear()
+    assert template.serialize_model()["parameters"] == tool.get_parameters()
+
+
+class CalculatorTool(CustomTool):
+    name: str = "calculator"
+    description: str = "Sums integers"
+    lhs: int = Field(..., description="Left hand side")
+    rhs: int = Field(..., description="Right hand side")
+
+    def execute(self, **kwargs):
+        CalculatorTool.calls += 1
+        return self.lhs + self.rhs
+
+
+CalculatorTool.calls = 0
+
+
+def test_tool_result_cache(tmp_path):
+    cache = ToolResultCache(maxsize=2, path=str(tmp_path / "tools.cache"))
+    first = ParseResult(name="calculator", arguments={"lhs": 1, "rhs": 2})
+    reordered = ParseResult(name="calculator", arguments={"rhs": 2, "lhs": 1})
+
+    calls = CalculatorTool.calls
+    assert first.execute([CalculatorTool], result_cache=cache) == 3
+    assert reordered.execute([CalculatorTool], result_cache=cache) == 3
+    assert CalculatorTool.calls == calls + 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+    # `cache` is the tool's own keyword; arguments that are not JSON are not cached
+    assert first.execute([CalculatorTool], result_cache=cache, cache=object()) == 3
+    assert CalculatorTool.calls == calls + 2
+    assert cache.stats()["size"] == 1
+
+    cache.put("calculator", {"lhs": 2, "rhs": 2}, 4)
+    cache.put("calculator", {"lhs": 3, "rhs": 3}, 6)
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("calculator", {"lhs": 1, "rhs": 2}) is None
+
+    cache.save()
+    restored = ToolResultCache(path=str(tmp_path / "tools.cache"))
+    assert restored.get("calculator", {"lhs": 3, "rhs": 3}) == 6
+
+
+def test_tool_result_cache_ttl():
+    cache = ToolResultCache(tool_ttls={"calculator": -1})
+    cache.put("calculator", {"lhs": 1, "rhs": 2}, 3)
+    cache.put("search", {"query": "cuda"}, "results")
+    assert cache.get("calculator", {"lhs": 1, "rhs": 2}) is None
+    assert cache.get("search", {"query": "cuda"}) == "results"
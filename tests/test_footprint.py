@@ -0,0 +1,39 @@
+from dria_workflows import (
+    Workflow,
+    footprint,
+    measure_resident,
+    slim_workflow,
+    workflow_hash,
+)
+
+from .test_bundle import build_workflow
+
+
+def test_footprint_and_slim_workflow():
+    data = build_workflow(1).to_json(compact=True)
+    workflow = Workflow.from_json(data)
+    report = footprint(workflow)
+    assert report["total"] == sum(v for k, v in report.items() if k != "total")
+    assert report["memory"] > 1000 and report["prompts"] > 0
+
+    slimmed = slim_workflow(Workflow.from_json(data))
+    assert slimmed == workflow
+    assert slimmed.to_json() == workflow.to_json()
+    assert workflow_hash(slimmed) == workflow_hash(workflow)
+    assert footprint(slimmed)["total"] < report["total"]
+
+    # fields set per instance are kept, so unset fields stay out of dumps
+    assert slimmed.model_dump(exclude_unset=True) == workflow.model_dump(exclude_unset=True)
+    other = slim_workflow(Workflow.from_json(data))
+    other.tasks[0].id = "renamed"
+    assert slimmed.tasks[0].id == "write"
+    assert other.tasks[0].model_fields_set == slimmed.tasks[0].model_fields_set
+
+
+def test_measure_resident():
+    data = build_workflow(1).to_json(compact=True)
+    plain = measure_resident(lambda i: Workflow.from_json(data), 50)
+    slim = measure_resident(
+        lambda i: slim_workflow(Workflow.from_json(data)), 50
+    )
+    assert 0 < slim < plain
@@ -0,0 +1,39 @@
+from dria_workflows import Workflow, deduplicate, workflow_hash
+
+from .test_bundle import build_workflow
+from .test_workflow_serialization import build_search_workflow
+
+
+def test_workflow_hash_is_stable_across_round_trips():
+    workflow = build_search_workflow()
+    digest = workflow_hash(workflow)
+
+    assert workflow_hash(Workflow.from_json(workflow.to_json(compact=True))) == digest
+    assert workflow_hash(build_search_workflow()) == digest
+
+    # inputs come out of a set, their order must not matter
+    workflow.tasks[0].inputs.reverse()
+    assert workflow_hash(workflow) == digest
+
+
+def test_workflow_hash_options():
+    first, second = build_workflow(1), build_workflow(2)
+    assert workflow_hash(first) != workflow_hash(second)
+    assert workflow_hash(first, include_memory=False) == workflow_hash(
+        second, include_memory=False
+    )
+
+    renamed = build_workflow(1)
+    renamed.tasks[0].id = "other"
+    renamed.steps[0].source = "other"
+    assert workflow_hash(renamed) != workflow_hash(first)
+    assert workflow_hash(renamed, normalize_ids=True) == workflow_hash(
+        first, normalize_ids=True
+    )
+
+
+def test_deduplicate():
+    workflows = [build_workflow(i % 3) for i in range(7)]
+    unique, mapping = deduplicate(workflows)
+    assert len(unique) == 3
+    assert mapping == [0, 1, 2, 0, 1, 2, 0]
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+import dria_workflows
+
+
+def run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def test_import_is_lazy_and_side_effect_free():
+    code = (
+        "import logging, sys, dria_workflows;"
+        "print(sorted(m for m in ('jsonschema', 'pydantic', 'sqlite3') if m in sys.modules),"
+        " logging.getLogger().handlers)"
+    )
+    assert run(code) == "[] []"
+    code = (
+        "import sys; from dria_workflows import WorkflowBuilder;"
+        "print(sorted(m for m in ('jsonschema', 'sqlite3', 'dria_workflows.workflows.tools.parsers')"
+        " if m in sys.modules))"
+    )
+    assert run(code) == "[]"
+
+
+def test_lazy_attributes():
+    for name in dria_workflows.__all__:
+        assert getattr(dria_workflows, name) is not None
+    assert "WorkflowStore" in dir(dria_workflows)
+    assert dria_workflows.CustomToolTemplate is not None
+    with pytest.raises(AttributeError):
+        dria_workflows.missing
@@ -0,0 +1,85 @@
+import pytest
+
+from dria_workflows import (
+    ConditionBuilder,
+    Edge,
+    Expression,
+    Operator,
+    Read,
+    Workflow,
+    WorkflowBuilder,
+    Write,
+    compile_workflow,
+)
+
+
+def build_branching_workflow():
+    builder = WorkflowBuilder(memory={"topic": "AI"})
+    for id in ("draft", "review", "rewrite", "unused"):
+        builder.generative_step(
+            id=id,
+            prompt="Work on {{topic}}",
+            operator=Operator.GENERATION,
+            outputs=[Write.new(id)],
+        )
+    builder.flow(
+        [
+            Edge(source="draft", target="review", fallback="rewrite"),
+            Edge(
+                source="review",
+                target="_end",
+                condition=ConditionBuilder.build(
+                    expected="yes",
+                    expression=Expression.EQUAL,
+                    input=Read.new("review", True),
+                    target_if_not="rewrite",
+                ),
+            ),
+            Edge(source="rewrite", target="review"),
+            Edge(source="unused", target="_end"),
+        ]
+    )
+    builder.set_return_value("review")
+    return builder.build()
+
+
+def test_compile_graph_queries():
+    ir = build_branching_workflow().compile()
+    draft, review, rewrite, unused, end = (
+        ir.task_index(id) for id in ("draft", "review", "rewrite", "unused", "_end")
+    )
+    assert len(ir) == 5 and ir.end == end and ir.entry == draft
+    assert list(ir.successors(draft)) == [review, rewrite]
+    assert sorted(ir.successors(review)) == [rewrite, end]
+    assert sorted(ir.predecessors(review)) == [draft, rewrite]
+    assert list(ir.out_edges(review)) == [1]
+    assert ir.edge_condition[1].target_if_not == rewrite
+    assert ir.edge_fallback[0] == rewrite and ir.edge_fallback[1] == -1
+    assert list(ir.reachable()) == [1, 1, 1, 0, 1]
+    assert ir.readers("topic") == [draft, review, rewrite, unused]
+    assert ir.writers("review") == [review]
+    assert ir.keys[ir.tasks[draft].inputs[0][1]] == "topic"
+
+
+def test_compile_errors_and_virtual_end():
+    workflow = build_branching_workflow()
+    workflow.tasks.pop()  # the builder's _end task
+    assert compile_workflow(workflow).tasks[-1].id == "_end"
+
+    workflow.steps[0].target = "missing"
+    with pytest.raises(ValueError):
+        compile_workflow(workflow)
+    assert len(compile_workflow(Workflow())) == 0
+
+
+def test_loops_and_execution_bounds():
+    ir = build_branching_workflow().compile()
+    draft, review, rewrite, unused, end = (
+        ir.task_index(id) for id in ("draft", "review", "rewrite", "unused", "_end")
+    )
+    order, back = ir.topological_order()
+    assert order == [draft, review, rewrite, end]
+    assert back == [(rewrite, review)]
+    assert list(ir.distances()) == [0, 1, 1, -1, 2]
+    assert list(ir.distances(end, reverse=True)) == [2, 1, 2, 1, 0]
+    assert list(ir.max_executions(50)) == [1, 25, 25, 0, 1]
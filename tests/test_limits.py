@@ -0,0 +1,55 @@
+import pytest
+
+from dria_workflows import Edge, Operator, analyze_limits, simulate_limits
+
+from .test_ir import build_branching_workflow
+from .test_workflow_serialization import build_search_workflow
+
+
+def test_analyze_limits():
+    workflow = build_search_workflow()
+    analysis = analyze_limits(workflow)
+    assert (analysis.shortest_steps, analysis.longest_steps) == (2, 2)
+    assert (analysis.shortest_time, analysis.longest_time) == (25.0, 25.0)
+
+    (loop,) = analysis.loops
+    assert loop.back == ("search", "create_query")
+    assert loop.tasks == ["create_query", "search"]
+    assert loop.exits == [("search", "_end", workflow.steps[1].condition)]
+    # (2 steps + 3 rounds of 2) * 1.5, (25s + 3 rounds of 25s) * 1.5
+    assert (analysis.max_steps, analysis.max_time) == (12, 150)
+
+    analysis = analyze_limits(
+        build_branching_workflow(),
+        latency={Operator.GENERATION: 2.0},
+        task_latency={"rewrite": 5.0},
+        loop_iterations=1,
+        margin=1.0,
+    )
+    assert analysis.shortest_steps == 2 and analysis.longest_steps == 2
+    assert analysis.longest_time == 4.0
+    (loop,) = analysis.loops
+    assert loop.tasks == ["review", "rewrite"]
+    # one extra round of review (2s) and rewrite (5s)
+    assert (analysis.max_steps, analysis.max_time) == (4, 11)
+
+
+def test_simulate_limits():
+    workflow = build_search_workflow()
+    always = simulate_limits(workflow, {"search": 1.0}, runs=100, seed=0)
+    assert set(always.steps) == {2} and set(always.times) == {25.0}
+
+    never = simulate_limits(workflow, {"search": 0.0}, runs=10, max_steps=9)
+    assert never.truncated == 10 and set(never.steps) == {9}
+
+    coin = simulate_limits(workflow, runs=2000, seed=1)
+    assert coin.percentile(50)[0] in (2, 4)
+    assert coin.percentile(100)[0] >= 8
+    steps, time = coin.recommend(q=99, margin=1.0)
+    assert coin.exceeding(steps, time) <= 0.01
+    assert coin.exceeding(2, 25.0) > 0.3
+
+    # several edges out of one task cannot be simulated
+    workflow.steps.append(Edge(source="create_query", target="_end"))
+    with pytest.raises(ValueError, match="create_query has 2 outgoing edges"):
+        simulate_limits(workflow, runs=1)
@@ -0,0 +1,85 @@
+import json
+import re
+
+from dria_workflows import (
+    Edge,
+    Operator,
+    Workflow,
+    WorkflowBuilder,
+    Write,
+    minimal_dict,
+    minimal_json,
+    payload_savings,
+    validate_workflow_json,
+)
+
+from .test_workflow_serialization import build_search_workflow
+
+INSTRUCTIONS = "You are a careful analyst. Answer in three short paragraphs. Topic: " * 2
+
+
+def build_repetitive_workflow():
+    builder = WorkflowBuilder(memory={"topic": "GPUs"})
+    ids = ["history", "economics", "outlook"]
+    for id in ids:
+        builder.generative_step(
+            id=id,
+            prompt=INSTRUCTIONS + f"{{{{topic}}}}: write about its {id}.",
+            operator=Operator.GENERATION,
+            outputs=[Write.new(id)],
+        )
+    builder.flow(
+        [Edge(source=a, target=b) for a, b in zip(ids, ids[1:])]
+        + [Edge(source="outlook", target="_end")]
+    )
+    builder.set_return_value("outlook")
+    return builder.build()
+
+
+def render(data, task):
+    memory = data["external_memory"]
+    return re.sub(
+        r"\{\{(\w+)\}\}",
+        lambda m: memory[m.group(1)] if m.group(1).startswith("_s") else m.group(0),
+        task["messages"][0]["content"],
+    )
+
+
+def test_minimal_dict_is_valid_and_equivalent():
+    workflow = build_repetitive_workflow()
+    data = minimal_dict(workflow)
+    assert validate_workflow_json(json.dumps(data))
+    assert Workflow.from_dict(data).tasks[0].name == ""
+
+    end = data["tasks"][-1]
+    assert end["messages"] == [] and end["name"] == "" and end["description"] == ""
+    assert "to_json" not in data["return_value"]
+    assert data["external_memory"]["_s0"] == INSTRUCTIONS
+    for task, original in zip(data["tasks"], workflow.tasks[:-1]):
+        assert render(data, task) == original.messages[0].content
+        assert {"name": "_s0", "value": {"type": "read", "key": "_s0"}, "required": True} in task["inputs"]
+
+    savings = payload_savings(workflow)
+    assert savings["minimal"] == len(minimal_json(workflow))
+    assert savings["minimal"] < savings["compact"] < savings["full"]
+    assert savings["saved"] == savings["full"] - savings["minimal"]
+
+
+def test_minimal_dict_without_repetition():
+    workflow = build_search_workflow()
+    data = minimal_dict(workflow)
+    assert validate_workflow_json(json.dumps(data))
+    assert data["external_memory"] == workflow.external_memory
+    assert data["return_value"]["to_json"] is True
+    unshared = minimal_dict(build_repetitive_workflow(), share_strings=False)
+    assert "_s0" not in unshared["external_memory"]
+
+
+def test_minimal_dict_shared_keys_avoid_task_keys():
+    workflow = build_repetitive_workflow()
+    # a task output named like the first shared string
+    workflow.tasks[0].outputs = [Write.new("_s0")]
+    data = minimal_dict(workflow)
+    assert "_s0" not in data["external_memory"]
+    assert data["external_memory"]["__s0"] == INSTRUCTIONS
+    assert data["tasks"][0]["outputs"][0]["key"] == "_s0"
@@ -0,0 +1,68 @@
+from dria_workflows import (
+    Edge,
+    Operator,
+    Push,
+    WorkflowBuilder,
+    Write,
+    optimize_workflow,
+    validate_workflow_json,
+)
+
+from .test_workflow_serialization import build_search_workflow
+
+
+def build_workflow_with_dead_tasks(order):
+    builder = WorkflowBuilder(memory={"topic": "AI", "style": "formal", "unused": "x"})
+    steps = {
+        "side": ("Note on {{topic}} in {{style}}", [Write.new("note")]),
+        "draft": ("Draft on {{topic}}", [Write.new("draft")]),
+        "summarize": ("Summarize {{draft}}", [Write.new("summary"), Push.new("log")]),
+    }
+    for id in order:
+        prompt, outputs = steps[id]
+        builder.generative_step(
+            id=id, prompt=prompt, operator=Operator.GENERATION, outputs=outputs
+        )
+    builder.flow(
+        [Edge(source=a, target=b) for a, b in zip(order, order[1:])]
+        + [Edge(source=order[-1], target="_end")]
+    )
+    builder.set_return_value("summary")
+    return builder.build()
+
+
+def test_optimize_removes_dead_tasks_outputs_and_memory():
+    workflow = build_workflow_with_dead_tasks(["draft", "side", "summarize"])
+    before = workflow.to_json()
+    optimized, report = optimize_workflow(workflow)
+
+    assert workflow.to_json() == before
+    assert [task.id for task in optimized.tasks] == ["draft", "summarize", "_end"]
+    assert [(edge.source, edge.target) for edge in optimized.steps] == [
+        ("draft", "summarize"),
+        ("summarize", "_end"),
+    ]
+    assert [output.key for output in optimized.tasks[1].outputs] == ["summary"]
+    assert optimized.external_memory == {"topic": "AI"}
+    assert report.removed_tasks == ["side"]
+    assert report.removed_outputs == [("summarize", "log")]
+    assert sorted(report.removed_memory_keys) == ["style", "unused"]
+    assert report.llm_calls_saved == 1
+    assert report.bytes_saved > 0
+    assert validate_workflow_json(
+        optimized.model_dump_json(exclude_unset=True, exclude_none=True)
+    )
+
+
+def test_optimize_moves_entry_and_keeps_loops():
+    optimized, report = optimize_workflow(
+        build_workflow_with_dead_tasks(["side", "draft", "summarize"])
+    )
+    assert [task.id for task in optimized.tasks] == ["draft", "summarize", "_end"]
+    assert report.removed_tasks == ["side"]
+
+    # the condition reads `result` and the loop pushes to `history`, which create_query reads
+    workflow = build_search_workflow()
+    optimized, report = optimize_workflow(workflow)
+    assert optimized.to_json() == workflow.to_json()
+    assert report.removed_tasks == [] and report.bytes_saved == 0
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from dria_workflows import (
+    Edge,
+    Operator,
+    WorkflowBuilder,
+    Write,
+    pack_workflows,
+    unpack_result,
+    validate_workflow_json,
+)
+
+from .test_workflow_serialization import build_search_workflow
+
+
+def build_poem(topic):
+    builder = WorkflowBuilder(memory={"topic": topic})
+    builder.generative_step(
+        id="poem",
+        prompt="Write a short poem about {{topic}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("poem")],
+    )
+    builder.flow([Edge(source="poem", target="_end")])
+    builder.set_return_value("poem")
+    return builder.build()
+
+
+def test_pack_namespaces_and_chains_workflows():
+    workflows = [build_poem("the sea"), build_search_workflow(), build_poem("rain")]
+    packed, manifest = pack_workflows(workflows)
+    assert validate_workflow_json(packed.to_json())
+
+    assert manifest.prefixes == ["p0_", "p1_", "p2_"]
+    assert manifest.returns == [None, 2, None]
+    assert packed.external_memory["p0_topic"] == "the sea"
+    assert packed.external_memory["p2_topic"] == "rain"
+    assert [task.id for task in packed.tasks if task.operator == Operator.END] == ["_end"]
+    assert packed.tasks[0].id == "p0_poem"
+
+    poem = packed.tasks[0]
+    assert poem.messages[0].content == "Write a short poem about {{p0_topic}}"
+    assert [input.value.key for input in poem.inputs] == ["p0_topic"]
+    assert [output.key for output in poem.outputs] == ["p0_poem"]
+
+    # the end of each workflow leads to the start of the next
+    ir = packed.compile()
+    assert all(ir.reachable())
+    edges = {(edge.source, edge.target) for edge in packed.steps}
+    assert ("p0_poem", "p1_" + workflows[1].tasks[0].id) in edges
+    assert ("p2_poem", "_end") in edges
+    for edge in packed.steps:
+        if edge.condition is not None:
+            assert edge.condition.input.key.startswith("p1_")
+
+    assert packed.config.max_steps == sum(w.config.max_steps for w in workflows)
+    assert [value.key for value in packed.return_value.input] == [
+        "p0_poem",
+        "p1_result",
+        "p1_history",
+        "p2_poem",
+    ]
+    assert packed.return_value.to_json
+
+
+def test_unpack_result():
+    packed, manifest = pack_workflows(
+        [build_poem("a"), build_search_workflow(), build_poem("b")]
+    )
+    result = json.dumps(["poem a", "found", ["q1", "q2"], "poem b"])
+    assert unpack_result(result, manifest) == ["poem a", ["found", ["q1", "q2"]], "poem b"]
+    with pytest.raises(ValueError):
+        unpack_result(["poem a"], manifest)
+
+
+def test_pack_rejects_incompatible_workflows():
+    other = build_poem("b")
+    other.config.tools = ["jina"]
+    with pytest.raises(ValueError):
+        pack_workflows([build_poem("a"), other])
+    with pytest.raises(ValueError):
+        pack_workflows([])
@@ -0,0 +1,161 @@
+import pytest
+
+from dria_workflows import (
+    BuildCache,
+    CachedWorkflowBuilder,
+    Edge,
+    Operator,
+    Pop,
+    Workflow,
+    WorkflowBuilder,
+    Write,
+    parallel_plan,
+    validate_workflow_json,
+)
+
+from .test_workflow_serialization import build_search_workflow
+
+
+def build_fan_in_workflow(parallel=False):
+    builder = WorkflowBuilder(memory={"topic": "AI", "questions": ["a", "b"]})
+    steps = [
+        ("pros", "List pros of {{topic}}", [], "pros"),
+        ("cons", "List cons of {{topic}}", [], "cons"),
+        ("first", "Answer {{questions}}", [Pop.new("questions", True)], "first"),
+        ("second", "Answer {{questions}}", [Pop.new("questions", True)], "second"),
+        ("verdict", "Weigh {{pros}} against {{cons}}", [], "verdict"),
+    ]
+    for id, prompt, inputs, output in steps:
+        builder.generative_step(
+            id=id,
+            prompt=prompt,
+            operator=Operator.GENERATION,
+            inputs=inputs,
+            outputs=[Write.new(output)],
+        )
+    ids = [id for id, *_ in steps]
+    builder.flow(
+        [Edge(source=a, target=b) for a, b in zip(ids, ids[1:])]
+        + [Edge(source="verdict", target="_end")]
+    )
+    builder.set_return_value("verdict")
+    builder.set_parallel(parallel)
+    return builder.build()
+
+
+def test_parallel_plan():
+    plan = parallel_plan(build_fan_in_workflow())
+    # the pops of `questions` stay in order, the verdict waits for pros and cons
+    assert plan.groups == [["pros", "cons", "first"], ["second", "verdict"]]
+    assert plan.levels["verdict"] == 2
+    assert plan.serial_time == 50.0 and plan.parallel_time == 20.0
+    assert plan.speedup == 2.5
+
+    # a loop runs task by task
+    plan = parallel_plan(build_search_workflow())
+    assert plan.groups == [["create_query"], ["search"]]
+    assert plan.speedup == 1.0
+
+
+def test_builder_annotates_parallel_groups():
+    assert build_fan_in_workflow().config.parallel_groups is None
+    workflow = build_fan_in_workflow(parallel=True)
+    assert workflow.config.parallel_groups == [
+        ["pros", "cons", "first"],
+        ["second", "verdict"],
+    ]
+    data = workflow.to_json(compact=True)
+    assert Workflow.from_json(data) == workflow
+    assert validate_workflow_json(
+        workflow.model_dump_json(exclude_unset=True, exclude_none=True)
+    )
+
+
+def build_map_workflow(builder, parallelism=None):
+    builder.map_step(
+        "documents", "Summarize {{documents}}", "summary", parallelism=parallelism
+    )
+    builder.reduce_step(
+        "Combine {{summary}}",
+        id="combine",
+        outputs=[Write.new("report")],
+    )
+    builder.flow(
+        [
+            Edge(source="summary_2", target="combine"),
+            Edge(source="combine", target="_end"),
+        ]
+    )
+    builder.set_return_value(["report", "summary"])
+    return builder.build()
+
+
+def test_map_and_reduce_steps():
+    builder = WorkflowBuilder(memory={"documents": ["a", "b", "c"]})
+    workflow = build_map_workflow(builder, parallelism=2)
+    assert validate_workflow_json(workflow.to_json())
+    assert [task.id for task in workflow.tasks] == [
+        "summary_0",
+        "summary_1",
+        "summary_2",
+        "combine",
+        "_end",
+    ]
+    second = workflow.tasks[1]
+    assert [(i.value.type, i.value.index) for i in second.inputs] == [("peek", 1)]
+    assert [output.key for output in second.outputs] == ["summary_1"]
+    combine = workflow.tasks[3]
+    assert combine.messages[0].content == "Combine {{summary_0}}\n{{summary_1}}\n{{summary_2}}"
+    assert {input.value.key for input in combine.inputs} == {
+        "summary_0",
+        "summary_1",
+        "summary_2",
+    }
+    assert [value.key for value in workflow.return_value.input] == [
+        "report",
+        "summary_0",
+        "summary_1",
+        "summary_2",
+    ]
+    # independent elements run together, two at a time
+    assert workflow.config.parallel_groups == [
+        ["summary_0", "summary_1"],
+        ["summary_2"],
+        ["combine"],
+    ]
+
+
+def test_map_step_errors():
+    builder = WorkflowBuilder(memory={"topic": "AI", "documents": ["a"]})
+    with pytest.raises(ValueError):
+        builder.map_step("topic", "{{topic}}", "out")
+    with pytest.raises(ValueError):
+        builder.map_step("documents", "{{documents}}", "out", parallelism=0)
+    with pytest.raises(ValueError):
+        builder.map_step("documents", "{{documents}}", "out", size=2)
+    builder.map_step("documents", "{{documents}}", "out")
+    with pytest.raises(ValueError):
+        builder.map_step("documents", "{{documents}}", "out")
+    # ids are checked before any task is added
+    builder.generative_step(id="other_0", prompt="x", operator=Operator.GENERATION)
+    count = len(builder.tasks)
+    with pytest.raises(ValueError):
+        builder.map_step("documents", "{{documents}}", "more", id="other")
+    assert len(builder.tasks) == count
+
+
+def test_map_step_with_build_cache(tmp_path):
+    def build(documents):
+        builder = CachedWorkflowBuilder(cache, memory={"documents": documents})
+        builder.map_step("documents", "Summarize {{documents}}", "summary")
+        builder.flow([Edge(source=f"summary_{len(documents) - 1}", target="_end")])
+        builder.set_return_value("summary")
+        return builder.build()
+
+    cache = BuildCache(str(tmp_path))
+    assert build(["a", "b"]) == build(["c", "d"]).model_copy(
+        update={"external_memory": {"documents": ["a", "b"]}}
+    )
+    # the number of tasks follows the length of the list
+    assert len(build(["a"]).tasks) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
@@ -0,0 +1,47 @@
+import pytest
+
+from dria_workflows import Model, ModelRouter, Workflow
+
+from .test_bundle import build_workflow
+
+
+def test_route_batch_picks_cheapest_fitting_model():
+    router = ModelRouter(
+        models=[Model.PHI3_MEDIUM_128K, Model.PHI3_MEDIUM], output_tokens=256
+    )
+    assert router.models == [Model.PHI3_MEDIUM, Model.PHI3_MEDIUM_128K]
+
+    small = build_workflow(1)
+    large = build_workflow(2)
+    large.external_memory = {**large.external_memory, "context": "long context " * 2000}
+    routes = router.route_batch([small, large, small])
+
+    assert [route.model for route in routes] == [
+        Model.PHI3_MEDIUM,
+        Model.PHI3_MEDIUM_128K,
+        Model.PHI3_MEDIUM,
+    ]
+    assert routes[1].tokens > 4096 > routes[0].tokens
+    assert routes[0].tasks == {"write": Model.PHI3_MEDIUM}
+    assert router.table(routes) == {
+        Model.PHI3_MEDIUM: [0, 2],
+        Model.PHI3_MEDIUM_128K: [1],
+    }
+    # one estimator for the template
+    assert len(router._estimators) == 1
+
+    # the `_end` task that only the edges name calls no model either
+    implicit = build_workflow(1)
+    implicit.tasks = [task for task in implicit.tasks if task.id != "_end"]
+    assert router.route(implicit).tasks == {"write": Model.PHI3_MEDIUM}
+
+    huge = build_workflow(3)
+    huge.external_memory = {**huge.external_memory, "context": "x" * 600_000}
+    assert router.route(huge).model is None
+
+
+def test_router_arguments():
+    with pytest.raises(ValueError):
+        ModelRouter(headroom=1)
+    with pytest.raises(ValueError):
+        ModelRouter(models=[Model.GPT4O], profiles={})
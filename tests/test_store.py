@@ -0,0 +1,30 @@
+from dria_workflows import WorkflowStore, workflow_hash
+
+from .test_bundle import build_workflow
+
+
+def test_store_put_get_and_queries(tmp_path):
+    workflows = [build_workflow(i % 5) for i in range(8)]
+    with WorkflowStore(str(tmp_path / "workflows.db")) as store:
+        first = store.put(workflows[0], created=100.0)
+        assert first == workflow_hash(workflows[0])
+        hashes = store.put_many(workflows, created=200.0, batch_size=3)
+        assert hashes[0] == first
+        assert len(store) == 5
+        assert first in store and "missing" not in store
+
+        assert store.get(hashes[3]) == workflows[3]
+        assert store.get(hashes[3]) == workflows[3]
+
+        # all share tasks and steps, so they share a template
+        assert store.templates() == [
+            (workflow_hash(workflows[0], include_memory=False), 5)
+        ]
+        assert store.find(until=150.0) == [first]
+        assert len(store.find(since=150.0)) == 4
+        assert len(store.find(memory_key="history", limit=2)) == 2
+        assert store.find(memory_key="missing") == []
+
+        assert store.delete(first)
+        assert not store.delete(first)
+        assert len(store.find(memory_key="topic")) == 4
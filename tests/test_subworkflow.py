@@ -0,0 +1,91 @@
+import pytest
+
+from dria_workflows import (
+    BuildCache,
+    CachedWorkflowBuilder,
+    Edge,
+    Operator,
+    SubWorkflow,
+    WorkflowBuilder,
+    Write,
+    validate_workflow_json,
+)
+
+from .test_workflow_serialization import build_search_workflow
+
+RESEARCH = SubWorkflow("research", build_search_workflow())
+
+
+def compose(builder):
+    first = builder.inline(
+        RESEARCH, "a", bind={"topic_1": "subject"}, next="b_create_query"
+    )
+    builder.inline(RESEARCH, "b", next="summary")
+    builder.generative_step(
+        id="summary",
+        prompt="Summarize {{a_result}} and {{b_result}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("summary")],
+    )
+    builder.flow([Edge(source="summary", target="_end")])
+    builder.set_return_value("summary")
+    return first
+
+
+def test_inline_namespaces_and_shares_constants():
+    builder = WorkflowBuilder(memory={"subject": "GPUs"})
+    assert compose(builder) == "a_create_query"
+    workflow = builder.build()
+    assert validate_workflow_json(workflow.to_json())
+
+    assert [task.id for task in workflow.tasks] == [
+        "a_create_query",
+        "a_search",
+        "b_create_query",
+        "b_search",
+        "summary",
+        "_end",
+    ]
+    # constants are stored once, state per instance, bound keys are the host's
+    assert workflow.external_memory == {
+        "subject": "GPUs",
+        "research_documents": ["a", {"title": "b"}],
+        "research_topic_1": "Linear Algebra",
+    }
+    a, _, b = workflow.tasks[:3]
+    assert a.messages[0].content.startswith("Write a query about {{subject}}, avoid {{a_history}}")
+    assert b.messages[0].content.startswith("Write a query about {{research_topic_1}}")
+    edges = {(edge.source, edge.target) for edge in workflow.steps}
+    assert {("a_search", "b_create_query"), ("b_search", "summary")} <= edges
+    condition = workflow.steps[1].condition
+    assert condition.input.key == "a_result" and condition.target_if_not == "a_create_query"
+
+
+def test_inline_dedup_and_errors():
+    builder = WorkflowBuilder(memory={"subject": "GPUs"})
+    compose(builder)
+    count = len(builder.tasks)
+    # the same instance again adds nothing
+    assert builder.inline(RESEARCH, "b", next="summary") == "b_create_query"
+    assert len(builder.tasks) == count
+    # tasks are copies: changing them leaves the fragment's cached instance alone
+    builder.tasks[2].messages[0].content = "changed"
+    assert RESEARCH.instance("b", None, "summary")[0][0].messages[0].content != "changed"
+    with pytest.raises(ValueError):
+        builder.inline(RESEARCH, "b", next="_end")
+
+    other = WorkflowBuilder(research_documents="different")
+    with pytest.raises(ValueError):
+        other.inline(RESEARCH, "a")
+
+
+def test_inline_with_build_cache(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    expected = WorkflowBuilder(memory={"subject": "GPUs"})
+    compose(expected)
+    expected = expected.build()
+    for _ in range(2):
+        builder = CachedWorkflowBuilder(cache, memory={"subject": "GPUs"})
+        compose(builder)
+        assert builder.build() == expected
+    assert cache.stats()["hits"] == 1
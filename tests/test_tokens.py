@@ -0,0 +1,113 @@
+import json
+
+from dria_workflows import (
+    CappedPush,
+    ConditionBuilder,
+    Edge,
+    Expression,
+    GetAll,
+    Operator,
+    Push,
+    Read,
+    Slice,
+    TokenEstimator,
+    WorkflowBuilder,
+    Write,
+    estimate_tokens,
+)
+
+from .test_bundle import build_workflow
+from .test_ir import build_branching_workflow
+
+
+def test_estimate_substitutes_memory():
+    workflow = build_workflow(1)
+    memory = workflow.external_memory
+    estimate = estimate_tokens(workflow, tokenizer=len, output_tokens=100)
+
+    history = sum(
+        len(item if isinstance(item, str) else json.dumps(item)) + 1
+        for item in memory["history"]
+    )
+    expected = (
+        4
+        + len("Write about  given  and ")
+        + len(memory["topic"])
+        + len(memory["context"])
+        + history
+    )
+    assert estimate.prompt["write"] == expected
+    assert estimate.output == {"write": 100, "_end": 0}
+    assert estimate.worst_path == ["write", "_end"]
+    assert estimate.worst_path_tokens == expected + 100 + 4
+    assert estimate.over_limit == []
+
+
+def test_estimate_batch_and_loops():
+    workflow = build_workflow(1)
+    estimator = TokenEstimator(workflow, tokenizer=len, output_tokens=100, context_limit=1000)
+    small, large = estimator.estimate_batch(
+        [{**workflow.external_memory, "context": ""}, workflow.external_memory]
+    )
+    assert large.prompt["write"] - small.prompt["write"] == len(
+        workflow.external_memory["context"]
+    )
+    assert small.over_limit == [] and large.over_limit == ["write"]
+
+    # rewrite and review loop: 50 steps allow 25 runs of each, written values are capped
+    estimate = estimate_tokens(build_branching_workflow(), output_tokens=10)
+    assert estimate.worst_path == ["draft", "review", "_end"]
+    assert estimate.prompt["draft"] == estimate.prompt["unused"]
+    assert estimate.total_bound == sum(
+        runs * (estimate.prompt[id] + estimate.output[id])
+        for id, runs in (("draft", 1), ("review", 25), ("rewrite", 25), ("_end", 1))
+    )
+
+
+def build_history_loop(window=None):
+    builder = WorkflowBuilder(memory={"topic": "CUDA"})
+    if window:
+        builder.set_window("history", window)
+    builder.generative_step(
+        id="create_query",
+        prompt="Write a query about {{topic}}, avoid {{history}}",
+        operator=Operator.GENERATION,
+        inputs=[Slice.last("history", window, False) if window else GetAll.new("history", False)],
+        outputs=[Write.new("query")],
+    )
+    builder.generative_step(
+        id="search",
+        prompt="{{query}}",
+        operator=Operator.FUNCTION_CALLING,
+        outputs=[
+            Write.new("result"),
+            CappedPush.new("history", window) if window else Push.new("history"),
+        ],
+    )
+    builder.flow(
+        [
+            Edge(source="create_query", target="search"),
+            Edge(
+                source="search",
+                target="_end",
+                condition=ConditionBuilder.build(
+                    expected="Yes",
+                    target_if_not="create_query",
+                    expression=Expression.CONTAINS,
+                    input=Read.new("result", True),
+                ),
+            ),
+        ]
+    )
+    builder.set_return_value("result")
+    return builder.build()
+
+
+def test_capped_history_bounds_prompts():
+    static = 4 + len("Write a query about , avoid ") + len("CUDA")
+    # 25 runs of search push 25 values of 100 tokens, one per line
+    full = estimate_tokens(build_history_loop(), tokenizer=len, output_tokens=100)
+    assert full.prompt["create_query"] == static + 25 * 101
+    windowed = estimate_tokens(build_history_loop(3), tokenizer=len, output_tokens=100)
+    assert windowed.prompt["create_query"] == static + 3 * 101
+    assert windowed.total_bound < full.total_bound
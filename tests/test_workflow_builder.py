@@ -1,3 +1,4 @@
+import pydantic
 import pytest
 from dria_workflows import (
     WorkflowBuilder,
@@ -114,3 +115,26 @@ def test_complex_workflow_builder():
         indent=2, exclude_unset=True, exclude_none=True
     )
     assert validate_workflow_json(json_data)
+
+
+def test_inputs_and_outputs_are_interned():
+    assert Read.new("topic", True) is Read.new("topic", True)
+    assert Read.new("topic", True) is not Read.new("topic", False)
+    assert Write.new("poem") is Write.new("poem")
+    with pytest.raises(pydantic.ValidationError):
+        Read.new("topic", True).name = "other"
+
+    builder = WorkflowBuilder(memory={"topic": "AI"})
+    for i in range(3):
+        builder.generative_step(
+            id=f"step_{i}",
+            prompt="Write about {{topic}}",
+            operator=Operator.GENERATION,
+            outputs=[Write.new("text")],
+        )
+    builder.flow([Edge(source=f"step_{i}", target="_end") for i in range(3)])
+    builder.set_return_value("text")
+    workflow = builder.build()
+    assert workflow.tasks[0].inputs[0] is workflow.tasks[2].inputs[0]
+    assert workflow.tasks[0].inputs[0] == Read.new("topic", True)
+    assert validate_workflow_json(workflow.model_dump_json(exclude_none=True))
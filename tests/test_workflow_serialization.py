@@ -0,0 +1,184 @@
+import io
+import json
+
+import pydantic
+import pytest
+
+from dria_workflows import (
+    WorkflowBuilder,
+    Workflow,
+    Operator,
+    Write,
+    Edge,
+    Read,
+    GetAll,
+    ConditionBuilder,
+    Expression,
+    Push,
+    InputValueType,
+    validate_workflow_json,
+)
+from dria_workflows.workflows.interface import Output, OutputType
+
+from .test_tokens import build_history_loop
+
+
+def build_search_workflow() -> Workflow:
+    builder = WorkflowBuilder(
+        memory={"topic_1": "Linear Algebra", "documents": ["a", {"title": "b"}]}
+    )
+    builder.generative_step(
+        id="create_query",
+        prompt="Write a query about {{topic_1}}, avoid {{history}}. Docs: {{documents}}",
+        operator=Operator.GENERATION,
+        inputs=[GetAll.new("history", False)],
+        outputs=[Write.new("search_query")],
+    )
+    builder.generative_step(
+        id="search",
+        prompt="{{search_query}}",
+        operator=Operator.FUNCTION_CALLING,
+        outputs=[Write.new("result"), Push.new("history")],
+    )
+    builder.flow(
+        [
+            Edge(source="create_query", target="search"),
+            Edge(
+                source="search",
+                target="_end",
+                condition=ConditionBuilder.build(
+                    expected="Yes",
+                    target_if_not="create_query",
+                    expression=Expression.CONTAINS,
+                    input=Read.new("result", True),
+                ),
+            ),
+        ]
+    )
+    builder.set_return_value(["result", "history"])
+    return builder.build()
+
+
+def test_workflow_load_round_trip(tmp_path):
+    workflow = build_search_workflow()
+    path = tmp_path / "workflow.json"
+    workflow.save(str(path))
+    expected = workflow.model_dump_json(exclude_unset=True, exclude_none=True)
+
+    loaded = Workflow.load(str(path))
+    assert loaded == workflow
+    assert loaded.model_dump_json(exclude_unset=True, exclude_none=True) == expected
+    types = {input.name: input.value.type for input in loaded.tasks[0].inputs}
+    assert types["history"] is InputValueType.GET_ALL
+
+
+def test_workflow_from_json_keeps_defaults():
+    workflow = Workflow.from_json('{"config": {"max_steps": 5, "max_time": 10}}')
+    assert workflow.config.max_steps == 5
+    assert workflow.tasks == [] and workflow.steps == []
+    assert workflow.model_dump(exclude_unset=True, exclude_none=True) == {
+        "config": {"max_steps": 5, "max_time": 10},
+        "external_memory": {},
+        "tasks": [],
+        "steps": [],
+    }
+
+
+def test_workflow_compact_json():
+    workflow = build_search_workflow()
+    data = workflow.to_dict()
+    compact = workflow.to_json(compact=True)
+
+    assert data == json.loads(
+        workflow.model_dump_json(exclude_unset=True, exclude_none=True)
+    )
+    assert b"\n" not in compact
+    assert len(compact) < len(workflow.to_json())
+    assert validate_workflow_json(compact)
+    end_task = workflow.to_dict(compact=True)["tasks"][-1]
+    assert "inputs" not in end_task and "messages" in end_task
+    assert Workflow.from_json(compact) == workflow
+
+
+def test_workflow_dump_streams_same_document(tmp_path):
+    workflow = build_search_workflow()
+    for compact in (False, True):
+        sink = io.BytesIO()
+        written = workflow.dump(sink, compact=compact)
+        assert written == len(sink.getvalue())
+        assert json.loads(sink.getvalue()) == workflow.to_dict(compact=compact)
+
+    path = tmp_path / "workflow.json"
+    workflow.save(str(path), compact=True)
+    assert Workflow.load(str(path)) == workflow
+
+
+def test_workflow_binary_round_trip():
+    workflow = build_search_workflow()
+    encoded = workflow.to_bytes()
+
+    assert len(encoded) < len(workflow.to_json(compact=True))
+    assert Workflow.from_bytes(encoded) == workflow
+
+
+def test_binary_encoding_of_plain_values():
+    from dria_workflows.workflows.binary import decode, encode
+
+    value = {"a": [1, -2, 300, 2.5, None, True, False, "x", "x"], "b": {"a": ""}}
+    assert decode(encode(value)) == value
+
+    encoded = encode(value)
+    for end in range(len(encoded) - 1, 3, -1):
+        with pytest.raises(ValueError, match="truncated workflow binary"):
+            decode(encoded[:end])
+
+
+def test_capped_push_and_slice_round_trip():
+    workflow = build_history_loop(3)
+    data = json.loads(workflow.to_json(compact=True))
+    create_query, search = data["tasks"][:2]
+    assert {"type": "slice", "index": -3, "key": "history"} in [
+        input["value"] for input in create_query["inputs"]
+    ]
+    assert {"type": "capped_push", "key": "history", "value": "__result", "max_length": 3} in search["outputs"]
+    assert validate_workflow_json(workflow.to_json())
+    assert Workflow.from_dict(data) == workflow
+
+    data["tasks"][1]["outputs"][1].pop("max_length")
+    assert not validate_workflow_json(json.dumps(data))
+    with pytest.raises(pydantic.ValidationError):
+        Workflow.from_dict(data)
+    with pytest.raises(pydantic.ValidationError):
+        Output(type=OutputType.WRITE, key="result", value="__result", max_length=3)
+
+
+def test_builder_window():
+    builder = WorkflowBuilder(memory={"topic": "CUDA", "history": ["a", "b", "c"]})
+    with pytest.raises(ValueError):
+        builder.set_window("topic", 2)
+    builder.set_window("history", 2)
+    builder.generative_step(
+        id="next",
+        prompt="{{topic}} after {{history}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("next")],
+    )
+    inputs = {input.value.key: input.value for input in builder.tasks[0].inputs}
+    assert inputs["history"].type == InputValueType.SLICE
+    assert inputs["history"].index == -2 and inputs["history"].end is None
+
+    # a windowed key that turns out to be a string is read whole
+    builder.set_window("summary", 2)
+    builder.generative_step(
+        id="summarize",
+        prompt="{{next}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("summary")],
+    )
+    builder.generative_step(
+        id="report",
+        prompt="{{summary}}",
+        operator=Operator.GENERATION,
+        outputs=[Write.new("report")],
+    )
+    assert builder.tasks[2].inputs[0].value.type == InputValueType.READ